@@ -0,0 +1,269 @@
+"""
+Local SQLite index of activity summaries with incremental sync from Garmin Connect
+"""
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+DB_PATH = os.path.expanduser(os.getenv("GARMIN_ACTIVITY_DB", "~/.cache/garmin-mcp/activities.db"))
+SYNC_PAGE_SIZE = 100
+MAX_QUERY_LIMIT = 1000
+
+SORT_COLUMNS = {
+    "start_time": "start_time_local",
+    "distance": "distance",
+    "duration": "duration",
+    "elevation_gain": "elevation_gain",
+    "average_hr": "average_hr",
+    "calories": "calories",
+}
+GROUP_COLUMNS = {
+    "activity_type": "activity_type",
+    "month": "substr(start_time_local, 1, 7)",
+    "year": "substr(start_time_local, 1, 4)",
+}
+SUMMARY_COLUMNS = ["activity_id", "name", "activity_type", "start_time_local", "distance",
+                   "duration", "elevation_gain", "average_hr", "calories"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    activity_id INTEGER PRIMARY KEY,
+    name TEXT,
+    activity_type TEXT,
+    start_time_local TEXT,
+    start_time_gmt TEXT,
+    distance REAL,
+    duration REAL,
+    elevation_gain REAL,
+    average_hr REAL,
+    calories REAL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS activities_start ON activities (start_time_local);
+CREATE INDEX IF NOT EXISTS activities_type_start ON activities (activity_type, start_time_local);
+CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _row(activity: Dict[str, Any]) -> tuple:
+    return (
+        activity["activityId"],
+        activity.get("activityName"),
+        (activity.get("activityType") or {}).get("typeKey"),
+        activity.get("startTimeLocal"),
+        activity.get("startTimeGMT"),
+        activity.get("distance"),
+        activity.get("duration"),
+        activity.get("elevationGain"),
+        activity.get("averageHR"),
+        activity.get("calories"),
+        json.dumps(activity),
+    )
+
+
+class ActivityIndex:
+    """SQLite store of activity summaries from get_activities
+
+    Each call opens its own connection, so the index can be used from any
+    worker thread. Syncs are serialized with a lock.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._sync_lock = threading.Lock()
+        self._initialized = False
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection for one operation, committed if it succeeds and closed afterwards"""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.row_factory = sqlite3.Row
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def upsert(self, activities: List[Dict[str, Any]]) -> int:
+        """Insert or replace activity summaries, returning how many were written"""
+        rows = [_row(a) for a in activities if a.get("activityId")]
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO activities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def delete(self, activity_id: int) -> None:
+        """Remove one activity from the index"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM activities WHERE activity_id = ?", (activity_id,))
+
+    def patch(self, activity_id: int, name: Optional[str] = None, type_key: Optional[str] = None) -> bool:
+        """Update the name and/or type of an indexed activity in place, returning whether it was indexed"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT summary FROM activities WHERE activity_id = ?", (activity_id,)).fetchone()
+            if row is None:
+                return False
+            activity = json.loads(row["summary"])
+            if name is not None:
+                activity["activityName"] = name
+            if type_key is not None:
+                activity["activityType"] = dict(activity.get("activityType") or {}, typeKey=type_key)
+            conn.execute("INSERT OR REPLACE INTO activities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         _row(activity))
+        return True
+
+    def mark_stale(self, since_gmt: Optional[str] = None) -> None:
+        """Make the next sync run regardless of its age and re-fetch activities from since_gmt on
+
+        Used after activities were created, possibly with start times older than
+        the newest indexed activity, which an incremental sync would skip.
+        """
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_sync', '0')")
+            if since_gmt:
+                current = self._state(conn, "resync_from")
+                if current is None or since_gmt < current:
+                    conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('resync_from', ?)", (since_gmt,))
+
+    def find(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        """Return the summary columns of an indexed activity, or None"""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM activities WHERE activity_id = ?",
+                               (activity_id,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_start_time(self, start_time_gmt: str) -> Optional[Dict[str, Any]]:
+        """Return the indexed activity that started at a "YYYY-MM-DD HH:MM:SS" GMT time, or None"""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM activities WHERE start_time_gmt = ?",
+                               (start_time_gmt,)).fetchone()
+        return dict(row) if row else None
+
+    def _state(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def last_synced(self) -> float:
+        """Return the time of the last completed sync, or 0 if never synced"""
+        with self._connect() as conn:
+            return float(self._state(conn, "last_sync") or 0)
+
+    def sync(self, client, full: bool = False) -> Dict[str, Any]:
+        """Fetch activities newer than those of the last complete sync (or all of them if full)
+
+        Only a sync that walked back to its cutoff records a new watermark, so a
+        sync that fails partway is continued by a complete walk next time
+        rather than stopping at the newest activity it did store.
+
+        Args:
+            client: Logged-in Garmin client
+            full: Re-fetch the whole activity history instead of only new activities
+        """
+        with self._sync_lock:
+            with self._connect() as conn:
+                complete_through = self._state(conn, "complete_through")
+                resync_from = self._state(conn, "resync_from")
+            latest = None if full else complete_through
+            if latest and resync_from:
+                latest = min(latest, resync_from)
+            start = 0
+            written = 0
+            newest = complete_through or ""
+            while True:
+                page = client.get_activities(start, SYNC_PAGE_SIZE) or []
+                new = [a for a in page if latest is None or (a.get("startTimeGMT") or "") >= latest]
+                written += self.upsert(new)
+                newest = max([newest] + [a.get("startTimeGMT") or "" for a in new])
+                if len(new) < len(page) or len(page) < SYNC_PAGE_SIZE:
+                    break
+                start += SYNC_PAGE_SIZE
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_sync', ?)", (str(time.time()),))
+                if newest:
+                    conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('complete_through', ?)", (newest,))
+                # Keep a resync_from recorded while this sync was running
+                conn.execute("DELETE FROM sync_state WHERE key = 'resync_from' AND value IS ?", (resync_from,))
+        return {"synced": written, "full": full, **self.stats()}
+
+    def query(self, activity_type: str = "", start_date: str = "", end_date: str = "",
+              min_distance: Optional[float] = None, max_distance: Optional[float] = None,
+              min_duration: Optional[float] = None, max_duration: Optional[float] = None,
+              name_contains: str = "", sort_by: str = "start_time", descending: bool = True,
+              limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Filter, sort and paginate indexed activities
+
+        Distances are in meters and durations in seconds, as stored by Garmin.
+        """
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"sort_by must be one of {', '.join(SORT_COLUMNS)}")
+        where, params = self._filters(activity_type, start_date, end_date, min_distance, max_distance,
+                                      min_duration, max_duration, name_contains)
+        limit = max(1, min(limit, MAX_QUERY_LIMIT))
+        order = f"{SORT_COLUMNS[sort_by]} {'DESC' if descending else 'ASC'}, activity_id"
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT count(*) FROM activities {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM activities {where} "
+                f"ORDER BY {order} LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+        return {"total": total, "offset": offset, "limit": limit, "activities": [dict(r) for r in rows]}
+
+    def summarize(self, group_by: str = "activity_type", activity_type: str = "",
+                  start_date: str = "", end_date: str = "") -> List[Dict[str, Any]]:
+        """Return activity counts and distance/duration/elevation totals per group"""
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_COLUMNS)}")
+        where, params = self._filters(activity_type, start_date, end_date)
+        column = GROUP_COLUMNS[group_by]
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {column} AS grp, count(*) AS activities, sum(distance) AS distance, "
+                f"sum(duration) AS duration, sum(elevation_gain) AS elevation_gain, "
+                f"sum(calories) AS calories FROM activities {where} GROUP BY grp ORDER BY grp", params).fetchall()
+        return [{group_by: r["grp"], **{k: r[k] for k in r.keys() if k != "grp"}} for r in rows]
+
+    @staticmethod
+    def _filters(activity_type="", start_date="", end_date="", min_distance=None, max_distance=None,
+                 min_duration=None, max_duration=None, name_contains=""):
+        clauses, params = [], []
+        if activity_type:
+            clauses.append("activity_type = ?")
+            params.append(activity_type)
+        if start_date:
+            clauses.append("start_time_local >= ?")
+            params.append(start_date)
+        if end_date:
+            # Dates compare as prefixes of "YYYY-MM-DD HH:MM:SS", so include the whole end day
+            clauses.append("start_time_local < ?")
+            params.append(end_date + "~")
+        for column, op, value in (("distance", ">=", min_distance), ("distance", "<=", max_distance),
+                                  ("duration", ">=", min_duration), ("duration", "<=", max_duration)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        if name_contains:
+            clauses.append("name LIKE ?")
+            params.append(f"%{name_contains}%")
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of indexed activities and the indexed date span"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT count(*) AS n, min(start_time_local) AS first, "
+                               "max(start_time_local) AS last FROM activities").fetchone()
+            last_sync = self._state(conn, "last_sync")
+        return {"indexed": row["n"], "first_activity": row["first"], "last_activity": row["last"],
+                "last_sync": float(last_sync) if last_sync else None, "path": self.path}
+
+
+activity_index = ActivityIndex()
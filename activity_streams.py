@@ -0,0 +1,160 @@
+"""
+Columnar decoding, downsampling and summary statistics for activity detail metric streams
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Stream name -> Garmin metric descriptor keys, in order of preference
+STREAM_KEYS = {
+    "elapsed": ["sumDuration", "sumElapsedDuration"],
+    "timestamp": ["directTimestamp"],
+    "distance": ["sumDistance"],
+    "heart_rate": ["directHeartRate"],
+    "speed": ["directSpeed", "directGridSpeed"],
+    "cadence": ["directRunCadence", "directBikeCadence", "directDoubleCadence"],
+    "elevation": ["directElevation", "directCorrectedElevation"],
+    "power": ["directPower"],
+    "latitude": ["directLatitude"],
+    "longitude": ["directLongitude"],
+}
+DEFAULT_STREAMS = ["heart_rate", "pace", "cadence", "elevation", "power"]
+
+
+def decode_details(details: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Turn get_activity_details metric descriptors and samples into float column arrays
+
+    Missing samples become NaN. A pace column (seconds per km) is derived from speed.
+
+    Args:
+        details: Response of get_activity_details
+    """
+    descriptors = {d["key"]: d["metricsIndex"] for d in details.get("metricDescriptors") or []}
+    samples = details.get("activityDetailMetrics") or []
+    width = max(descriptors.values(), default=-1) + 1
+    if not samples or not width:
+        return {}
+    rows = [s.get("metrics") or [] for s in samples]
+    # Rows can be ragged when trailing metrics are missing, pad them with None
+    matrix = np.array([r if len(r) == width else (r + [None] * width)[:width] for r in rows], dtype=float)
+
+    columns = {}
+    for name, keys in STREAM_KEYS.items():
+        for key in keys:
+            if key in descriptors:
+                columns[name] = matrix[:, descriptors[key]]
+                break
+    if "speed" in columns:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pace = 1000.0 / columns["speed"]
+        pace[~np.isfinite(pace)] = np.nan
+        columns["pace"] = pace
+    if "elapsed" not in columns and "timestamp" in columns:
+        columns["elapsed"] = (columns["timestamp"] - columns["timestamp"][0]) / 1000.0
+    return columns
+
+
+def summarize(columns: Dict[str, np.ndarray], names: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Return count, min, max, mean, std and 5th/50th/95th percentiles per stream, ignoring NaN"""
+    stats = {}
+    for name in names:
+        values = columns.get(name)
+        if values is None:
+            continue
+        values = values[~np.isnan(values)]
+        if not values.size:
+            stats[name] = {"count": 0}
+            continue
+        p5, p50, p95 = np.percentile(values, [5, 50, 95])
+        stats[name] = {
+            "count": int(values.size), "min": float(values.min()), "max": float(values.max()),
+            "mean": float(values.mean()), "std": float(values.std()),
+            "p5": float(p5), "p50": float(p50), "p95": float(p95),
+        }
+    return stats
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Select sample indices with Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last samples and, per bucket, the sample forming the
+    largest triangle with the previously kept sample and the next bucket's mean.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(np.nanmean(y)) else 0.0, y)
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    selected = [0]
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        a = selected[-1]
+        bucket_x, bucket_y = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y - y[a]))
+        selected.append(start + int(np.argmax(area)))
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def downsample_interval(columns: Dict[str, np.ndarray], names: List[str], interval: float) -> Dict[str, np.ndarray]:
+    """Average each stream over fixed elapsed-time buckets of interval seconds"""
+    elapsed = columns["elapsed"]
+    origin = np.nanmin(elapsed)
+    buckets = np.floor((elapsed - origin) / interval)
+    buckets[np.isnan(buckets)] = -1
+    keep = buckets >= 0
+    ids, inverse = np.unique(buckets[keep], return_inverse=True)
+    result = {"elapsed": origin + ids * interval}
+    for name in names:
+        values = columns[name][keep]
+        valid = ~np.isnan(values)
+        sums = np.bincount(inverse[valid], weights=values[valid], minlength=len(ids))
+        counts = np.bincount(inverse[valid], minlength=len(ids))
+        with np.errstate(invalid="ignore"):
+            result[name] = sums / counts
+    return result
+
+
+def downsample(columns: Dict[str, np.ndarray], names: List[str], method: str = "lttb",
+               points: int = 200, interval: float = 0) -> Dict[str, np.ndarray]:
+    """Reduce streams to a chart-sized number of points
+
+    Args:
+        columns: Decoded streams from decode_details
+        names: Streams to keep
+        method: "lttb" (shape-preserving, driven by the first stream), "interval" (fixed-time means) or "none"
+        points: Target number of points for lttb
+        interval: Bucket width in seconds for interval
+    """
+    names = [n for n in names if n in columns]
+    if method == "interval":
+        if interval <= 0:
+            raise ValueError("interval must be positive for interval downsampling")
+        if "elapsed" not in columns:
+            raise ValueError("Activity has no elapsed time stream to bucket by")
+        return downsample_interval(columns, names, interval)
+    if method not in ("lttb", "none"):
+        raise ValueError("method must be lttb, interval or none")
+    x = columns.get("elapsed")
+    if x is None:
+        x = np.arange(len(next(iter(columns.values()))), dtype=float)
+    if method == "none" or not names:
+        indices = np.arange(len(x))
+    else:
+        indices = lttb_indices(x, columns[names[0]], points)
+    result = {"elapsed": x[indices]}
+    for name in names:
+        result[name] = columns[name][indices]
+    return result
+
+
+def to_lists(columns: Dict[str, np.ndarray], decimals: int = 2) -> Dict[str, List[Optional[float]]]:
+    """Convert arrays to JSON-friendly lists with NaN as None"""
+    result = {}
+    for name, values in columns.items():
+        rounded = np.round(values, decimals)
+        result[name] = [None if np.isnan(v) else v for v in rounded.tolist()]
+    return result
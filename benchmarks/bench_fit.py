@@ -0,0 +1,44 @@
+"""
+FIT decoding benchmark: time and peak Python memory to decode the record streams
+of multi-hour activity files
+
+Usage: python benchmarks/bench_fit.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fit_file import FitFile
+from mock_garmin import fit_activity
+
+HOURS = [1, 4, 12, 24]
+
+
+def main():
+    print(f"{'hours':>6}{'records':>10}{'file MB':>10}{'decode ms':>11}{'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for hours in HOURS:
+            path = os.path.join(directory, f"{hours}h.fit")
+            with open(path, "wb") as f:
+                f.write(fit_activity(1100, samples=hours * 3600))
+            start = time.perf_counter()
+            with FitFile(path) as fit:
+                columns = fit.streams()
+            elapsed = time.perf_counter() - start
+            # Measured in a second pass, tracing slows the decode down
+            tracemalloc.start()
+            with FitFile(path) as fit:
+                fit.streams()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{hours:>6}{len(columns['elapsed']):>10}{os.path.getsize(path) / 1e6:>10.1f}"
+                  f"{elapsed * 1000:>11.1f}{peak / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Connection pool benchmark: p50/p99 latency of 1 to 64 concurrent tool calls
+against the local Garmin stand-in, for several HTTP pool configurations
+
+The stand-in runs in its own process and charges a handshake delay for every
+new connection, so configurations that reuse connections show lower latency.
+
+Usage: python benchmarks/bench_http_pool.py [calls per level]
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LEVELS = (1, 4, 16, 32, 64)
+LATENCY = 0.02
+HANDSHAKE = 0.03
+# name -> environment of the child process
+CONFIGS = {
+    "garth default (pool 10)": {"GARMIN_HTTP_POOL_MAXSIZE": "10"},
+    "pooled (pool 64)": {"GARMIN_HTTP_POOL_MAXSIZE": "64"},
+    "httpx (pool 64)": {"GARMIN_HTTP_POOL_MAXSIZE": "64", "GARMIN_HTTP_BACKEND": "httpx"},
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def stand_in_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/_stats") as response:
+        return json.load(response)
+
+
+async def child(base_url, calls):
+    from mock_garmin import write_fake_tokens
+    token_dir = tempfile.mkdtemp()
+    write_fake_tokens(token_dir)
+    os.environ.update(GARMIN_BASE_URL=base_url, GARMINTOKENS=token_dir, GARMIN_CACHE_DIR=tempfile.mkdtemp())
+
+    import garmin_mcp
+
+    # Tools are run in process, without the MCP transport, whose per-call schema
+    # validation would otherwise dominate at high concurrency
+    tool = await garmin_mcp.app.get_tool("get_activity")
+    results = {}
+    activity_id = 10000
+    for level in LEVELS:
+        latencies = []
+        connections = stand_in_stats(base_url)["connections"]
+        for _ in range(max(1, calls // level)):
+            async def timed(aid):
+                start = time.perf_counter()
+                # Distinct IDs, so every call goes upstream
+                await tool.run({"activity_id": aid})
+                latencies.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(timed(activity_id + i) for i in range(level)))
+            activity_id += level
+        results[level] = {"p50": statistics.median(latencies), "p99": percentile(latencies, 0.99),
+                          "connections": stand_in_stats(base_url)["connections"] - connections}
+    print(json.dumps(results))
+
+
+def main(calls):
+    print(f"stand-in latency {LATENCY * 1000:.0f} ms, handshake {HANDSHAKE * 1000:.0f} ms, {calls} calls per level")
+    print(f"{'configuration':<26}{'concurrent':>11}{'p50 ms':>9}{'p99 ms':>9}{'new conns':>11}")
+    for name, settings in CONFIGS.items():
+        stand_in = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "mock_garmin.py")], stdout=subprocess.PIPE, text=True,
+            env=dict(os.environ, MOCK_GARMIN_PORT="0", MOCK_GARMIN_LATENCY=str(LATENCY),
+                     MOCK_GARMIN_HANDSHAKE=str(HANDSHAKE)))
+        try:
+            base_url = stand_in.stdout.readline().split()[-1]
+            env = dict(os.environ, FASTMCP_LOG_LEVEL="WARNING", GARMIN_RATE_LIMIT="0", GARMIN_WARM_UP="0",
+                       GARMIN_MAX_WORKERS="64", GARMIN_TOOL_CONCURRENCY="64", **settings)
+            output = subprocess.run([sys.executable, __file__, "--child", base_url, str(calls)], env=env, cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout
+        finally:
+            stand_in.terminate()
+            stand_in.wait()
+        results = json.loads(output.strip().splitlines()[-1])
+        for level, r in results.items():
+            print(f"{name:<26}{level:>11}{r['p50'] * 1000:>9.1f}{r['p99'] * 1000:>9.1f}{r['connections']:>11}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        asyncio.run(child(sys.argv[2], int(sys.argv[3])))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 256)
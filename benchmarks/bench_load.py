@@ -0,0 +1,179 @@
+"""
+Load benchmark: drive a weighted mix of MCP tools at a fixed concurrency
+against the local Garmin stand-in, with optional injected 429s and 5xx errors
+
+Reports throughput, per-tool p50/p95/p99 latency and error counts, upstream
+requests, cache hit ratio, coalesced calls and governor retries, so changes to
+concurrency, caching and retry handling can be measured without an account.
+
+Usage: python benchmarks/bench_load.py [--calls N] [--concurrency N] [--latency S] [--jitter S]
+                                       [--error-rate P] [--throttle-rate P] [--retry-after S]
+                                       [--rate-limit R] [--fixtures DIR] [--seed N] [--mcp]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_garmin import ACTIVITY_COUNT, WORKOUT_COUNT, write_fake_tokens
+
+DAYS = 30
+
+
+def _day(rng):
+    # A month of history, so repeated days hit the cache
+    return f"2024-06-{rng.randint(1, DAYS):02d}"
+
+
+# (tool, weight, arguments for a random generator)
+WORKLOAD = [
+    ("get_sleep_data", 4, lambda rng: {"cdate": _day(rng)}),
+    ("get_daily_weigh_ins", 2, lambda rng: {"cdate": _day(rng)}),
+    ("get_hydration_data", 2, lambda rng: {"cdate": _day(rng)}),
+    ("get_activity", 4, lambda rng: {"activity_id": 1000 + rng.randint(1, ACTIVITY_COUNT)}),
+    ("get_activity_details", 1, lambda rng: {"activity_id": 1000 + rng.randint(1, ACTIVITY_COUNT),
+                                             "maxchart": 200, "maxpoly": 200}),
+    ("list_activities", 2, lambda rng: {"page_size": 20}),
+    ("get_scheduled_workouts", 2, lambda rng: {"start_date": _day(rng), "end_date": "2024-06-30"}),
+    ("get_workouts", 1, lambda rng: {}),
+    ("get_workout_by_id", 2, lambda rng: {"workout_id": 700000 + rng.randint(1, WORKOUT_COUNT)}),
+    ("get_devices", 1, lambda rng: {}),
+    ("get_today_overview", 1, lambda rng: {"cdate": _day(rng)}),
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def stand_in_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/_stats") as response:
+        return json.load(response)
+
+
+async def drive(args, base_url):
+    # Fresh tokens and local stores, so every run starts cold
+    scratch = tempfile.mkdtemp()
+    write_fake_tokens(os.path.join(scratch, "tokens"))
+    os.environ.update(
+        GARMIN_BASE_URL=base_url, GARMINTOKENS=os.path.join(scratch, "tokens"), GARMIN_CACHE_DIR=scratch,
+        GARMIN_ACTIVITY_DB=os.path.join(scratch, "activities.db"), GARMIN_UPLOAD_DB=os.path.join(scratch, "uploads.db"),
+        GARMIN_WORKOUT_DB=os.path.join(scratch, "workouts.db"),
+        GARMIN_FILE_STORE=os.path.join(scratch, "files"), GARMIN_EXPORT_DIR=os.path.join(scratch, "exports"),
+        GARMIN_ACCOUNTS_DIR=os.path.join(scratch, "accounts"), GARMIN_RATE_LIMIT=str(args.rate_limit))
+    # Enough workers for the offered concurrency, unless set explicitly
+    os.environ.setdefault("GARMIN_MAX_WORKERS", str(args.concurrency))
+    os.environ.setdefault("GARMIN_TOOL_CONCURRENCY", str(args.concurrency))
+    import garmin_mcp
+    from garmin_accounts import current
+    from garmin_cache import response_cache
+    from garmin_singleflight import single_flight_stats
+
+    rng = random.Random(args.seed)
+    tools, weights = [w[0] for w in WORKLOAD], [w[1] for w in WORKLOAD]
+    makers = {name: make for name, _, make in WORKLOAD}
+    calls = [(name, makers[name](rng)) for name in rng.choices(tools, weights, k=args.calls)]
+
+    if args.mcp:
+        from fastmcp import Client
+        client = Client(garmin_mcp.app)
+        await client.__aenter__()
+
+        async def call(name, arguments):
+            result = await client.call_tool_mcp(name, arguments)
+            return result.content[0].text if result.content else ""
+    else:
+        # In process, without the MCP transport and its per-call schema validation
+        registry = {name: await garmin_mcp.app.get_tool(name) for name in tools}
+
+        async def call(name, arguments):
+            result = await registry[name].run(arguments)
+            return result.content[0].text if result.content else ""
+
+    latencies = {name: [] for name in tools}
+    errors = {name: 0 for name in tools}
+    queue = iter(calls)
+
+    async def worker():
+        for name, arguments in queue:
+            start = time.perf_counter()
+            try:
+                text = await call(name, arguments)
+                failed = text.startswith("Error")
+            except Exception:
+                failed = True
+            latencies[name].append(time.perf_counter() - start)
+            errors[name] += failed
+
+    before = stand_in_stats(base_url)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall = time.perf_counter() - start
+    after = stand_in_stats(base_url)
+    if args.mcp:
+        await client.__aexit__(None, None, None)
+
+    print(f"{args.calls} calls, concurrency {args.concurrency}, {wall:.2f} s, {args.calls / wall:.0f} calls/s "
+          f"({'MCP client' if args.mcp else 'in process'})")
+    print(f"{'tool':<26}{'calls':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name in tools:
+        values = latencies[name]
+        if values:
+            print(f"{name:<26}{len(values):>7}{errors[name]:>8}{statistics.median(values) * 1000:>9.1f}"
+                  f"{percentile(values, 0.95) * 1000:>9.1f}{percentile(values, 0.99) * 1000:>9.1f}")
+    governor = current().governor.snapshot()
+    cache = response_cache.snapshot()
+    print(f"upstream requests {after['requests'] - before['requests']}, "
+          f"429s {after['throttled'] - before['throttled']}, 5xx {after['errors'] - before['errors']}, "
+          f"fixture hits {after['fixture_hits'] - before['fixture_hits']}, "
+          f"connections {after['connections'] - before['connections']}")
+    print(f"cache hit ratio {cache['hit_ratio']}, coalesced {single_flight_stats()['coalesced']}, "
+          f"governor retries {governor['retries']}, failed {governor.get('failed', 0)}, "
+          f"throttle wait {governor['throttle_wait_seconds']} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random delay of up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds of injected 429s")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="client requests per second (GARMIN_RATE_LIMIT), 0 to measure the stand-in unthrottled")
+    parser.add_argument("--fixtures", default="", help="directory of recorded responses to replay")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mcp", action="store_true", help="call tools through an in-memory MCP client")
+    args = parser.parse_args()
+
+    stand_in = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "mock_garmin.py")], stdout=subprocess.PIPE, text=True,
+        env=dict(os.environ, MOCK_GARMIN_PORT="0", MOCK_GARMIN_LATENCY=str(args.latency),
+                 MOCK_GARMIN_JITTER=str(args.jitter), MOCK_GARMIN_ERROR_RATE=str(args.error_rate),
+                 MOCK_GARMIN_THROTTLE_RATE=str(args.throttle_rate), MOCK_GARMIN_RETRY_AFTER=str(args.retry_after),
+                 MOCK_GARMIN_FIXTURES=args.fixtures, MOCK_GARMIN_SEED=str(args.seed)))
+    try:
+        base_url = stand_in.stdout.readline().split()[-1]
+        os.environ.setdefault("FASTMCP_LOG_LEVEL", "WARNING")
+        os.environ.setdefault("GARMIN_WARM_UP", "0")
+        asyncio.run(drive(args, base_url))
+    finally:
+        stand_in.terminate()
+        stand_in.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Projection benchmark: response bytes and serialization time with the full
+Garmin payload versus the default summary projection
+
+Usage: python benchmarks/bench_projection.py
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pydantic_core
+
+from garmin_mcp import respond
+from mock_garmin import activity_details, activity_list_entry, activity_summary
+
+PAYLOADS = {
+    "get_activity": activity_summary(1100),
+    "get_activity_details": activity_details(1100),
+    "get_activities_by_date": [dict(activity_list_entry(activity_id), **activity_summary(activity_id)["summaryDTO"])
+                               for activity_id in range(1001, 1101)],
+}
+
+
+def timed(func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = func()
+    return out, (time.perf_counter() - start) / repeat
+
+
+def main():
+    print(f"{'tool':<24}{'full bytes':>12}{'full ms':>10}{'summary bytes':>15}{'summary ms':>12}{'ratio':>8}")
+    for tool, payload in PAYLOADS.items():
+        # FastMCP's default serializer for an unprojected dict result
+        full, full_time = timed(lambda: pydantic_core.to_json(payload, fallback=str).decode())
+        summary, summary_time = timed(lambda: respond(tool, payload))
+        print(f"{tool:<24}{len(full):>12}{full_time * 1000:>10.2f}{len(summary):>15}"
+              f"{summary_time * 1000:>12.2f}{len(full) / len(summary):>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Startup benchmark: time from process spawn to the first tools/list response,
+and to the first tool call, against the local Garmin stand-in
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport
+
+from mock_garmin import MockGarminServer, write_fake_tokens
+
+
+async def measure_once(env):
+    transport = PythonStdioTransport(os.path.join(ROOT, "garmin_mcp.py"), env=env, cwd=ROOT)
+    start = time.perf_counter()
+    async with Client(transport) as client:
+        await client.list_tools()
+        tools_list = time.perf_counter() - start
+        await client.call_tool_mcp("get_sleep_data", {"cdate": "2024-01-01"})
+        first_call = time.perf_counter() - start
+    return tools_list, first_call
+
+
+def scratch_env(base_url):
+    # Fresh tokens and local stores per run, so every first call is cold and the
+    # stand-in's responses never reach the real ~/.cache/garmin-mcp
+    scratch = tempfile.mkdtemp()
+    write_fake_tokens(os.path.join(scratch, "tokens"))
+    return dict(
+        os.environ, GARMIN_BASE_URL=base_url, GARMINTOKENS=os.path.join(scratch, "tokens"),
+        GARMIN_CACHE_DIR=scratch, GARMIN_ACTIVITY_DB=os.path.join(scratch, "activities.db"),
+        GARMIN_UPLOAD_DB=os.path.join(scratch, "uploads.db"), GARMIN_WORKOUT_DB=os.path.join(scratch, "workouts.db"),
+        GARMIN_FILE_STORE=os.path.join(scratch, "files"), GARMIN_EXPORT_DIR=os.path.join(scratch, "exports"),
+        GARMIN_ACCOUNTS_DIR=os.path.join(scratch, "accounts"), FASTMCP_LOG_LEVEL="WARNING")
+
+
+async def main(runs):
+    server = MockGarminServer(latency=0.05).start()
+    results = [await measure_once(scratch_env(server.base_url)) for _ in range(runs)]
+    for label, values in (("tools/list", [r[0] for r in results]),
+                          ("first tool call", [r[1] for r in results])):
+        print(f"{label:>16}: median {statistics.median(values) * 1000:.0f} ms, "
+              f"min {min(values) * 1000:.0f} ms over {runs} runs")
+    print(f"{'upstream requests':>16}: {server.requests}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
@@ -0,0 +1,341 @@
+"""
+Memory-mapped FIT file decoding with record messages decoded in batches into NumPy columns
+"""
+import array
+import mmap
+import os
+import shutil
+import struct
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Seconds between the Unix epoch and the FIT epoch (1989-12-31 00:00:00 UTC)
+FIT_EPOCH = 631065600
+SEMICIRCLES = 180.0 / 2 ** 31
+BATCH_SIZE = 16384
+
+MESG_FILE_ID = 0
+MESG_SESSION = 18
+MESG_LAP = 19
+MESG_RECORD = 20
+MESG_DEVICE_INFO = 23
+TIMESTAMP_FIELD = 253
+
+# Base type number -> (little-endian NumPy type, invalid value)
+BASE_TYPES = {
+    0x00: ("u1", 0xFF), 0x01: ("i1", 0x7F), 0x02: ("u1", 0xFF), 0x03: ("i2", 0x7FFF),
+    0x04: ("u2", 0xFFFF), 0x05: ("i4", 0x7FFFFFFF), 0x06: ("u4", 0xFFFFFFFF), 0x07: ("u1", 0x00),
+    0x08: ("f4", None), 0x09: ("f8", None), 0x0A: ("u1", 0x00), 0x0B: ("u2", 0x0000),
+    0x0C: ("u4", 0x00000000), 0x0D: ("u1", 0xFF), 0x0E: ("i8", 0x7FFFFFFFFFFFFFFF),
+    0x0F: ("u8", 0xFFFFFFFFFFFFFFFF), 0x10: ("u8", 0x0000000000000000),
+}
+
+# Field number -> (name, scale, offset) per message; value = raw / scale - offset
+RECORD_FIELDS = {
+    253: ("timestamp", 1, 0), 0: ("latitude", 1 / SEMICIRCLES, 0), 1: ("longitude", 1 / SEMICIRCLES, 0),
+    2: ("altitude", 5, 500), 78: ("enhanced_altitude", 5, 500), 3: ("heart_rate", 1, 0),
+    4: ("cadence", 1, 0), 5: ("distance", 100, 0), 6: ("speed", 1000, 0), 73: ("enhanced_speed", 1000, 0),
+    7: ("power", 1, 0), 13: ("temperature", 1, 0), 39: ("vertical_oscillation", 10, 0),
+    41: ("stance_time", 10, 0),
+}
+SESSION_FIELDS = {
+    253: ("timestamp", 1, 0), 2: ("start_time", 1, 0), 5: ("sport", 1, 0), 6: ("sub_sport", 1, 0),
+    7: ("total_elapsed_time", 1000, 0), 8: ("total_timer_time", 1000, 0), 9: ("total_distance", 100, 0),
+    11: ("total_calories", 1, 0), 14: ("avg_speed", 1000, 0), 16: ("avg_heart_rate", 1, 0),
+    17: ("max_heart_rate", 1, 0), 22: ("total_ascent", 1, 0), 23: ("total_descent", 1, 0),
+    20: ("avg_power", 1, 0), 21: ("max_power", 1, 0),
+}
+FILE_ID_FIELDS = {
+    0: ("type", 1, 0), 1: ("manufacturer", 1, 0), 2: ("product", 1, 0), 3: ("serial_number", 1, 0),
+    4: ("time_created", 1, 0),
+}
+DEVICE_INFO_FIELDS = {
+    253: ("timestamp", 1, 0), 0: ("device_index", 1, 0), 2: ("manufacturer", 1, 0),
+    3: ("serial_number", 1, 0), 4: ("product", 1, 0),
+}
+MESSAGE_FIELDS = {
+    MESG_FILE_ID: FILE_ID_FIELDS, MESG_SESSION: SESSION_FIELDS, MESG_LAP: SESSION_FIELDS,
+    MESG_RECORD: RECORD_FIELDS, MESG_DEVICE_INFO: DEVICE_INFO_FIELDS,
+}
+TIME_FIELDS = {"timestamp", "start_time", "time_created"}
+SPORTS = {0: "generic", 1: "running", 2: "cycling", 3: "transition", 4: "fitness_equipment", 5: "swimming",
+          10: "training", 11: "walking", 12: "cross_country_skiing", 13: "alpine_skiing", 15: "rowing",
+          17: "hiking", 18: "multisport", 19: "paddling"}
+
+
+class FitError(ValueError):
+    """Raised for files that are not valid FIT files"""
+
+
+class _Definition:
+    """Layout of the data messages that follow one definition message"""
+
+    def __init__(self, global_num: int, big_endian: bool, fields: List[Tuple[int, int, int]], size: int):
+        self.global_num = global_num
+        self.size = size
+        byte_order = ">" if big_endian else "<"
+        names, formats, offsets = [], [], []
+        position = 0
+        for number, field_size, base_type in fields:
+            dtype, _ = BASE_TYPES.get(base_type & 0x1F, ("u1", None))
+            item_size = np.dtype(dtype).itemsize
+            # Only scalar fields become columns, arrays and strings are skipped
+            if field_size == item_size and base_type & 0x1F != 0x07:
+                names.append(str(number))
+                formats.append(byte_order + dtype if item_size > 1 else dtype)
+                offsets.append(position)
+            position += field_size
+        self.invalid = {str(n): BASE_TYPES.get(t & 0x1F, ("u1", None))[1] for n, _, t in fields}
+        self.dtype = np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": size})
+        timestamp = [offset for name, offset in zip(names, offsets) if name == str(TIMESTAMP_FIELD)]
+        self.timestamp_offset = timestamp[0] if timestamp else None
+        self.timestamp_format = byte_order + "I"
+
+
+class FitFile:
+    """Read-only view of a FIT file
+
+    The file is memory-mapped and scanned once to find where each data message
+    starts. Messages of one definition are then gathered and decoded together
+    with NumPy, so no Python object is built per message.
+
+    Args:
+        path: Path of a .fit file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise FitError(f"{path} is empty")
+        self._buffer = np.frombuffer(self._map, dtype=np.uint8)
+        self.header = self._read_header()
+        # Definition -> offsets (and compressed-header timestamps) of its data messages
+        self._messages: Dict[_Definition, array.array] = {}
+        self._compressed: Dict[_Definition, Dict[int, int]] = {}
+        self._scan()
+
+    def __enter__(self) -> "FitFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        del self._buffer
+        self._map.close()
+        self._file.close()
+
+    def _read_header(self) -> Dict[str, Any]:
+        if len(self._map) < 12:
+            raise FitError(f"{self.path} is too short to be a FIT file")
+        header_size, protocol, profile, data_size = struct.unpack_from("<BBHI", self._map, 0)
+        if self._map[8:12] != b".FIT" or header_size not in (12, 14):
+            raise FitError(f"{self.path} is not a FIT file")
+        if header_size + data_size > len(self._map):
+            raise FitError(f"{self.path} is truncated")
+        return {"header_size": header_size, "protocol_version": protocol, "profile_version": profile,
+                "data_size": data_size}
+
+    def _scan(self) -> None:
+        """Walk the record headers once, collecting definitions and data message offsets"""
+        data = self._map
+        position = self.header["header_size"]
+        end = position + self.header["data_size"]
+        local: Dict[int, _Definition] = {}
+        last_timestamp = 0
+        while position < end:
+            record_header = data[position]
+            if record_header & 0x80:
+                # Compressed timestamp header: 5-bit offset from the last full timestamp
+                definition = local.get((record_header >> 5) & 0x03)
+                if definition is None:
+                    raise FitError(f"Data message without definition at byte {position}")
+                time_offset = record_header & 0x1F
+                last_timestamp += (time_offset - last_timestamp) & 0x1F
+                self._messages.setdefault(definition, array.array("q")).append(position + 1)
+                self._compressed.setdefault(definition, {})[position + 1] = last_timestamp
+                position += 1 + definition.size
+            elif record_header & 0x40:
+                position = self._read_definition(position, local)
+            else:
+                definition = local.get(record_header & 0x0F)
+                if definition is None:
+                    raise FitError(f"Data message without definition at byte {position}")
+                if definition.timestamp_offset is not None:
+                    last_timestamp, = struct.unpack_from(definition.timestamp_format, data,
+                                                         position + 1 + definition.timestamp_offset)
+                self._messages.setdefault(definition, array.array("q")).append(position + 1)
+                position += 1 + definition.size
+
+    def _read_definition(self, position: int, local: Dict[int, "_Definition"]) -> int:
+        record_header = self._map[position]
+        big_endian = self._map[position + 2] == 1
+        global_num, count = struct.unpack_from(">HB" if big_endian else "<HB", self._map, position + 3)
+        position += 6
+        fields = [tuple(self._map[position + 3 * i:position + 3 * i + 3]) for i in range(count)]
+        position += 3 * count
+        size = sum(f[1] for f in fields)
+        if record_header & 0x20:
+            # Developer fields follow the regular ones, their bytes are skipped
+            developer_count = self._map[position]
+            size += sum(self._map[position + 1 + 3 * i + 1] for i in range(developer_count))
+            position += 1 + 3 * developer_count
+        local[record_header & 0x0F] = _Definition(global_num, big_endian, fields, size)
+        return position
+
+    def count(self, global_num: int) -> int:
+        """Return the number of messages of a global message number"""
+        return sum(len(offsets) for d, offsets in self._messages.items() if d.global_num == global_num)
+
+    def _decode(self, definition: _Definition, offsets: np.ndarray, fields: Dict[int, Tuple[str, float, float]]
+                ) -> Dict[str, np.ndarray]:
+        # Gather each message's bytes into one contiguous (n, size) block and view it as a record array
+        block = self._buffer[offsets[:, None] + np.arange(definition.size)]
+        raw = np.ascontiguousarray(block).view(definition.dtype).reshape(-1)
+        columns = {}
+        for number, (name, scale, offset) in fields.items():
+            key = str(number)
+            if key not in definition.dtype.names:
+                continue
+            values = raw[key].astype(np.float64)
+            invalid = definition.invalid[key]
+            if invalid is not None:
+                values[raw[key] == invalid] = np.nan
+            columns[name] = values / scale - offset if scale != 1 or offset else values
+        compressed = self._compressed.get(definition)
+        if compressed and "timestamp" in [f[0] for f in fields.values()]:
+            stamps = columns.setdefault("timestamp", np.full(len(offsets), np.nan))
+            for i, message_offset in enumerate(offsets.tolist()):
+                if message_offset in compressed:
+                    stamps[i] = compressed[message_offset]
+        return columns
+
+    def iter_batches(self, global_num: int, fields: Optional[Dict[int, Tuple[str, float, float]]] = None,
+                     batch_size: int = BATCH_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield decoded columns for messages of one type, at most batch_size messages at a time
+
+        Batches follow file order. Fields missing from a definition are NaN columns.
+        """
+        fields = fields or MESSAGE_FIELDS.get(global_num, {})
+        names = [name for name, _, _ in fields.values()]
+        definitions = [d for d in self._messages if d.global_num == global_num and d.size]
+        if not definitions:
+            return
+        # Merge the offsets of all definitions back into file order, remembering each one's definition
+        offsets = np.concatenate([np.frombuffer(self._messages[d], dtype=np.int64) for d in definitions])
+        owners = np.concatenate([np.full(len(self._messages[d]), i) for i, d in enumerate(definitions)])
+        order = np.argsort(offsets, kind="stable")
+        offsets, owners = offsets[order], owners[order]
+        for start in range(0, len(offsets), batch_size):
+            chunk, chunk_owners = offsets[start:start + batch_size], owners[start:start + batch_size]
+            batch = {name: np.full(len(chunk), np.nan) for name in names}
+            for i, definition in enumerate(definitions):
+                mask = chunk_owners == i
+                if not mask.any():
+                    continue
+                for name, values in self._decode(definition, chunk[mask], fields).items():
+                    batch[name][mask] = values
+            yield batch
+
+    def messages(self, global_num: int, fields: Optional[Dict[int, Tuple[str, float, float]]] = None
+                 ) -> Dict[str, np.ndarray]:
+        """Decode all messages of one type into columns"""
+        batches = list(self.iter_batches(global_num, fields))
+        if not batches:
+            return {}
+        return {name: np.concatenate([b[name] for b in batches]) for name in batches[0]}
+
+    def streams(self) -> Dict[str, np.ndarray]:
+        """Record messages as the stream columns used by activity_streams
+
+        Times become Unix seconds plus an elapsed column, positions degrees, and the
+        enhanced altitude and speed fields are preferred over the 16-bit ones.
+        """
+        records = self.messages(MESG_RECORD)
+        if not records:
+            return {}
+        columns = {}
+        timestamps = records.pop("timestamp")
+        if not np.all(np.isnan(timestamps)):
+            columns["timestamp"] = timestamps + FIT_EPOCH
+            columns["elapsed"] = timestamps - np.nanmin(timestamps)
+        for name, enhanced in (("elevation", "enhanced_altitude"), ("speed", "enhanced_speed")):
+            base = records.pop("altitude" if name == "elevation" else "speed")
+            preferred = records.pop(enhanced)
+            columns[name] = np.where(np.isnan(preferred), base, preferred)
+        columns.update(records)
+        columns = {name: values for name, values in columns.items() if not np.all(np.isnan(values))}
+        if "speed" in columns:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pace = 1000.0 / columns["speed"]
+            pace[~np.isfinite(pace)] = np.nan
+            columns["pace"] = pace
+        return columns
+
+    def _scalars(self, global_num: int) -> List[Dict[str, Any]]:
+        columns = self.messages(global_num)
+        count = len(next(iter(columns.values()))) if columns else 0
+        rows = []
+        for i in range(count):
+            row = {}
+            for name, values in columns.items():
+                value = values[i]
+                if np.isnan(value):
+                    continue
+                row[name] = int(value) + FIT_EPOCH if name in TIME_FIELDS else float(value)
+            if "sport" in row:
+                row["sport"] = SPORTS.get(int(row["sport"]), str(int(row["sport"])))
+            rows.append(row)
+        return rows
+
+    def file_id(self) -> Dict[str, Any]:
+        """Return the file_id message (type, manufacturer, product, serial_number, time_created)"""
+        rows = self._scalars(MESG_FILE_ID)
+        return {k: int(v) if isinstance(v, float) else v for k, v in rows[0].items()} if rows else {}
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """Return session summaries with times as Unix seconds"""
+        return self._scalars(MESG_SESSION)
+
+    def device_serial(self) -> Optional[int]:
+        """Return the serial number of the recording device"""
+        serial = self.file_id().get("serial_number")
+        if serial is None:
+            devices = [d for d in self._scalars(MESG_DEVICE_INFO) if d.get("serial_number")]
+            creator = [d for d in devices if d.get("device_index") == 0] or devices
+            serial = int(creator[0]["serial_number"]) if creator else None
+        return serial
+
+    def start_time(self) -> Optional[int]:
+        """Return the activity start time as Unix seconds"""
+        sessions = self.sessions()
+        if sessions and "start_time" in sessions[0]:
+            return sessions[0]["start_time"]
+        return self.file_id().get("time_created")
+
+
+def resolve_fit_path(path: str) -> str:
+    """Return a .fit path for a FIT file or a Garmin original download zip
+
+    The first .fit member of a zip is extracted next to it once and reused.
+    """
+    path = os.path.expanduser(path)
+    if not zipfile.is_zipfile(path):
+        return path
+    extracted = os.path.splitext(path)[0] + ".fit"
+    if not os.path.exists(extracted):
+        with zipfile.ZipFile(path) as archive:
+            members = [m for m in archive.namelist() if m.lower().endswith(".fit")]
+            if not members:
+                raise FitError(f"{path} contains no FIT file")
+            tmp_path = f"{extracted}.{os.getpid()}.tmp"
+            with archive.open(members[0]) as source, open(tmp_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(tmp_path, extracted)
+    return extracted
@@ -0,0 +1,231 @@
+"""
+Multi-account client pool: lazy per-account login, idle session eviction and
+per-account rate and concurrency budgets
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Annotated, Any, Callable, Dict, Optional, Set
+
+from pydantic import Field
+
+from activity_index import ActivityIndex, activity_index
+from garmin_auth import default_token_dir, login_client, start_token_refresh
+from garmin_executor import Admission, current_admission
+from garmin_export import EXPORT_DIR
+from garmin_files import FileStore, file_store
+from garmin_governor import MAX_CONCURRENCY, RATE_BURST, RATE_LIMIT, RequestGovernor, TokenBucket, install_governor
+from garmin_static import StaticData, static_data
+from upload_index import UploadIndex, upload_index
+from workout_index import WorkoutIndex, workout_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACCOUNT = "default"
+ACCOUNTS_FILE = os.path.expanduser(os.getenv("GARMIN_ACCOUNTS_FILE", ""))
+ACCOUNTS_DIR = os.path.expanduser(os.getenv("GARMIN_ACCOUNTS_DIR", "~/.cache/garmin-mcp/accounts"))
+MAX_SESSIONS = int(os.getenv("GARMIN_MAX_SESSIONS", "32"))
+SESSION_IDLE_TIMEOUT = float(os.getenv("GARMIN_SESSION_IDLE_TIMEOUT", "1800"))
+
+# Account selected for the current tool call; copied into worker threads by run_blocking
+current_account: contextvars.ContextVar[str] = contextvars.ContextVar("garmin_account", default=DEFAULT_ACCOUNT)
+
+AccountSelector = Annotated[str, Field(
+    description="Name of the Garmin account to act for (default: the GARMIN_EMAIL account)")]
+
+
+class GarminAccount:
+    """Credentials, budgets, session and local stores of one Garmin Connect account
+
+    The session (logged-in client and its token refresh thread) is created on
+    first use and can be closed when idle. The local stores stay open.
+    """
+
+    def __init__(self, name: str, email: Optional[str], password: Optional[str], token_dir: str,
+                 data_dir: Optional[str] = None, rate_limit: float = RATE_LIMIT, rate_burst: int = RATE_BURST,
+                 max_concurrency: int = MAX_CONCURRENCY):
+        self.name = name
+        self.email = email
+        self.password = password
+        self.token_dir = token_dir
+        self.governor = RequestGovernor(TokenBucket(rate_limit, rate_burst), max_concurrency=max_concurrency)
+        self.admission = Admission(name, bucket=self.governor.bucket)
+        if data_dir is None:
+            # The default account keeps the single-account locations
+            self.activity_index, self.upload_index, self.file_store = activity_index, upload_index, file_store
+            self.workout_index = workout_index
+            self.static_data, self.export_dir = static_data, EXPORT_DIR
+        else:
+            self.activity_index = ActivityIndex(os.path.join(data_dir, "activities.db"))
+            self.upload_index = UploadIndex(os.path.join(data_dir, "uploads.db"))
+            self.workout_index = WorkoutIndex(os.path.join(data_dir, "workouts.db"))
+            self.file_store = FileStore(os.path.join(data_dir, "files"))
+            self.static_data = StaticData()
+            self.export_dir = os.path.join(data_dir, "exports")
+        # Workout IDs known to exist, so scheduling them needs no lookup
+        self.verified_workouts: Set[int] = set()
+        self.client = None
+        self.last_used = 0.0
+        self.logins = 0
+        self._stop: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+
+    def session(self):
+        """Return the logged-in client, logging in (from stored tokens if possible) on first use"""
+        with self._lock:
+            self.last_used = time.monotonic()
+            if self.client is None:
+                client = login_client(self.email, self.password, self.token_dir)
+                install_governor(client, self.governor)
+                self._stop = threading.Event()
+                start_token_refresh(client, self.token_dir, self._stop)
+                self.client = client
+                self.logins += 1
+            return self.client
+
+    def close(self) -> None:
+        """Drop the session. Tokens stay on disk, so the next use logs in without credentials."""
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+            self.client = None
+            self._stop = None
+            self.static_data.invalidate()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return session state and request budget counters"""
+        idle = time.monotonic() - self.last_used if self.last_used else None
+        return {"account": self.name, "logged_in": self.client is not None, "logins": self.logins,
+                "idle_seconds": round(idle, 1) if idle is not None else None, "governor": self.governor.snapshot(),
+                "admission": self.admission.snapshot()}
+
+
+class AccountPool:
+    """Known accounts by name, with at most max_sessions logged-in sessions
+
+    Accounts come from GARMIN_ACCOUNTS_FILE, a JSON object mapping names to
+    {"email", "password", "rate_limit", "rate_burst", "max_concurrency"}
+    (all optional), and from subdirectories of GARMIN_ACCOUNTS_DIR holding
+    stored tokens. The default account is configured by GARMIN_EMAIL and
+    GARMIN_PASSWORD. Sessions idle for longer than idle_timeout, and the least
+    recently used ones beyond max_sessions, are closed.
+    """
+
+    def __init__(self, accounts_file: str = ACCOUNTS_FILE, directory: str = ACCOUNTS_DIR,
+                 max_sessions: int = MAX_SESSIONS, idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        self.accounts_file = accounts_file
+        self.directory = directory
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self._accounts: Dict[str, GarminAccount] = {}
+        # Accounts with a session, least recently used first
+        self._sessions: "OrderedDict[str, GarminAccount]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"evicted_idle": 0, "evicted_lru": 0}
+
+    def _settings(self) -> Dict[str, Dict[str, Any]]:
+        if not self.accounts_file:
+            return {}
+        with open(self.accounts_file) as f:
+            return json.load(f)
+
+    def _create(self, name: str) -> GarminAccount:
+        if name == DEFAULT_ACCOUNT:
+            return GarminAccount(name, os.getenv("GARMIN_EMAIL"), os.getenv("GARMIN_PASSWORD"), default_token_dir())
+        data_dir = os.path.join(self.directory, name)
+        settings = self._settings().get(name)
+        if settings is None and not os.path.isdir(os.path.join(data_dir, "tokens")):
+            raise ValueError(f"Unknown Garmin account {name!r}")
+        settings = settings or {}
+        return GarminAccount(
+            name, settings.get("email"), settings.get("password"), os.path.join(data_dir, "tokens"), data_dir,
+            float(settings.get("rate_limit", RATE_LIMIT)), int(settings.get("rate_burst", RATE_BURST)),
+            int(settings.get("max_concurrency", MAX_CONCURRENCY)))
+
+    def get(self, name: str = "") -> GarminAccount:
+        """Return the account called name (the default account for ""), without logging in"""
+        name = name or DEFAULT_ACCOUNT
+        with self._lock:
+            account = self._accounts.get(name)
+            if account is None:
+                if name != DEFAULT_ACCOUNT and (os.sep in name or name.startswith(".")):
+                    raise ValueError(f"Invalid account name {name!r}")
+                account = self._accounts[name] = self._create(name)
+            return account
+
+    def client(self, name: str = ""):
+        """Return the logged-in client of an account, closing idle and surplus sessions"""
+        account = self.get(name)
+        client = account.session()
+        with self._lock:
+            self._sessions[account.name] = account
+            self._sessions.move_to_end(account.name)
+            evict = []
+            now = time.monotonic()
+            for other in list(self._sessions.values())[:-1]:
+                if self.idle_timeout and now - other.last_used > self.idle_timeout:
+                    evict.append(other)
+                    self.stats["evicted_idle"] += 1
+            surplus = len(self._sessions) - len(evict) - self.max_sessions
+            for other in list(self._sessions.values())[:-1]:
+                if surplus <= 0:
+                    break
+                if other not in evict:
+                    evict.append(other)
+                    self.stats["evicted_lru"] += 1
+                    surplus -= 1
+            for other in evict:
+                del self._sessions[other.name]
+        for other in evict:
+            logger.info("Closing idle Garmin session of account %s", other.name)
+            other.close()
+        return client
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return pool settings, eviction counters and the state of each known account"""
+        with self._lock:
+            accounts = list(self._accounts.values())
+            sessions = len(self._sessions)
+        return dict(self.stats, max_sessions=self.max_sessions, idle_timeout=self.idle_timeout,
+                    sessions=sessions, accounts=[a.snapshot() for a in accounts])
+
+
+account_pool = AccountPool()
+
+
+def current() -> GarminAccount:
+    """Return the account selected for the current tool call"""
+    return account_pool.get(current_account.get())
+
+
+def with_account(tool: Callable) -> Callable:
+    """Add an account selector argument to an async tool
+
+    The selected account is validated and set as current_account while the
+    tool runs, so get_client() and the per-account stores resolve to it.
+    """
+    @functools.wraps(tool)
+    async def wrapper(*args, account: str = "", **kwargs):
+        try:
+            selected = account_pool.get(account)
+        except (ValueError, OSError) as e:
+            return f"Error selecting account: {str(e)}"
+        token = current_account.set(selected.name)
+        admission = current_admission.set(selected.admission)
+        try:
+            return await tool(*args, **kwargs)
+        finally:
+            current_admission.reset(admission)
+            current_account.reset(token)
+
+    signature = inspect.signature(tool)
+    selector = inspect.Parameter("account", inspect.Parameter.KEYWORD_ONLY, default="", annotation=AccountSelector)
+    wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), selector])
+    wrapper.__annotations__ = {**tool.__annotations__, "account": AccountSelector}
+    return wrapper
@@ -0,0 +1,132 @@
+"""
+Persistent token store and background token refresh for the Garmin client
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from garmin_http import mount_pool
+
+if TYPE_CHECKING:
+    from garminconnect import Garmin
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FILE = "profile.json"
+# Refresh the OAuth2 access token this many seconds before it expires
+REFRESH_MARGIN = int(os.getenv("GARMIN_TOKEN_REFRESH_MARGIN", "600"))
+REFRESH_RETRY_DELAY = 60
+
+
+def default_token_dir() -> str:
+    """Return the token directory, honoring the GARMINTOKENS variable used by garminconnect"""
+    return os.path.expanduser(os.getenv("GARMINTOKENS", "~/.garminconnect"))
+
+
+def save_tokens(client: "Garmin", token_dir: str) -> None:
+    """Write the garth OAuth tokens and cached profile fields to token_dir"""
+    os.makedirs(token_dir, mode=0o700, exist_ok=True)
+    client.garth.dump(token_dir)
+    profile = {
+        "display_name": client.display_name,
+        "full_name": client.full_name,
+        "unit_system": client.unit_system,
+    }
+    with open(os.path.join(token_dir, PROFILE_FILE), "w") as f:
+        json.dump(profile, f)
+    for name in os.listdir(token_dir):
+        os.chmod(os.path.join(token_dir, name), 0o600)
+
+
+def _load_profile(client: "Garmin", token_dir: str) -> None:
+    path = os.path.join(token_dir, PROFILE_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            profile = json.load(f)
+        client.display_name = profile.get("display_name")
+        client.full_name = profile.get("full_name")
+        client.unit_system = profile.get("unit_system")
+    if not client.display_name:
+        # Older token directories have no cached profile, fetch it once
+        client.display_name = client.garth.profile["displayName"]
+        client.full_name = client.garth.profile["fullName"]
+        settings = client.garth.connectapi(client.garmin_connect_user_settings_url)
+        client.unit_system = settings["userData"]["measurementSystem"]
+        save_tokens(client, token_dir)
+
+
+def _resume_session(client: "Garmin", token_dir: str) -> bool:
+    """Load stored tokens into client, returning False if they cannot be used"""
+    if not os.path.exists(os.path.join(token_dir, "oauth1_token.json")):
+        return False
+    try:
+        client.garth.load(token_dir)
+    except Exception as e:
+        logger.warning("Ignoring unreadable Garmin token store %s: %s", token_dir, e)
+        return False
+    if client.garth.oauth2_token.refresh_expired:
+        # The OAuth1 token can still mint a new access token
+        client.garth.refresh_oauth2()
+    _load_profile(client, token_dir)
+    return True
+
+
+def login_client(email: Optional[str], password: Optional[str], token_dir: Optional[str] = None) -> "Garmin":
+    """Create a logged-in Garmin client, reusing stored tokens when possible
+
+    Args:
+        email: Garmin Connect email, only used when no stored tokens exist
+        password: Garmin Connect password, only used when no stored tokens exist
+        token_dir: Directory for stored tokens (default: GARMINTOKENS or ~/.garminconnect)
+    """
+    # Deferred so that importing the server does not pay for garminconnect/garth
+    from garminconnect import Garmin
+
+    token_dir = token_dir or default_token_dir()
+    client = Garmin(email, password)
+    # GARMIN_BASE_URL sends every request to a local stand-in server instead
+    base_url = os.getenv("GARMIN_BASE_URL")
+    mount_pool(client, base_url)
+    if not _resume_session(client, token_dir):
+        logger.info("No usable Garmin tokens in %s, logging in with credentials", token_dir)
+        client.login()
+        save_tokens(client, token_dir)
+    # garth.load() and login() remount garth's default adapter, so mount the pool again
+    mount_pool(client, base_url)
+    return client
+
+
+def _seconds_until_refresh(client: "Garmin") -> float:
+    token = client.garth.oauth2_token
+    expires_at = getattr(token, "expires_at", 0)
+    return max(expires_at - REFRESH_MARGIN - time.time(), 0)
+
+
+def start_token_refresh(client: "Garmin", token_dir: Optional[str] = None,
+                        stop: Optional[threading.Event] = None) -> threading.Thread:
+    """Refresh the OAuth2 token in a daemon thread shortly before it expires
+
+    Args:
+        client: Logged-in Garmin client
+        token_dir: Directory the refreshed tokens are written to
+        stop: Event that ends the thread when set, e.g. when the session is closed
+    """
+    token_dir = token_dir or default_token_dir()
+    stop = stop or threading.Event()
+
+    def refresh_loop():
+        while not stop.wait(_seconds_until_refresh(client)):
+            try:
+                client.garth.refresh_oauth2()
+                save_tokens(client, token_dir)
+                logger.info("Refreshed Garmin OAuth2 token")
+            except Exception as e:
+                logger.warning("Garmin token refresh failed: %s", e)
+                stop.wait(REFRESH_RETRY_DELAY)
+
+    thread = threading.Thread(target=refresh_loop, name="garmin-token-refresh", daemon=True)
+    thread.start()
+    return thread
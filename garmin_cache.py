@@ -0,0 +1,288 @@
+"""
+Tiered response cache (in-memory LRU plus on-disk store) for Garmin data
+"""
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+MEMORY_ENTRIES = int(os.getenv("GARMIN_CACHE_SIZE", "1024"))
+CACHE_DIR = os.path.expanduser(os.getenv("GARMIN_CACHE_DIR", "~/.cache/garmin-mcp"))
+TODAY_TTL = int(os.getenv("GARMIN_CACHE_TODAY_TTL", "300"))
+RECENT_TTL = int(os.getenv("GARMIN_CACHE_RECENT_TTL", "3600"))
+HISTORICAL_TTL = int(os.getenv("GARMIN_CACHE_HISTORICAL_TTL", str(90 * 24 * 3600)))
+# Per-activity data only changes through writes, which invalidate it
+ACTIVITY_TTL = int(os.getenv("GARMIN_CACHE_ACTIVITY_TTL", str(24 * 3600)))
+# Days after which a day's data is considered final
+FINAL_AFTER_DAYS = int(os.getenv("GARMIN_CACHE_FINAL_AFTER_DAYS", "3"))
+
+MISSING = object()
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    account TEXT NOT NULL,
+    method TEXT NOT NULL,
+    start TEXT,
+    end TEXT,
+    activity_id INTEGER,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_method_date ON entries (account, method, start, end);
+CREATE INDEX IF NOT EXISTS entries_method_activity ON entries (account, method, activity_id);
+"""
+# Invalidation times older than this cannot race a fetch any more and are forgotten
+INVALIDATION_WINDOW = 600
+
+
+def ttl_for_date(cdate: Any) -> int:
+    """Return how long data for cdate may be cached: short for today, long for finalized days
+
+    Args:
+        cdate: Date in YYYY-MM-DD format (or a datetime.date)
+    """
+    try:
+        day = datetime.date.fromisoformat(str(cdate)[:10])
+    except ValueError:
+        return TODAY_TTL
+    age = (datetime.date.today() - day).days
+    if age <= 0:
+        return TODAY_TTL
+    if age < FINAL_AFTER_DAYS:
+        return RECENT_TTL
+    return HISTORICAL_TTL
+
+
+def make_key(name: str, *args, **kwargs) -> str:
+    """Build a cache key from a tool or method name and its arguments"""
+    return json.dumps([name, list(args), kwargs], sort_keys=True, default=str)
+
+
+class TieredCache:
+    """LRU memory cache backed by one JSON file per entry on disk
+
+    Only JSON-serializable values are stored. Entries carry an absolute expiry
+    time and are dropped from both tiers once it has passed.
+
+    Entries can be stored with a scope (the method and the date range or
+    activity they cover), recorded in a SQLite index, so that a write can
+    invalidate exactly the entries it affects.
+    """
+
+    def __init__(self, max_entries: int = MEMORY_ENTRIES, directory: Optional[str] = CACHE_DIR):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._index: Optional[sqlite3.Connection] = None
+        # (account, method, date or ("activity", id)) -> monotonic time of its last invalidation
+        self._invalidated: Dict[Tuple[str, Optional[str], Any], float] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "expired": 0,
+                      "invalidated": 0, "stale_skipped": 0}
+
+    def _connect_index(self) -> sqlite3.Connection:
+        # Called with self._lock held; one shared connection serialized by the lock
+        if self._index is None:
+            path = ":memory:"
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                path = os.path.join(self.directory, "index.db")
+            self._index = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._index.executescript(INDEX_SCHEMA)
+        return self._index
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_memory(self, key: str) -> Any:
+        """Return the value from the memory tier, or MISSING"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._memory[key]
+                self.stats["expired"] += 1
+                return MISSING
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return value
+
+    def get(self, key: str) -> Any:
+        """Return the cached value from memory or disk, or MISSING. Disk reads block."""
+        value = self.get_memory(key)
+        if value is not MISSING:
+            return value
+        entry = self._read_file(key) if self.directory else None
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return MISSING
+            if entry["expires_at"] < time.time():
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+            else:
+                self._remember(key, entry["expires_at"], entry["value"])
+                self.stats["disk_hits"] += 1
+                return entry["value"]
+        self._remove_file(self._path(key))
+        return MISSING
+
+    def set(self, key: str, value: Any, ttl: int, scope: Optional[Dict[str, Any]] = None,
+            since: Optional[float] = None) -> None:
+        """Store value in both tiers for ttl seconds. Disk writes block.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Lifetime in seconds
+            scope: What the entry covers: account and method plus start/end dates or activity_id
+            since: time.monotonic() at which the value was fetched. The value is not
+                stored if its scope was invalidated after that, as it may be stale.
+        """
+        expires_at = time.time() + ttl
+        try:
+            encoded = json.dumps({"expires_at": expires_at, "value": value})
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            if scope and since is not None and self._invalidated_after(scope, since):
+                self.stats["stale_skipped"] += 1
+                return
+            stored_at = time.monotonic()
+            self._remember(key, expires_at, value)
+            self.stats["stores"] += 1
+            if scope:
+                self._connect_index().execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, scope.get("account", ""), scope["method"], scope.get("start"), scope.get("end"), scope.get("activity_id"),
+                     expires_at))
+                self._index.commit()
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(encoded)
+            os.replace(tmp_path, path)
+            if scope:
+                with self._lock:
+                    # An invalidation between storing and writing the file may have
+                    # removed the file before it was written
+                    invalidated = self._invalidated_after(scope, stored_at)
+                if invalidated:
+                    self._remove_file(path)
+
+    def _read_file(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def delete(self, key: str) -> None:
+        """Remove key from both tiers"""
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.directory:
+            self._remove_file(self._path(key))
+
+    @staticmethod
+    def _scope_marks(scope: Dict[str, Any]) -> List[Tuple[str, Optional[str], Any]]:
+        account = scope.get("account", "")
+        if scope.get("activity_id") is not None:
+            return [(account, scope["method"], ("activity", scope["activity_id"]))]
+        if not scope.get("start"):
+            return []
+        first = datetime.date.fromisoformat(scope["start"][:10])
+        last = datetime.date.fromisoformat((scope.get("end") or scope["start"])[:10])
+        return [(account, scope["method"], (first + datetime.timedelta(days=i)).isoformat())
+                for i in range((last - first).days + 1)]
+
+    def _invalidated_after(self, scope: Dict[str, Any], since: float) -> bool:
+        try:
+            marks = self._scope_marks(scope)
+        except ValueError:
+            return False
+        # A mark without a method is an invalidation of every date-keyed entry of that date
+        marks += [(account, None, value) for account, _, value in marks if not isinstance(value, tuple)]
+        return any(self._invalidated.get(mark, 0) > since for mark in marks)
+
+    def invalidate(self, method: Optional[str], date: Optional[str] = None, activity_id: Optional[int] = None,
+                   account: str = "") -> int:
+        """Remove the entries of an account's method that cover date, or that belong to activity_id
+
+        Returns the number of entries removed. With method None every entry
+        covering date is removed. Blocks on disk and index access.
+        """
+        now = time.monotonic()
+        with self._lock:
+            conn = self._connect_index()
+            if activity_id is not None:
+                mark = (account, method, ("activity", activity_id))
+                where, params = "account = ? AND method = ? AND activity_id = ?", (account, method, activity_id)
+            else:
+                mark = (account, method, date)
+                where, params = "account = ? AND start <= ? AND end >= ?", (account, date, date)
+                if method is not None:
+                    where, params = "method = ? AND " + where, (method,) + params
+            self._invalidated[mark] = now
+            if len(self._invalidated) > 4096:
+                self._invalidated = {m: t for m, t in self._invalidated.items() if t > now - INVALIDATION_WINDOW}
+            keys = [row[0] for row in conn.execute(f"SELECT key FROM entries WHERE {where}", params)]
+            conn.execute(f"DELETE FROM entries WHERE {where}", params)
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+            for key in keys:
+                self._memory.pop(key, None)
+            self.stats["invalidated"] += len(keys)
+        if self.directory:
+            for key in keys:
+                self._remove_file(self._path(key))
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._connect_index().execute("DELETE FROM entries")
+            self._index.commit()
+        if self.directory and os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(".json"):
+                        self._remove_file(os.path.join(root, name))
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["directory"] = self.directory
+        return stats
+
+
+response_cache = TieredCache()
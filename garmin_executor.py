@@ -0,0 +1,176 @@
+"""
+Shared executor layer for blocking Garmin Connect calls
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """Parse a "tool=n,tool=n" string into a per-tool limit mapping"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        limits[name.strip()] = int(value)
+    return limits
+
+
+MAX_WORKERS = int(os.getenv("GARMIN_MAX_WORKERS", "16"))
+DEFAULT_TOOL_CONCURRENCY = int(os.getenv("GARMIN_TOOL_CONCURRENCY", "4"))
+TOOL_LIMITS = _parse_limits(os.getenv("GARMIN_TOOL_LIMITS", ""))
+# Worker threads one account may occupy at once, so a few busy accounts cannot take the whole pool
+ACCOUNT_WORKERS = int(os.getenv("GARMIN_ACCOUNT_WORKERS", str(max(1, MAX_WORKERS // 4))))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="garmin")
+# (account, tool) -> semaphore, tool limits apply per account
+_semaphores: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+class Ticket:
+    """Rate limit token taken on the event loop for one admitted call, spent by its first request"""
+
+    def __init__(self, bucket: Any = None):
+        self._held: List[Any] = [bucket] if bucket is not None else []
+
+    def spend(self, bucket: Any) -> bool:
+        """Use the token if it was taken from bucket and is still unused"""
+        try:
+            # list.remove is atomic, so a token is spent at most once across threads
+            self._held.remove(bucket)
+            return True
+        except ValueError:
+            return False
+
+    def refund(self) -> None:
+        """Give an unused token back to its bucket"""
+        for bucket in list(self._held):
+            if self.spend(bucket):
+                bucket.release()
+
+
+class Admission:
+    """Per-account admission to the worker pool, waited for on the event loop
+
+    Calls of one account hold at most workers threads, and take a token from
+    the account's rate limit before taking one, instead of sleeping in it.
+    Calls that send no request (cache hits) give the token back.
+
+    Args:
+        name: Account name
+        workers: Most worker threads the account's calls may hold at once
+        bucket: The account's rate limit, with try_acquire() and release() like governor.TokenBucket
+    """
+
+    def __init__(self, name: str, workers: int = ACCOUNT_WORKERS, bucket: Any = None):
+        self.name = name
+        self.workers = max(1, workers)
+        self.bucket = bucket
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+
+    @contextlib.asynccontextmanager
+    async def admit(self) -> AsyncIterator[Ticket]:
+        """Wait for a worker slot and a rate limit token of the account, yielding the token as a Ticket"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        ticket = None
+        try:
+            # Reserved one at a time, so waiters wake as tokens become available instead of all at once
+            delay = self.bucket.try_acquire() if self.bucket is not None else 0
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self.bucket.try_acquire()
+            ticket = Ticket(self.bucket)
+            yield ticket
+        finally:
+            if ticket is not None:
+                ticket.refund()
+            self._slots.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        busy = self.workers - self._slots._value if self._slots is not None else 0
+        return {"workers": self.workers, "busy": busy, "waiting": self.waiting}
+
+
+# Admission of the account selected for the current tool call, set by garmin_accounts.with_account
+current_admission: contextvars.ContextVar[Optional[Admission]] = contextvars.ContextVar(
+    "garmin_admission", default=None)
+# Ticket of the call running in a worker thread, set by run_blocking
+current_ticket: contextvars.ContextVar[Optional[Ticket]] = contextvars.ContextVar("garmin_ticket", default=None)
+
+
+def _tool_state(tool: str, scope: str = ""):
+    if tool not in _stats:
+        _stats[tool] = {"limit": TOOL_LIMITS.get(tool, DEFAULT_TOOL_CONCURRENCY), "queued": 0, "running": 0,
+                        "max_queued": 0, "completed": 0, "failed": 0}
+    stats = _stats[tool]
+    semaphore = _semaphores.get((scope, tool))
+    if semaphore is None:
+        semaphore = _semaphores[(scope, tool)] = asyncio.Semaphore(stats["limit"])
+    return semaphore, stats
+
+
+async def run_blocking(tool: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking call in the shared worker pool under the tool's concurrency limit
+
+    Within an account's tool call, the tool limit applies per account and the
+    call is admitted by the account's Admission, with a rate limit token for
+    its first request, before it takes a thread.
+
+    Args:
+        tool: Name used for the per-tool concurrency limit and metrics
+        func: Blocking callable to run
+        *args, **kwargs: Arguments passed to func
+    """
+    admission = current_admission.get()
+    semaphore, stats = _tool_state(tool, admission.name if admission else "")
+    stats["queued"] += 1
+    stats["max_queued"] = max(stats["max_queued"], stats["queued"])
+    try:
+        await semaphore.acquire()
+    finally:
+        stats["queued"] -= 1
+    stats["running"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context into the worker thread
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        if admission is None:
+            result = await loop.run_in_executor(_executor, call)
+        else:
+            async with admission.admit() as ticket:
+                ctx.run(current_ticket.set, ticket)
+                result = await loop.run_in_executor(_executor, call)
+        stats["completed"] += 1
+        return result
+    except BaseException:
+        stats["failed"] += 1
+        raise
+    finally:
+        stats["running"] -= 1
+        semaphore.release()
+
+
+def executor_stats() -> Dict[str, Any]:
+    """Return worker pool settings and per-tool queue depth counters"""
+    return {
+        "max_workers": MAX_WORKERS,
+        "default_tool_concurrency": DEFAULT_TOOL_CONCURRENCY,
+        "account_workers": ACCOUNT_WORKERS,
+        "queued": sum(s["queued"] for s in _stats.values()),
+        "running": sum(s["running"] for s in _stats.values()),
+        "tools": {name: dict(s) for name, s in _stats.items()},
+    }
@@ -0,0 +1,151 @@
+"""
+Resumable bulk export of activity files into a single zip or tar archive
+"""
+import json
+import os
+import tarfile
+import time
+import zipfile
+from typing import Any, Dict, List, Optional
+
+from garmin_files import ACTIVITY_FORMATS
+
+EXPORT_DIR = os.path.expanduser(os.getenv("GARMIN_EXPORT_DIR", "~/.cache/garmin-mcp/exports"))
+EXPORT_CONCURRENCY = int(os.getenv("GARMIN_EXPORT_CONCURRENCY", "4"))
+
+FORMAT_CODES = {name: code for code, (name, _, _) in ACTIVITY_FORMATS.items()}
+ARCHIVE_TYPES = ("zip", "tar", "tar.gz")
+
+
+class ExportManifest:
+    """Append-only JSON lines record of an export's activity list and finished downloads
+
+    The first line holds the export parameters and the activity list, each later
+    line one download result. Appending keeps progress durable after every file
+    without rewriting the manifest, and a rerun replays it to skip finished work.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header: Optional[Dict[str, Any]] = None
+        self.entries: Dict[int, Dict[str, Any]] = {}
+
+    def load(self) -> bool:
+        """Replay the manifest from disk, returning False if there is none"""
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except OSError:
+            return False
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave the last line half written
+                continue
+            if "activities" in record:
+                self.header = record
+            elif self.header is not None:
+                self.entries[record["activity_id"]] = record
+        return self.header is not None
+
+    def start(self, header: Dict[str, Any]) -> None:
+        """Begin a new manifest, discarding any previous one"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.header = header
+        self.entries = {}
+        with open(self.path, "w") as f:
+            f.write(json.dumps(header) + "\n")
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Append one download result"""
+        self.entries[entry["activity_id"]] = entry
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def done(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        """Return the finished download for an activity if its stored file still exists"""
+        entry = self.entries.get(activity_id)
+        if entry and entry.get("status") == "ok" and os.path.exists(entry["path"]):
+            return entry
+        return None
+
+    def complete(self, summary: Dict[str, Any]) -> None:
+        """Mark the export as finished by rewriting the header with its summary"""
+        self.header = dict(self.header, completed_at=time.time(), summary=summary)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for record in [self.header, *self.entries.values()]:
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+class ArchiveWriter:
+    """Adds stored files to a zip or tar archive one at a time, reading each from disk in chunks
+
+    The archive is written to a temporary name and moved into place on close, so
+    an interrupted export never leaves a truncated archive behind.
+    """
+
+    def __init__(self, path: str, archive: str):
+        self.path = path
+        self.tmp_path = path + ".partial"
+        self.archive = archive
+        if archive == "zip":
+            self._file = zipfile.ZipFile(self.tmp_path, "w", allowZip64=True)
+        else:
+            self._file = tarfile.open(self.tmp_path, "w:gz" if archive == "tar.gz" else "w")
+
+    def add(self, path: str, name: str) -> None:
+        if self.archive == "zip":
+            # Original downloads are zip files already, compress only the text formats
+            compression = zipfile.ZIP_STORED if path.endswith(".zip") else zipfile.ZIP_DEFLATED
+            self._file.write(path, name, compress_type=compression)
+        else:
+            self._file.add(path, name, recursive=False)
+
+    def close(self) -> None:
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        os.remove(self.tmp_path)
+
+
+def export_paths(start: str, end: str, fmt: str, archive: str, directory: str = EXPORT_DIR) -> Dict[str, str]:
+    """Return the archive and manifest paths of an export"""
+    base = os.path.join(directory, f"activities_{start}_{end}_{fmt}")
+    return {"archive": f"{base}.{archive}", "manifest": f"{base}.manifest.jsonl"}
+
+
+def member_name(activity: Dict[str, Any], ext: str) -> str:
+    """Archive member name of an activity file, sortable by start time"""
+    started = (activity.get("startTimeLocal") or "")[:10]
+    return f"{started}_{activity['activityId']}.{ext}" if started else f"{activity['activityId']}.{ext}"
+
+
+def list_entry(activity: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only what the manifest needs from an activity summary"""
+    return {"activityId": activity["activityId"], "startTimeLocal": activity.get("startTimeLocal"),
+            "activityName": activity.get("activityName")}
+
+
+def validate_export(fmt: str, archive: str) -> None:
+    if fmt not in FORMAT_CODES:
+        raise ValueError(f"fmt must be one of {', '.join(FORMAT_CODES)}")
+    if archive not in ARCHIVE_TYPES:
+        raise ValueError(f"archive must be one of {', '.join(ARCHIVE_TYPES)}")
+
+
+def summarize_export(activities: List[Dict[str, Any]], manifest: ExportManifest) -> Dict[str, Any]:
+    entries = [manifest.entries.get(a["activityId"]) or {} for a in activities]
+    failed = {e["activity_id"]: e.get("error") for e in entries if e.get("status") == "error"}
+    return {
+        "activities": len(activities),
+        "exported": sum(1 for e in entries if e.get("status") == "ok"),
+        "bytes": sum(e.get("size", 0) for e in entries if e.get("status") == "ok"),
+        "failed": failed,
+    }
@@ -0,0 +1,135 @@
+"""
+Content-addressed local store for files downloaded from Garmin Connect
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+STORE_DIR = os.path.expanduser(os.getenv("GARMIN_FILE_STORE", "~/.cache/garmin-mcp/files"))
+CHUNK_SIZE = 64 * 1024
+
+# download_activity dl_fmt -> (format name, Garmin client attribute holding the download path, file extension)
+ACTIVITY_FORMATS = {
+    1: ("original", "garmin_connect_fit_download", "zip"),
+    2: ("tcx", "garmin_connect_tcx_download", "tcx"),
+    3: ("gpx", "garmin_connect_gpx_download", "gpx"),
+    4: ("kml", "garmin_connect_kml_download", "kml"),
+    5: ("csv", "garmin_connect_csv_download", "csv"),
+}
+
+
+class FileStore:
+    """Stores file contents once under their SHA-256 and maps download keys to them
+
+    Objects live in objects/<first 2 hex digits>/<sha256>.<ext> and refs in
+    refs/<key>.json, so a download that was already stored needs no request.
+    """
+
+    def __init__(self, directory: str = STORE_DIR):
+        self.directory = directory
+
+    def _object_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.{ext}")
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(self.directory, "refs", key + ".json")
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for key, or None if missing or its object was removed"""
+        try:
+            with open(self._ref_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if os.path.exists(entry["path"]) else None
+
+    def put(self, key: str, chunks: Iterable[bytes], ext: str) -> Dict[str, Any]:
+        """Stream chunks to disk while hashing them and record the result under key
+
+        Args:
+            key: Download key such as "activity/123.tcx"
+            chunks: Byte chunks of the file
+            ext: File extension of the stored object
+        """
+        tmp_dir = os.path.join(self.directory, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, f"{threading.get_ident()}-{time.time_ns()}")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in chunks:
+                    if chunk:
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            path = self._object_path(digest.hexdigest(), ext)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Identical content maps to the same object, so replacing an existing one is harmless
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        entry = {"key": key, "path": path, "sha256": digest.hexdigest(), "size": size, "stored_at": time.time()}
+        ref_path = self._ref_path(key)
+        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+        tmp_ref = f"{ref_path}.{threading.get_ident()}.tmp"
+        with open(tmp_ref, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_ref, ref_path)
+        return entry
+
+    def fetch(self, client, key: str, path: str, ext: str, refresh: bool = False) -> Dict[str, Any]:
+        """Return the stored file for key, streaming it from Garmin Connect first if needed
+
+        Args:
+            client: Logged-in Garmin client
+            key: Download key
+            path: connectapi path of the file
+            ext: File extension of the stored object
+            refresh: Download again even if the file is already stored
+        """
+        entry = None if refresh else self.lookup(key)
+        if entry:
+            return dict(entry, cached=True)
+        response = client.garth.request("GET", "connectapi", path, api=True, stream=True)
+        try:
+            entry = self.put(key, response.iter_content(CHUNK_SIZE), ext)
+        finally:
+            response.close()
+        return dict(entry, cached=False)
+
+    def download_activity(self, client, activity_id: int, dl_fmt: int = 2, refresh: bool = False) -> Dict[str, Any]:
+        """Store an activity file in one of the ACTIVITY_FORMATS"""
+        if dl_fmt not in ACTIVITY_FORMATS:
+            raise ValueError(f"dl_fmt must be one of {', '.join(str(f) for f in ACTIVITY_FORMATS)}")
+        name, attribute, ext = ACTIVITY_FORMATS[dl_fmt]
+        path = f"{getattr(client, attribute)}/{activity_id}"
+        entry = self.fetch(client, f"activity/{activity_id}.{name}", path, ext, refresh)
+        return dict(entry, activity_id=activity_id, format=name)
+
+    def forget(self, *keys: str) -> int:
+        """Drop the refs of keys so the next download fetches them again, returning how many existed
+
+        Objects are left in place, other refs may share them.
+        """
+        forgotten = 0
+        for key in keys:
+            try:
+                os.remove(self._ref_path(key))
+                forgotten += 1
+            except FileNotFoundError:
+                pass
+        return forgotten
+
+    def download_workout(self, client, workout_id: int, refresh: bool = False) -> Dict[str, Any]:
+        """Store a workout as a FIT file"""
+        path = f"{client.garmin_workouts}/workout/FIT/{workout_id}"
+        entry = self.fetch(client, f"workout/{workout_id}.fit", path, "fit", refresh)
+        return dict(entry, workout_id=workout_id, format="fit")
+
+
+file_store = FileStore()
@@ -0,0 +1,336 @@
+"""
+Request governor for Garmin Connect: token-bucket rate limiting, retries with
+jittered exponential backoff and a circuit breaker
+"""
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+import urllib3
+from urllib3.util.retry import Retry
+
+from garmin_executor import current_ticket
+from garmin_metrics import record_retry, record_upstream
+
+RATE_LIMIT = float(os.getenv("GARMIN_RATE_LIMIT", "5"))
+RATE_BURST = int(os.getenv("GARMIN_RATE_BURST", "10"))
+# Maximum concurrent requests per governor, 0 for no limit
+MAX_CONCURRENCY = int(os.getenv("GARMIN_MAX_CONCURRENCY", "0"))
+MAX_RETRIES = int(os.getenv("GARMIN_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("GARMIN_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("GARMIN_BACKOFF_MAX", "30"))
+BREAKER_THRESHOLD = int(os.getenv("GARMIN_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET = float(os.getenv("GARMIN_BREAKER_RESET", "30"))
+# Longest Retry-After honored by sleeping, longer ones fail the request at once
+MAX_RETRY_AFTER = float(os.getenv("GARMIN_MAX_RETRY_AFTER", "120"))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Methods that can be repeated without changing the result if the server already processed the first attempt
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+GRAPHQL_PATH = "graphql-gateway/graphql"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Garmin Connect while the circuit breaker is open"""
+
+
+class ConnectFailed(requests.ConnectionError):
+    """Raised by transports when a connection could not be opened, so the request was never sent"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing rate requests per second with bursts up to burst
+
+    The bucket can be paused, e.g. for a Retry-After, which holds back every
+    request drawing from it and not just the one that was told to wait.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT, burst: int = RATE_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_locked(self, now: float) -> float:
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.rate <= 0:
+            return 0.0
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> float:
+        """Take one token if one is available. Returns 0 if it was taken, else the seconds until one is."""
+        with self._lock:
+            delay = self._wait_locked(time.monotonic())
+            if not delay and self.rate > 0:
+                self._tokens -= 1
+            return delay
+
+    def release(self) -> None:
+        """Give back a token taken ahead of a request that was never sent"""
+        if self.rate > 0:
+            with self._lock:
+                self._tokens = min(self.burst, self._tokens + 1)
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the time waited."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for seconds, e.g. after a Retry-After"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """Opens after threshold consecutive failures and lets one trial request through after reset seconds"""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, reset: float = BREAKER_RESET):
+        self.threshold = threshold
+        self.reset = reset
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self._opened_at + self.reset - time.monotonic()
+            if self.state == "open" and remaining <= 0:
+                self.state = "half_open"
+                return
+            raise CircuitOpenError(
+                f"Garmin Connect circuit open after {self.failures} consecutive failures, "
+                f"retry in {max(remaining, 0):.0f}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def record_inconclusive(self) -> None:
+        """Record an error that says nothing about the service's health, e.g. an unparsable response
+
+        A half-open trial ending this way reopens the breaker, so that a later
+        trial is let through instead of the breaker staying half-open.
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(error: Exception) -> Tuple[bool, Optional[int], Optional[float]]:
+    """Return (retryable, HTTP status, Retry-After seconds) for an exception from garth"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True, None, None
+    http_error = getattr(error, "error", error)
+    response = getattr(http_error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        return False, None, None
+    return status in RETRYABLE_STATUS, status, _retry_after(response)
+
+
+def _not_sent(error: Exception) -> bool:
+    """Whether a request failed while connecting, before any of it reached the server"""
+    if isinstance(error, (ConnectFailed, requests.ConnectTimeout)):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", error.args[0])
+        return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+    return False
+
+
+def _idempotent(args: tuple, kwargs: Dict[str, Any]) -> bool:
+    """Whether a garth request(method, subdomain, path, ...) can be repeated safely
+
+    GraphQL queries are POSTs that only read, so they are retried like GETs;
+    mutations are not.
+    """
+    method = str(kwargs.get("method", args[0] if args else "GET")).upper()
+    if method in IDEMPOTENT_METHODS:
+        return True
+    path = str(kwargs.get("path", args[2] if len(args) > 2 else ""))
+    body = kwargs.get("json")
+    if method != "POST" or GRAPHQL_PATH not in path or not isinstance(body, dict):
+        return False
+    return not str(body.get("query", "")).lstrip().startswith("mutation")
+
+
+def _rewind_files(kwargs: Dict[str, Any]) -> None:
+    """Seek upload bodies back to the start so a retried request sends the whole file again"""
+    for value in (kwargs.get("files") or {}).values():
+        body = value[1] if isinstance(value, tuple) else value
+        if hasattr(body, "seek"):
+            body.seek(0)
+
+
+class RequestGovernor:
+    """Runs Garmin HTTP requests under a rate limit, retry policy and circuit breaker"""
+
+    def __init__(self, bucket: Optional[TokenBucket] = None, breaker: Optional[CircuitBreaker] = None,
+                 max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX, max_concurrency: int = MAX_CONCURRENCY):
+        self.bucket = bucket or TokenBucket()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "requests": 0, "throttled": 0, "throttle_wait_seconds": 0.0, "retries": 0,
+            "failed": 0, "circuit_rejections": 0, "status_counts": {},
+        }
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call func (one HTTP request), retrying retryable failures
+
+        Requests with a non-idempotent method (POST, PATCH) other than GraphQL
+        queries are only retried after a 429 or a failed connection, when the
+        server cannot have processed them, so that uploads and creations are
+        not duplicated.
+        """
+        idempotent = _idempotent(args, kwargs)
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_request()
+            except CircuitOpenError:
+                self._count("circuit_rejections")
+                raise
+            # The first request of an admitted call may use the token its admission took
+            ticket = current_ticket.get()
+            waited = 0.0 if attempt == 0 and ticket is not None and ticket.spend(self.bucket) else self.bucket.acquire()
+            self._count("requests")
+            if waited:
+                self._count("throttled")
+                self._count("throttle_wait_seconds", waited)
+            started = time.perf_counter()
+            try:
+                if self._slots is None:
+                    result = func(*args, **kwargs)
+                else:
+                    with self._slots:
+                        result = func(*args, **kwargs)
+            except Exception as e:
+                record_upstream(time.perf_counter() - started)
+                retryable, status, retry_after = classify(e)
+                if status is not None:
+                    with self._lock:
+                        counts = self.stats["status_counts"]
+                        counts[str(status)] = counts.get(str(status), 0) + 1
+                if not retryable:
+                    # The service answered, so a client error says nothing about its health
+                    if status is not None:
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.record_inconclusive()
+                    raise
+                if status == 429:
+                    # Throttling is an answer from a healthy service, the backoff below handles it
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                if attempt >= self.max_retries or not (idempotent or status == 429 or _not_sent(e)):
+                    self._count("failed")
+                    raise
+                if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                    self._count("failed")
+                    raise
+                delay = retry_after if retry_after is not None else self.backoff(attempt)
+                self._count("retries")
+                record_retry()
+                if status == 429:
+                    # The limit is the account's, so the whole account backs off, not only this request
+                    self.bucket.pause(delay)
+                else:
+                    time.sleep(delay)
+                _rewind_files(kwargs)
+                attempt += 1
+                continue
+            record_upstream(time.perf_counter() - started)
+            self.breaker.record_success()
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return request, throttle, retry and circuit breaker counters"""
+        with self._lock:
+            stats = dict(self.stats, status_counts=dict(self.stats["status_counts"]))
+        stats["throttle_wait_seconds"] = round(stats["throttle_wait_seconds"], 3)
+        stats["circuit_state"] = self.breaker.state
+        stats["consecutive_failures"] = self.breaker.failures
+        stats["rate_limit"] = self.bucket.rate
+        stats["max_retries"] = self.max_retries
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+
+
+def install_governor(client, governor: Optional[RequestGovernor] = None) -> RequestGovernor:
+    """Route every garth request of a Garmin client through a governor
+
+    garth's own urllib3 retries are disabled so that retries are not multiplied.
+
+    Args:
+        client: Garmin client
+        governor: Governor to use (default: a new one with the configured limits)
+    """
+    governor = governor or RequestGovernor()
+    garth_client = client.garth
+    request = garth_client.request
+    garth_client.retries = 0
+    garth_client.status_forcelist = ()
+    for adapter in garth_client.sess.adapters.values():
+        adapter.max_retries = Retry(0, read=False)
+
+    def governed_request(*args, **kwargs):
+        return governor.call(request, *args, **kwargs)
+
+    # get/post/put/delete, connectapi, download and upload all go through request()
+    garth_client.request = governed_request
+    return governor
@@ -0,0 +1,156 @@
+"""
+GraphQL documents for the Garmin gateway: escaped argument literals, and
+batching several logical queries into aliased documents whose responses are
+split back per query
+"""
+import datetime
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Most root fields sent in one document, larger batches are split over several requests
+GRAPHQL_BATCH_SIZE = int(os.getenv("GARMIN_GRAPHQL_BATCH_SIZE", "16"))
+
+NAME_PATTERN = re.compile(r"[_A-Za-z][_0-9A-Za-z]*")
+SELECTION_PATTERN = re.compile(r"\{[\s\w{},]*\}")
+
+
+def _name(kind: str, value: Any) -> str:
+    if not isinstance(value, str) or not NAME_PATTERN.fullmatch(value):
+        raise ValueError(f"{kind} must be a GraphQL name, got {value!r}")
+    return value
+
+
+def literal(value: Any) -> str:
+    """Return a value as a GraphQL input literal, escaping strings"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, str)):
+        # JSON string escapes are valid GraphQL string escapes
+        return json.dumps(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(literal(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{_name('argument', key)}: {literal(item)}" for key, item in value.items()) + "}"
+    raise ValueError(f"Cannot send {type(value).__name__} as a GraphQL argument")
+
+
+def field(name: str, arguments: Optional[Dict[str, Any]] = None, selection: str = "") -> str:
+    """Return the text of one root field, leaving out arguments that are None"""
+    _name("field", name)
+    if selection and not SELECTION_PATTERN.fullmatch(selection):
+        raise ValueError(f"selection must be a GraphQL selection set such as {{id}}, got {selection!r}")
+    args = ", ".join(f"{_name('argument', key)}: {literal(value)}"
+                     for key, value in (arguments or {}).items() if value is not None)
+    return f"{name}({args}){selection}" if args else f"{name}{selection}"
+
+
+def query(name: str, arguments: Optional[Dict[str, Any]] = None, selection: str = "") -> Dict[str, str]:
+    """Return the request body of a query of a single root field"""
+    return {"query": f"query{{{field(name, arguments, selection)}}}"}
+
+
+def _error_alias(error: Dict[str, Any]) -> Optional[str]:
+    path = error.get("path") if isinstance(error, dict) else None
+    return path[0] if path and isinstance(path[0], str) else None
+
+
+class GraphQLBatch:
+    """Logical queries merged into aliased documents and split back per query
+
+    Each query is a root field sent under its own alias, so queries of the
+    same field with different arguments can share a document and a dashboard
+    needs one request instead of one per metric.
+    """
+
+    def __init__(self):
+        # alias -> root field text
+        self.queries: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def add(self, alias: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+            selection: str = "") -> "GraphQLBatch":
+        """Add a root field query under an alias, returning the batch
+
+        Raises ValueError for an alias already in use or a malformed name.
+        """
+        _name("alias", alias)
+        if alias in self.queries:
+            raise ValueError(f"alias {alias} is already used in this batch")
+        self.queries[alias] = field(name, arguments, selection)
+        return self
+
+    def documents(self, size: int = GRAPHQL_BATCH_SIZE) -> List[Tuple[List[str], Dict[str, str]]]:
+        """Return (aliases, request body) per document, at most size root fields each"""
+        aliases = list(self.queries)
+        size = max(1, size)
+        documents = []
+        for i in range(0, len(aliases), size):
+            chunk = aliases[i:i + size]
+            body = " ".join(f"{alias}: {self.queries[alias]}" for alias in chunk)
+            documents.append((chunk, {"query": f"query{{{body}}}"}))
+        return documents
+
+    @staticmethod
+    def split(documents: List[Tuple[List[str], Dict[str, str]]],
+              responses: List[Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Split the responses of documents() back into data and error messages per alias
+
+        A response may be an exception raised while sending its document, which
+        fails all of its queries. GraphQL errors with a path fail the query
+        they name; errors without one fail every query of the document that
+        returned no data.
+        """
+        data: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for (aliases, _), response in zip(documents, responses):
+            if isinstance(response, Exception):
+                errors.update((alias, str(response)) for alias in aliases)
+                continue
+            response = response if isinstance(response, dict) else {}
+            values = response.get("data") or {}
+            general = []
+            for error in response.get("errors") or []:
+                alias = _error_alias(error)
+                message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+                if alias in aliases:
+                    errors[alias] = "; ".join(filter(None, [errors.get(alias), message]))
+                else:
+                    general.append(message)
+            for alias in aliases:
+                if alias in errors:
+                    continue
+                if values.get(alias) is None and (general or alias not in values):
+                    errors[alias] = "; ".join(general) or "No data in the GraphQL response"
+                else:
+                    data[alias] = values.get(alias)
+        return data, errors
+
+
+def today_overview(cdate: str, days_ahead: int = 6) -> GraphQLBatch:
+    """Return the queries of a one-day overview, with the workouts scheduled up to days_ahead days later
+
+    Raises ValueError for a date not in YYYY-MM-DD format.
+    """
+    try:
+        day = datetime.date.fromisoformat(cdate)
+    except ValueError:
+        raise ValueError(f"cdate must be a date in YYYY-MM-DD format, got {cdate!r}")
+    cdate = day.isoformat()
+    until = (day + datetime.timedelta(days=max(0, days_ahead))).isoformat()
+    today = {"startDate": cdate, "endDate": cdate}
+    return (GraphQLBatch()
+            .add("summary", "userDailySummaryV2Scalar", today)
+            .add("sleep", "sleepScalar", {"date": cdate, "sleepOnly": False})
+            .add("training_readiness", "trainingReadinessRangeScalar", today)
+            .add("training_status", "trainingStatusDailyScalar", {"calendarDate": cdate})
+            .add("hrv", "heartRateVariabilityScalar", today)
+            .add("health_snapshot", "healthSnapshotScalar", today)
+            .add("weight", "weightScalar", today)
+            .add("blood_pressure", "bloodPressureScalar", today)
+            .add("scheduled_workouts", "workoutScheduleSummariesScalar", {"startDate": cdate, "endDate": until}))
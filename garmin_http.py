@@ -0,0 +1,236 @@
+"""
+Shared HTTP connection pool for garth sessions, with keep-alive tuning,
+an optional httpx (HTTP/2) transport for API requests and response recording
+for the local stand-in server
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import socket
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+from garmin_executor import MAX_WORKERS
+from garmin_governor import ConnectFailed
+
+logger = logging.getLogger(__name__)
+
+# Number of per-host pools kept (Garmin uses a handful of subdomains)
+POOL_CONNECTIONS = int(os.getenv("GARMIN_HTTP_POOL_CONNECTIONS", "10"))
+# Connections kept per host. Below the worker count, busy threads open and discard extra connections.
+POOL_MAXSIZE = int(os.getenv("GARMIN_HTTP_POOL_MAXSIZE", str(MAX_WORKERS)))
+# Wait for a free connection instead of opening one beyond POOL_MAXSIZE
+POOL_BLOCK = os.getenv("GARMIN_HTTP_POOL_BLOCK", "0") == "1"
+# Idle seconds before TCP keep-alive probes start (requests) or idle connections are closed (httpx)
+KEEPALIVE = float(os.getenv("GARMIN_HTTP_KEEPALIVE", "60"))
+TIMEOUT = float(os.getenv("GARMIN_HTTP_TIMEOUT", "10"))
+# "requests" or "httpx"; HTTP/2 implies httpx
+HTTP2 = os.getenv("GARMIN_HTTP2", "0") == "1"
+BACKEND = "httpx" if HTTP2 else os.getenv("GARMIN_HTTP_BACKEND", "requests")
+# Directory to write API responses to as fixtures for mock_garmin.py
+RECORD_DIR = os.path.expanduser(os.getenv("GARMIN_RECORD_FIXTURES", ""))
+
+
+def _rewrite(url: str, base_url: Optional[str]) -> str:
+    """Map https://<subdomain>.<domain>/<path> to <base_url>/<subdomain>/<path> when a stand-in is used"""
+    if not base_url:
+        return url
+    parts = urlsplit(url)
+    subdomain = parts.hostname.split(".")[0]
+    url = f"{base_url}/{subdomain}{parts.path}"
+    return f"{url}?{parts.query}" if parts.query else url
+
+
+def record_fixture(url: str, request, response, directory: str = RECORD_DIR) -> None:
+    """Write an API response as a fixture the stand-in server replays
+
+    Only connectapi requests are recorded, without headers, so no tokens end
+    up in the fixture. Identical requests overwrite each other's fixture.
+    """
+    parts = urlsplit(url)
+    if not parts.hostname.startswith("connectapi.") or parts.path.startswith("/oauth-service/"):
+        return
+    fixture: Dict[str, Any] = {"method": request.method, "path": f"/connectapi{parts.path}"}
+    if parts.query:
+        fixture["query"] = parse_qs(parts.query)
+    body = request.body.encode() if isinstance(request.body, str) else request.body
+    if body and "json" in request.headers.get("Content-Type", ""):
+        fixture["json"] = json.loads(body)
+    fixture["status"] = response.status_code
+    try:
+        fixture["body"] = response.json() if response.content else None
+    except ValueError:
+        fixture["body_base64"] = base64.b64encode(response.content).decode()
+    digest = hashlib.sha1(json.dumps([fixture["method"], url, fixture.get("json")], sort_keys=True).encode())
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", parts.path).strip("-")[:80]
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{request.method}-{slug}-{digest.hexdigest()[:10]}.json"), "w") as f:
+        json.dump(fixture, f)
+
+
+def _socket_options() -> list:
+    options = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, "TCP_KEEPIDLE") and KEEPALIVE > 0:
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, max(1, int(KEEPALIVE))))
+    return options
+
+
+class PooledAdapter(HTTPAdapter):
+    """requests adapter with a sized, keep-alive connection pool, optionally sending to a stand-in server"""
+
+    def __init__(self, base_url: Optional[str] = None, pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE, pool_block: bool = POOL_BLOCK):
+        self.base_url = base_url.rstrip("/") if base_url else None
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", _socket_options())
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+
+    def send(self, request, **kwargs):
+        url = request.url
+        request.url = _rewrite(url, self.base_url)
+        response = super().send(request, **kwargs)
+        if RECORD_DIR and not kwargs.get("stream"):
+            record_fixture(url, request, response)
+        return response
+
+
+class _HttpxBody:
+    """The parts of a urllib3 response that requests reads a body through"""
+
+    def __init__(self, response):
+        self._response = response
+
+    def stream(self, chunk_size: int, decode_content: bool = True):
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        finally:
+            self._response.close()
+
+    def read(self, amt: Optional[int] = None, decode_content: bool = True) -> bytes:
+        return self._response.read()
+
+    def close(self) -> None:
+        self._response.close()
+
+    def release_conn(self) -> None:
+        self._response.close()
+
+
+class HttpxAdapter(BaseAdapter):
+    """requests adapter that sends through a pooled httpx client, with HTTP/2 if h2 is installed
+
+    Responses are returned as requests.Response objects, so garth and the
+    governor see no difference. Cookies are not handled, so it is only
+    mounted for API requests, not the SSO login.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_connections: int = POOL_MAXSIZE,
+                 keepalive: float = KEEPALIVE, http2: bool = HTTP2):
+        super().__init__()
+        import httpx
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 needs the h2 package (pip install httpx[http2]), using HTTP/1.1")
+                http2 = False
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.http2 = http2
+        # Set by install_governor like on HTTPAdapter; httpx does not retry by itself
+        self.max_retries = Retry(0, read=False)
+        self._httpx = httpx
+        self._client = httpx.Client(http2=http2, follow_redirects=False, limits=httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections, keepalive_expiry=keepalive))
+
+    def _timeout(self, timeout: Any):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return self._httpx.Timeout(timeout)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        httpx = self._httpx
+        body = request.body.encode() if isinstance(request.body, str) else request.body
+        try:
+            outgoing = self._client.build_request(
+                request.method, _rewrite(request.url, self.base_url), headers=dict(request.headers),
+                content=body, timeout=self._timeout(timeout))
+            incoming = self._client.send(outgoing, stream=True)
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e, request=request)
+        except httpx.ConnectError as e:
+            raise ConnectFailed(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+        response = requests.Response()
+        response.status_code = incoming.status_code
+        response.headers = CaseInsensitiveDict(incoming.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = incoming.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = _HttpxBody(incoming)
+        if RECORD_DIR and not stream:
+            record_fixture(request.url, request, response)
+        return response
+
+    def close(self) -> None:
+        self._client.close()
+
+
+_adapters: Dict[Optional[str], Tuple[BaseAdapter, Optional[BaseAdapter]]] = {}
+_adapters_lock = threading.Lock()
+
+
+def shared_adapters(base_url: Optional[str] = None) -> Tuple[BaseAdapter, Optional[BaseAdapter]]:
+    """Return the process-wide (general, API) adapters, the API one being None unless httpx is used
+
+    Every account's session mounts the same adapters, so connections are
+    reused across worker threads and accounts (requests carry their own
+    Authorization header).
+    """
+    with _adapters_lock:
+        if base_url not in _adapters:
+            api = HttpxAdapter(base_url) if BACKEND == "httpx" else None
+            _adapters[base_url] = (PooledAdapter(base_url), api)
+        return _adapters[base_url]
+
+
+def mount_pool(client, base_url: Optional[str] = None) -> None:
+    """Send a Garmin client's requests through the shared connection pool
+
+    garth.load() and garth.configure() mount a fresh default adapter, so call
+    this again after either.
+
+    Args:
+        client: Garmin client
+        base_url: Base URL of a local stand-in server, e.g. http://127.0.0.1:8765
+    """
+    general, api = shared_adapters(base_url)
+    garth_client = client.garth
+    garth_client.timeout = TIMEOUT
+    garth_client.sess.mount("https://", general)
+    if api is not None:
+        garth_client.sess.mount("https://connectapi.", api)
+
+
+def pool_settings() -> Dict[str, Any]:
+    """Return the configured pool size, keep-alive and transport"""
+    return {"backend": BACKEND, "http2": HTTP2, "pool_connections": POOL_CONNECTIONS, "pool_maxsize": POOL_MAXSIZE,
+            "pool_block": POOL_BLOCK, "keepalive": KEEPALIVE, "timeout": TIMEOUT, "recording": bool(RECORD_DIR)}
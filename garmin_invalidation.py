@@ -0,0 +1,137 @@
+"""
+Write-through invalidation: what each write method makes stale in the local caches
+"""
+import datetime
+from typing import Any, Dict, Optional
+
+from garmin_accounts import current
+from garmin_cache import response_cache
+from garmin_files import ACTIVITY_FORMATS
+from garmin_static import STATIC_METHODS
+
+WEIGHT_READS = ("get_body_composition", "get_weigh_ins", "get_daily_weigh_ins")
+# Per-activity reads, cached under the activity ID
+ACTIVITY_READS = (
+    "get_activity", "get_activity_details", "get_activity_splits", "get_activity_typed_splits",
+    "get_activity_split_summaries", "get_activity_weather", "get_activity_hr_in_timezones",
+    "get_activity_gear", "get_activity_exercise_sets",
+)
+# Daily totals that include the activities of the day
+ACTIVITY_DAY_READS = ("get_stats", "get_user_summary", "get_intensity_minutes_data")
+EXPORT_FORMATS = tuple(name for name, _, _ in ACTIVITY_FORMATS.values() if name != "original")
+
+# Write method -> what it invalidates. Arguments are positional, as passed to call_garmin.
+#   reads: date-keyed reads of the written date ("*" for every date-keyed read)
+#   date_args: argument positions holding the date or timestamp, the first non-empty one wins
+#   today: an empty date means today (Garmin's default), otherwise nothing date-keyed is invalidated
+#   activity_arg: argument position of the activity ID
+#   activity_reads: per-activity reads of that activity
+#   activity_day_reads: date-keyed reads of the day the activity took place, looked up in the activity index
+#   files: stored downloads of the activity to forget ("all" or "exports", which embed name and type)
+#   index: how the activity index follows ("delete", "name", "type" or "stale" for new activities)
+#   static: memoized static methods
+#   pages: prefetched activity list pages are dropped
+WRITE_DEPENDENCIES: Dict[str, Dict[str, Any]] = {
+    "add_weigh_in": {"reads": WEIGHT_READS, "date_args": (2,), "today": True},
+    "add_weigh_in_with_timestamps": {"reads": WEIGHT_READS, "date_args": (2,), "today": True},
+    "delete_weigh_ins": {"reads": WEIGHT_READS, "date_args": (0,)},
+    "delete_weigh_in": {"reads": WEIGHT_READS, "date_args": (1,)},
+    "add_body_composition": {"reads": WEIGHT_READS, "date_args": (0,), "today": True},
+    "add_hydration_data": {"reads": ("get_hydration_data",), "date_args": (2, 1), "today": True},
+    "set_blood_pressure": {"reads": ("get_blood_pressure",), "date_args": (3,), "today": True},
+    "delete_blood_pressure": {"reads": ("get_blood_pressure",), "date_args": (1,)},
+    "request_reload": {"reads": "*", "date_args": (0,)},
+    "delete_activity": {"activity_arg": 0, "activity_reads": ACTIVITY_READS,
+                        "activity_day_reads": ACTIVITY_DAY_READS, "files": "all", "index": "delete",
+                        "pages": True},
+    "set_activity_name": {"activity_arg": 0, "activity_reads": ("get_activity",), "files": "exports",
+                          "index": "name", "pages": True},
+    "set_activity_type": {"activity_arg": 0, "activity_reads": ACTIVITY_READS, "files": "exports",
+                          "index": "type", "pages": True},
+    "create_manual_activity": {"reads": ACTIVITY_DAY_READS, "date_args": (0,), "index": "stale", "pages": True},
+    "create_manual_activity_from_json": {"index": "stale", "pages": True},
+    # Called by the upload tools with the start time (epoch seconds) of the uploaded file, if known
+    "upload_activity": {"reads": ACTIVITY_DAY_READS, "date_args": (0,), "index": "stale", "pages": True},
+    "set_gear_default": {"static": ("get_user_profile", "get_userprofile_settings")},
+    "logout": {"static": STATIC_METHODS},
+}
+
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _date_of(value: Any, today: bool) -> Optional[str]:
+    """Calendar date of a date, timestamp string, datetime or epoch seconds value"""
+    if value in (None, ""):
+        return datetime.date.today().isoformat() if today else None
+    if isinstance(value, (int, float)):
+        return datetime.datetime.fromtimestamp(value).date().isoformat()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()[:10]
+    try:
+        return datetime.date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _arg(args: tuple, index: int) -> Any:
+    return args[index] if len(args) > index else None
+
+
+def invalidate_after_write(method: str, *args) -> Dict[str, Any]:
+    """Invalidate what a successful write of the current account made stale. Blocks on disk and index access.
+
+    Returns what was done, including "pages" when prefetched activity list
+    pages must be dropped by the caller.
+    """
+    spec = WRITE_DEPENDENCIES.get(method)
+    if spec is None:
+        return {}
+    account = current()
+    stats = _stats.setdefault(method, {"writes": 0, "entries": 0, "files": 0})
+    stats["writes"] += 1
+    done: Dict[str, Any] = {"entries": 0}
+    dates = [_date_of(_arg(args, i), False) for i in spec.get("date_args", ())]
+    cdate = next((d for d in dates if d), None) or _date_of(None, spec.get("today", False))
+
+    activity_id = _arg(args, spec["activity_arg"]) if "activity_arg" in spec else None
+    if activity_id is not None:
+        activity_id = int(activity_id)
+        for read in spec.get("activity_reads", ()):
+            done["entries"] += response_cache.invalidate(read, activity_id=activity_id, account=account.name)
+        if spec.get("activity_day_reads"):
+            indexed = account.activity_index.find(activity_id)
+            day = _date_of(indexed["start_time_local"], False) if indexed else None
+            for read in spec["activity_day_reads"] if day else ():
+                done["entries"] += response_cache.invalidate(read, day, account=account.name)
+        formats = {"all": ("original",) + EXPORT_FORMATS, "exports": EXPORT_FORMATS}.get(spec.get("files"), ())
+        done["files"] = account.file_store.forget(*(f"activity/{activity_id}.{name}" for name in formats))
+        stats["files"] += done["files"]
+
+    if cdate and spec.get("reads"):
+        reads = (None,) if spec["reads"] == "*" else spec["reads"]
+        for read in reads:
+            done["entries"] += response_cache.invalidate(read, cdate, account=account.name)
+        done["date"] = cdate
+
+    index = spec.get("index")
+    if index == "delete":
+        account.activity_index.delete(activity_id)
+    elif index == "name":
+        account.activity_index.patch(activity_id, name=_arg(args, 1))
+    elif index == "type":
+        account.activity_index.patch(activity_id, type_key=_arg(args, 2))
+    elif index == "stale":
+        # cdate is a local date; start a day earlier to cover any GMT offset
+        since = datetime.date.fromisoformat(cdate) - datetime.timedelta(days=1) if cdate else None
+        account.activity_index.mark_stale(f"{since} 00:00:00" if since else None)
+
+    if spec.get("static"):
+        account.static_data.invalidate(*spec["static"])
+    done["pages"] = bool(spec.get("pages"))
+    stats["entries"] += done["entries"]
+    return done
+
+
+def invalidation_stats() -> Dict[str, Any]:
+    """Return per-write-method counts of writes, invalidated cache entries and forgotten files"""
+    return {method: dict(s) for method, s in _stats.items()}
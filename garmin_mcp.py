@@ -3,6 +3,7 @@ FastMCP Echo Server
 """
 
 from fastmcp import FastMCP
+from starlette.responses import PlainTextResponse
 
 # Create server
 app = FastMCP("Echo Server")
@@ -10,643 +11,1512 @@ app = FastMCP("Echo Server")
 """
 Activity Management functions for Garmin Connect MCP Server
 """
+import asyncio
+import base64
 import datetime
-from typing import Any, Dict, List, Optional, Union
-from garminconnect import Garmin
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
 from dotenv import load_dotenv
 import os
 
+# Load .env before the helper modules read their settings
 load_dotenv()
 
-email = os.getenv("GARMIN_EMAIL")
-password = os.getenv("GARMIN_PASSWORD")
-garmin_client = Garmin(email, password)
-garmin_client.login()
+from garmin_accounts import DEFAULT_ACCOUNT, account_pool, current, current_account, with_account
+from garmin_cache import ACTIVITY_TTL, MISSING, make_key, response_cache, ttl_for_date
+from garmin_executor import executor_stats, run_blocking
+from garmin_export import (EXPORT_CONCURRENCY, FORMAT_CODES, ArchiveWriter, ExportManifest, export_paths, list_entry,
+                           member_name, summarize_export, validate_export)
+from garmin_files import ACTIVITY_FORMATS
+from garmin_governor import classify
+from garmin_graphql import GraphQLBatch, field, query, today_overview
+from garmin_http import pool_settings
+from garmin_invalidation import ACTIVITY_READS, WRITE_DEPENDENCIES, invalidate_after_write, invalidation_stats
+from garmin_metrics import InstrumentationMiddleware, record_cache, serializing, tool_metrics
+from garmin_projection import project, resolve_fields
+from garmin_singleflight import single_flight, single_flight_stats
+from garmin_workouts import (MAX_PLAN_SCHEDULES, PLAN_CONCURRENCY, WORKOUT_INDEX_MAX_AGE, build_workout,
+                             definition_key, plan_entry, steps_key, workout_id_of)
+from garmin_static import STATIC_METHODS, StaticData
+from upload_index import fingerprint, start_time_gmt
+from workout_index import SYNC_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Time, size, cache status and retries of every tool call, see get_server_metrics
+app.add_middleware(InstrumentationMiddleware())
+
+
+# Clients are created on the first tool call for their account so that the MCP
+# handshake and tools/list never wait on Garmin authentication
+def get_client():
+    """Return the Garmin client of the current account, logging in on first use"""
+    return account_pool.client(current_account.get())
+
+
+def _warm_up() -> None:
+    try:
+        get_client()
+    except Exception as e:
+        logger.warning("Skipping warm-up, Garmin login failed: %s", e)
+        return
+    current().static_data.warm(_call_client)
+
+
+def start_warm_up() -> None:
+    """Log in and memoize the static profile and catalog data in a background thread"""
+    threading.Thread(target=_warm_up, name="garmin-warm-up", daemon=True).start()
+
+
+def _call_client(method: str, *args, **kwargs) -> Any:
+    return getattr(get_client(), method)(*args, **kwargs)
 
 
+def _call_garth(method: str, *args, **kwargs) -> Any:
+    return getattr(get_client().garth, method)(*args, **kwargs)
+
+
+def _download_file(method: str, *args, **kwargs) -> Dict[str, Any]:
+    entry = getattr(current().file_store, method)(get_client(), *args, **kwargs)
+    record_cache("hit" if entry.get("cached") else "miss")
+    return entry
+
+
+# Wellness methods whose results are cached: method -> position of the (latest) date argument
+CACHED_METHODS = {
+    "get_stats": 0,
+    "get_user_summary": 0,
+    "get_steps_data": 0,
+    "get_heart_rates": 0,
+    "get_rhr_day": 0,
+    "get_hrv_data": 0,
+    "get_sleep_data": 0,
+    "get_stress_data": 0,
+    "get_all_day_stress": 0,
+    "get_body_battery_events": 0,
+    "get_respiration_data": 0,
+    "get_spo2_data": 0,
+    "get_floors": 0,
+    "get_intensity_minutes_data": 0,
+    "get_max_metrics": 0,
+    "get_fitnessage_data": 0,
+    "get_training_readiness": 0,
+    "get_training_status": 0,
+    "get_daily_steps": 1,
+    "get_body_battery": 1,
+    "get_hill_score": 1,
+    "get_endurance_score": 1,
+    "get_hydration_data": 0,
+    "get_daily_weigh_ins": 0,
+    "get_body_composition": 1,
+    "get_weigh_ins": 1,
+    "get_blood_pressure": 1,
+}
+
+
+def _cache_scope(method: str, args: tuple) -> Dict[str, Any]:
+    # What a cached entry covers, so that writes can invalidate it (see garmin_invalidation)
+    account = current_account.get()
+    if method in ACTIVITY_READS:
+        return {"account": account, "method": method, "activity_id": int(args[0])}
+    index = CACHED_METHODS[method]
+    end = args[index] if len(args) > index and args[index] else args[0]
+    return {"account": account, "method": method, "start": str(args[0])[:10], "end": str(end)[:10]}
+
+
+def _cached_call(key: str, method: str, *args, **kwargs) -> Any:
+    value = response_cache.get(key)
+    record_cache("miss" if value is MISSING else "hit")
+    if value is MISSING:
+        started = time.monotonic()
+        value = _call_client(method, *args, **kwargs)
+        scope = _cache_scope(method, args)
+        ttl = ACTIVITY_TTL if method in ACTIVITY_READS else ttl_for_date(scope["end"])
+        response_cache.set(key, value, ttl, scope, started)
+    return value
+
+
+def _static_call(static: StaticData, method: str) -> Any:
+    fetched = False
+
+    def fetch(name: str) -> Any:
+        nonlocal fetched
+        fetched = True
+        record_cache("miss")
+        return _call_client(name)
+
+    value = static.get(method, fetch)
+    if not fetched:
+        # Memoized by a concurrent fetch while this call waited for the lock
+        record_cache("hit")
+    return value
+
+
+async def after_write(method: str, *args) -> None:
+    """Invalidate the cached reads, index entries and files a successful write made stale
+    
+    Failures are logged, the write itself already succeeded.
+    
+    Args:
+        method: Name of the write method, a key of garmin_invalidation.WRITE_DEPENDENCIES
+        *args: Positional arguments of the write
+    """
+    try:
+        done = await run_blocking("invalidate", invalidate_after_write, method, *args)
+    except Exception as e:
+        logger.warning("Could not invalidate caches after %s: %s", method, e)
+        return
+    if done.get("pages"):
+        _drop_prefetched()
+
+
+def _is_write(method: str, args: tuple) -> bool:
+    if method == "query_garmin_graphql":
+        document = args[0].get("query", "") if args and isinstance(args[0], dict) else ""
+        return str(document).lstrip().startswith("mutation")
+    return method in WRITE_DEPENDENCIES
+
+
+async def call_garmin(method: str, *args, **kwargs) -> Any:
+    """Call a Garmin client method in the shared worker pool
+    
+    Results of CACHED_METHODS and per-activity reads are served from the
+    response cache when possible and STATIC_METHODS are memoized for the life
+    of the process. Concurrent identical reads, GraphQL queries included,
+    share a single upstream request. Writes (the methods of WRITE_DEPENDENCIES
+    and GraphQL mutations) invalidate exactly the cached reads they affect.
+    
+    Args:
+        method: Name of the Garmin client method to call
+        *args, **kwargs: Arguments passed to the method
+    """
+    if _is_write(method, args):
+        # Writes are never coalesced, two identical writes are two intended changes
+        result = await run_blocking(method, _call_client, method, *args, **kwargs)
+        await after_write(method, *args)
+        return result
+    key = make_key(method, *args, **kwargs)
+    account = current()
+    if account.name != DEFAULT_ACCOUNT:
+        # Default account keys are unprefixed so single-account caches stay valid
+        key = f"{account.name}/{key}"
+    if method in STATIC_METHODS and not args and not kwargs:
+        value = account.static_data.peek(method)
+        if value is not MISSING:
+            record_cache("hit")
+            return value
+        return await single_flight(method, key, lambda: run_blocking(method, _static_call, account.static_data,
+                                                                     method))
+    if method not in CACHED_METHODS and method not in ACTIVITY_READS:
+        return await single_flight(method, key, lambda: run_blocking(method, _call_client, method, *args, **kwargs))
+    # Memory hits are answered without a trip through the worker pool
+    value = response_cache.get_memory(key)
+    if value is not MISSING:
+        record_cache("hit")
+        return value
+    return await single_flight(method, key, lambda: run_blocking(method, _cached_call, key, method, *args, **kwargs))
+
+
+RANGE_CONCURRENCY = int(os.getenv("GARMIN_RANGE_CONCURRENCY", "4"))
+MAX_RANGE_DAYS = int(os.getenv("GARMIN_MAX_RANGE_DAYS", "366"))
+
+
+def _date_range(start: str, end: str) -> List[str]:
+    first = datetime.date.fromisoformat(start)
+    last = datetime.date.fromisoformat(end)
+    if last < first:
+        raise ValueError(f"End date {end} is before start date {start}")
+    days = (last - first).days + 1
+    if days > MAX_RANGE_DAYS:
+        raise ValueError(f"Date range of {days} days exceeds the maximum of {MAX_RANGE_DAYS}")
+    return [(first + datetime.timedelta(days=i)).isoformat() for i in range(days)]
+
+
+async def fetch_range(method: str, start: str, end: str, max_parallel: int = RANGE_CONCURRENCY,
+                      fields: str = "") -> Dict[str, Any]:
+    """Call a per-day Garmin method for every date in a range concurrently
+    
+    Args:
+        method: Name of the per-day Garmin client method (takes a single date)
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once
+        fields: Field paths kept for each day ("" for the method's default projection, "*" for everything)
+    
+    Returns a payload with results keyed by date and, if any day failed, an
+    "errors" mapping of date to error message.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+    day_fields = resolve_fields(method, fields)
+
+    async def fetch_day(cdate):
+        async with semaphore:
+            try:
+                return cdate, project(await call_garmin(method, cdate), day_fields), None
+            except Exception as e:
+                return cdate, None, str(e)
+
+    results = await asyncio.gather(*(fetch_day(cdate) for cdate in _date_range(start, end)))
+    payload = {"start": start, "end": end, "days": {}}
+    errors = {}
+    for cdate, value, error in results:
+        if error is None:
+            payload["days"][cdate] = value
+        else:
+            errors[cdate] = error
+    if errors:
+        payload["errors"] = errors
+    return payload
+
+
+INDEX_MAX_AGE = int(os.getenv("GARMIN_INDEX_MAX_AGE", "900"))
+
+
+def _sync_index(full: bool = False, max_age: float = 0) -> Optional[Dict[str, Any]]:
+    index = current().activity_index
+    if not full and time.time() - index.last_synced() < max_age:
+        return None
+    return index.sync(get_client(), full)
+
+
+async def refresh_activity_index(full: bool = False, max_age: float = INDEX_MAX_AGE) -> Optional[Dict[str, Any]]:
+    """Incrementally sync the local activity index if it is older than max_age seconds
+    
+    Args:
+        full: Re-fetch the whole activity history
+        max_age: Skip the sync if the last one finished less than this many seconds ago
+    """
+    return await run_blocking("sync_activity_index", _sync_index, full, max_age)
+
+
+async def _sync_workout_index(full: bool) -> Dict[str, Any]:
+    index = current().workout_index
+    summaries: List[Dict[str, Any]] = []
+    while True:
+        # get_workouts takes a start and a page size
+        page = await call_garmin("get_workouts", len(summaries), SYNC_PAGE_SIZE) or []
+        summaries += page
+        if len(page) < SYNC_PAGE_SIZE:
+            break
+    pending = await run_blocking("sync_workout_index", index.reconcile, summaries, full)
+    semaphore = asyncio.Semaphore(PLAN_CONCURRENCY)
+
+    async def fetch(summary):
+        async with semaphore:
+            details = await call_garmin("get_workout_by_id", summary["workoutId"])
+        await run_blocking("sync_workout_index", index.add, int(summary["workoutId"]), details,
+                           summary.get("updateDate"))
+
+    outcomes = await asyncio.gather(*(fetch(summary) for summary in pending), return_exceptions=True)
+    failed = sum(1 for outcome in outcomes if isinstance(outcome, Exception))
+    # Workouts that failed are fetched again by the next sync
+    if not failed:
+        await run_blocking("sync_workout_index", index.mark_synced)
+    result = {"listed": len(summaries), "fetched": len(pending) - failed}
+    if failed:
+        result["failed"] = failed
+    return {**result, **await run_blocking("sync_workout_index", index.stats)}
+
+
+async def refresh_workout_index(full: bool = False, max_age: float = WORKOUT_INDEX_MAX_AGE) -> Optional[Dict[str, Any]]:
+    """Incrementally sync the local workout index if it is older than max_age seconds
+    
+    Only workouts that are new or changed since the last sync have their
+    details fetched. Concurrent refreshes of one account share a single sync.
+    
+    Args:
+        full: Re-fetch the details of every workout
+        max_age: Skip the sync if the last one finished less than this many seconds ago
+    """
+    index = current().workout_index
+    if not full and time.time() - await run_blocking("sync_workout_index", index.last_synced) < max_age:
+        return None
+    return await single_flight("sync_workout_index", f"{current_account.get()}/workout-index/{full}",
+                               lambda: _sync_workout_index(full))
+
+
+async def _find_or_create(tool: str, workout: Dict[str, Any], key: Optional[str]) -> Tuple[int, Optional[Dict[str, Any]]]:
+    index = current().workout_index
+    if key is not None:
+        try:
+            await refresh_workout_index()
+        except Exception as e:
+            # A stale index only costs a duplicate workout
+            logger.warning("Could not sync the workout index: %s", e)
+        existing = await run_blocking(tool, index.find, key)
+        if existing:
+            return existing["workout_id"], existing
+    result = await call_garth(tool, "connectapi", "/workout-service/workout", "POST", json=workout)
+    workout_id = workout_id_of(result)
+    if workout_id is None:
+        raise ValueError(f"Workout created but could not extract workout ID. Response: {result}")
+    current().verified_workouts.add(workout_id)
+    await run_blocking(tool, index.add, workout_id, workout)
+    return workout_id, None
+
+
+async def find_or_create_workout(tool: str, workout: Dict[str, Any],
+                                 reuse_existing: bool = True) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Return the ID of an existing workout with the same steps, or create the workout
+    
+    Returns the workout ID and the reused index entry, None if the workout was created.
+    Concurrent calls for the same steps share one lookup and creation.
+    
+    Args:
+        tool: Name of the calling tool
+        workout: Workout payload, as built by build_workout
+        reuse_existing: Look the workout up in the workout index before creating it
+    """
+    if not reuse_existing:
+        return await _find_or_create(tool, workout, None)
+    key = steps_key(workout)
+    return await single_flight(tool, f"{current_account.get()}/workout-steps/{key}",
+                               lambda: _find_or_create(tool, workout, key))
+
+
+def workout_missing(error: Exception) -> bool:
+    """Whether scheduling failed because the workout does not exist (anymore)"""
+    return classify(error)[1] == 404
+
+
+async def forget_workout(tool: str, workout_id: int) -> None:
+    """Drop a workout that no longer exists from the verified IDs and the workout index"""
+    account = current()
+    account.verified_workouts.discard(workout_id)
+    await run_blocking(tool, account.workout_index.delete, workout_id)
+
+
+async def verify_workout(tool: str, workout_id: int) -> bool:
+    """Return whether a workout exists, looking it up at most once per account
+    
+    Workouts created or indexed locally count as verified without a request.
+    
+    Args:
+        tool: Name of the calling tool
+        workout_id: ID of the workout
+    """
+    account = current()
+    if workout_id in account.verified_workouts:
+        record_cache("hit")
+        return True
+    if await run_blocking(tool, account.workout_index.has, workout_id):
+        record_cache("hit")
+    else:
+        record_cache("miss")
+        if not await call_garmin("get_workout_by_id", workout_id):
+            return False
+    account.verified_workouts.add(workout_id)
+    return True
+
+
+async def schedule_on(tool: str, workout_id: int, scheduled_date: str, scheduled_time: Optional[str] = None) -> str:
+    """Schedule a workout on one date, falling back to the GraphQL mutation, and return the method that worked
+    
+    Raises an error carrying both failures if neither method works, or the
+    original error if the workout does not exist.
+    
+    Args:
+        tool: Name of the calling tool
+        workout_id: ID of the workout to schedule
+        scheduled_date: Date in YYYY-MM-DD format
+        scheduled_time: Optional time in HH:MM format, not supported by the GraphQL mutation
+    """
+    payload = {"scheduledDate": scheduled_date}
+    if scheduled_time:
+        payload["scheduledTime"] = scheduled_time
+    try:
+        await call_garth(tool, "request", "POST", "connectapi", f"/workout-service/schedule/{workout_id}",
+                         json=payload, api=True)
+        return "rest"
+    except Exception as e:
+        if workout_missing(e):
+            # The mutation cannot schedule a workout that does not exist either
+            raise
+        mutation = {"query": "mutation{" + field("scheduleWorkout", {"workoutId": workout_id,
+                                                                     "scheduledDate": scheduled_date}, "{id}") + "}"}
+        try:
+            await call_garmin("query_garmin_graphql", mutation)
+        except Exception as e2:
+            raise RuntimeError(f"{str(e)}. Alternative method also failed: {str(e2)}")
+        return "graphql"
+
+
+MAX_PAGE_SIZE = 200
+# Number of prefetched activity pages kept in memory
+PREFETCH_PAGES = int(os.getenv("GARMIN_PREFETCH_PAGES", "8"))
+# Seconds a prefetched page is served, newer activities shift the offsets of older pages
+PREFETCH_TTL = float(os.getenv("GARMIN_PREFETCH_TTL", "60"))
+# (account, cursor) -> (monotonic start time, page fetch)
+_prefetched: "OrderedDict[Tuple[str, str], Tuple[float, asyncio.Future]]" = OrderedDict()
+
+
+def _encode_cursor(state: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, sort_keys=True).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def _fetch_activity_page(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    client = get_client()
+    if state.get("gear"):
+        url = f"{client.garmin_connect_activities_baseurl}{state['gear']}/gear"
+        params = {"start": str(state["start"]), "limit": str(state["limit"])}
+        return client.connectapi(url, params=params) or []
+    return client.get_activities(state["start"], state["limit"], state.get("activity_type") or None) or []
+
+
+def _start_page_fetch(state: Dict[str, Any]) -> asyncio.Future:
+    tool = "list_gear_activities" if state.get("gear") else "list_activities"
+    task = asyncio.ensure_future(run_blocking(tool, _fetch_activity_page, state))
+    # Prefetches that are never consumed must not log unretrieved exceptions
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return task
+
+
+async def fetch_activity_page(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Fetch one page of activities and start prefetching the page after it
+    
+    Args:
+        state: Decoded cursor with start, limit and either gear or activity_type
+    
+    Returns the page and a cursor for the next page (None on the last page).
+    """
+    account = current_account.get()
+    started, task = _prefetched.pop((account, _encode_cursor(state)), (0.0, None))
+    if task is not None and time.monotonic() - started > PREFETCH_TTL:
+        task.cancel()
+        task = None
+    task = task or _start_page_fetch(state)
+    page = await task
+    next_cursor = None
+    if len(page) == state["limit"]:
+        next_state = dict(state, start=state["start"] + state["limit"])
+        next_cursor = _encode_cursor(next_state)
+        if (account, next_cursor) not in _prefetched:
+            _prefetched[account, next_cursor] = (time.monotonic(), _start_page_fetch(next_state))
+            while len(_prefetched) > PREFETCH_PAGES:
+                _, (_, stale) = _prefetched.popitem(last=False)
+                stale.cancel()
+    return {"activities": page, "next_cursor": next_cursor}
+
+
+def _drop_prefetched() -> None:
+    account = current_account.get()
+    for key in [key for key in _prefetched if key[0] == account]:
+        _prefetched.pop(key)[1].cancel()
+
+
+def _page_state(cursor: str, **initial) -> Dict[str, Any]:
+    if not cursor:
+        initial["limit"] = max(1, min(initial["limit"], MAX_PAGE_SIZE))
+        return dict(initial, start=0)
+    state = _decode_cursor(cursor)
+    if not isinstance(state, dict) or not isinstance(state.get("start"), int) \
+            or not isinstance(state.get("limit"), int):
+        raise ValueError("Invalid cursor")
+    # A cursor only continues the listing it came from
+    if state.get("gear") != initial.get("gear") or \
+            (initial.get("activity_type") and state.get("activity_type") != initial["activity_type"]):
+        raise ValueError("Cursor belongs to a different listing")
+    state["start"] = max(0, state["start"])
+    state["limit"] = max(1, min(state["limit"], MAX_PAGE_SIZE))
+    return state
+
+
+def compact_json(value: Any) -> str:
+    """Serialize value as JSON without insignificant whitespace"""
+    with serializing():
+        return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def respond(tool: str, value: Any, fields: str = "") -> Any:
+    """Project a Garmin response for a tool and serialize it as compact JSON
     
+    Args:
+        tool: Tool name, used to look up its default summary projection
+        value: Decoded Garmin response
+        fields: Comma-separated dotted field paths, "" for the tool's default or "*" for everything
+    """
+    if not isinstance(value, (dict, list)):
+        return value
+    with serializing():
+        return compact_json(project(value, resolve_fields(tool, fields)))
+
+
+async def call_garth(tool: str, method: str, *args, **kwargs) -> Any:
+    """Make a raw garth request in the shared worker pool
+    
+    Args:
+        tool: Name of the calling tool, used for concurrency limits and metrics
+        method: Name of the garth client method (request, post, ...)
+        *args, **kwargs: Arguments passed to the method
+    """
+    return await run_blocking(tool, _call_garth, method, *args, **kwargs)
+
+
+async def run_graphql(tool: str, batch: GraphQLBatch) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Send a batch of GraphQL queries as aliased documents and return the data and errors per alias
+    
+    Documents are sent concurrently, and identical documents already in
+    flight are shared. A failed document fails only its own queries.
+    
+    Args:
+        tool: Name of the calling tool
+        batch: Queries to send
+    """
+    prefix = "" if current().name == DEFAULT_ACCOUNT else f"{current().name}/"
+    documents = batch.documents()
+
+    def send(body):
+        key = prefix + make_key("query_garmin_graphql", body)
+        return single_flight(tool, key, lambda: run_blocking(tool, _call_client, "query_garmin_graphql", body))
+
+    responses = await asyncio.gather(*(send(body) for _, body in documents), return_exceptions=True)
+    return GraphQLBatch.split(documents, responses)
+
+
 @app.tool()
-async def get_activities_by_date(start_date: str, end_date: str, activity_type: str = "") -> str:
+@with_account
+async def get_activities_by_date(start_date: str, end_date: str, activity_type: str = "", fields: str = "") -> str:
     """Get activities data between specified dates, optionally filtered by activity type
     
     Args:
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format
         activity_type: Optional activity type filter (e.g., cycling, running, swimming)
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        activities = garmin_client.get_activities_by_date(start_date, end_date, activity_type)
+        activities = await call_garmin("get_activities_by_date", start_date, end_date, activity_type)
         if not activities:
             return f"No activities found between {start_date} and {end_date}" + \
                     (f" for activity type '{activity_type}'" if activity_type else "")
         
-        return activities
+        return respond("get_activities_by_date", activities, fields)
     except Exception as e:
         return f"Error retrieving activities by date: {str(e)}"
 
 @app.tool()
-async def get_activities_fordate(date: str) -> str:
+@with_account
+async def get_activities_fordate(date: str, fields: str = "") -> str:
     """Get activities for a specific date
     
     Args:
         date: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        activities = garmin_client.get_activities_fordate(date)
+        activities = await call_garmin("get_activities_fordate", date)
         if not activities:
             return f"No activities found for {date}"
         
-        return activities
+        return respond("get_activities_fordate", activities, fields)
     except Exception as e:
         return f"Error retrieving activities for date: {str(e)}"
 
 @app.tool()
-async def get_activity(activity_id: int) -> str:
+@with_account
+async def get_activity(activity_id: int, fields: str = "") -> str:
     """Get basic activity information
     
     Args:
         activity_id: ID of the activity to retrieve
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        activity = garmin_client.get_activity(activity_id)
+        activity = await call_garmin("get_activity", activity_id)
         if not activity:
             return f"No activity found with ID {activity_id}"
         
-        return activity
+        return respond("get_activity", activity, fields)
     except Exception as e:
         return f"Error retrieving activity: {str(e)}"
 
 @app.tool()
-async def get_activity_splits(activity_id: int) -> str:
+@with_account
+async def get_activity_splits(activity_id: int, fields: str = "") -> str:
     """Get splits for an activity
     
     Args:
         activity_id: ID of the activity to retrieve splits for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        splits = garmin_client.get_activity_splits(activity_id)
+        splits = await call_garmin("get_activity_splits", activity_id)
         if not splits:
             return f"No splits found for activity with ID {activity_id}"
         
-        return splits
+        return respond("get_activity_splits", splits, fields)
     except Exception as e:
         return f"Error retrieving activity splits: {str(e)}"
 
 @app.tool()
-async def get_activity_typed_splits(activity_id: int) -> str:
+@with_account
+async def get_activity_typed_splits(activity_id: int, fields: str = "") -> str:
     """Get typed splits for an activity
     
     Args:
         activity_id: ID of the activity to retrieve typed splits for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        typed_splits = garmin_client.get_activity_typed_splits(activity_id)
+        typed_splits = await call_garmin("get_activity_typed_splits", activity_id)
         if not typed_splits:
             return f"No typed splits found for activity with ID {activity_id}"
         
-        return typed_splits
+        return respond("get_activity_typed_splits", typed_splits, fields)
     except Exception as e:
         return f"Error retrieving activity typed splits: {str(e)}"
 
 @app.tool()
-async def get_activity_split_summaries(activity_id: int) -> str:
+@with_account
+async def get_activity_split_summaries(activity_id: int, fields: str = "") -> str:
     """Get split summaries for an activity
     
     Args:
         activity_id: ID of the activity to retrieve split summaries for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        split_summaries = garmin_client.get_activity_split_summaries(activity_id)
+        split_summaries = await call_garmin("get_activity_split_summaries", activity_id)
         if not split_summaries:
             return f"No split summaries found for activity with ID {activity_id}"
         
-        return split_summaries
+        return respond("get_activity_split_summaries", split_summaries, fields)
     except Exception as e:
         return f"Error retrieving activity split summaries: {str(e)}"
 
 @app.tool()
-async def get_activity_weather(activity_id: int) -> str:
+@with_account
+async def get_activity_weather(activity_id: int, fields: str = "") -> str:
     """Get weather data for an activity
     
     Args:
         activity_id: ID of the activity to retrieve weather data for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        weather = garmin_client.get_activity_weather(activity_id)
+        weather = await call_garmin("get_activity_weather", activity_id)
         if not weather:
             return f"No weather data found for activity with ID {activity_id}"
         
-        return weather
+        return respond("get_activity_weather", weather, fields)
     except Exception as e:
         return f"Error retrieving activity weather data: {str(e)}"
 
 @app.tool()
-async def get_activity_hr_in_timezones(activity_id: int) -> str:
+@with_account
+async def get_activity_hr_in_timezones(activity_id: int, fields: str = "") -> str:
     """Get heart rate data in different time zones for an activity
     
     Args:
         activity_id: ID of the activity to retrieve heart rate time zone data for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        hr_zones = garmin_client.get_activity_hr_in_timezones(activity_id)
+        hr_zones = await call_garmin("get_activity_hr_in_timezones", activity_id)
         if not hr_zones:
             return f"No heart rate time zone data found for activity with ID {activity_id}"
         
-        return hr_zones
+        return respond("get_activity_hr_in_timezones", hr_zones, fields)
     except Exception as e:
         return f"Error retrieving activity heart rate time zone data: {str(e)}"
 
 @app.tool()
-async def get_activity_gear(activity_id: int) -> str:
+@with_account
+async def get_activity_gear(activity_id: int, fields: str = "") -> str:
     """Get gear data used for an activity
     
     Args:
         activity_id: ID of the activity to retrieve gear data for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        gear = garmin_client.get_activity_gear(activity_id)
+        gear = await call_garmin("get_activity_gear", activity_id)
         if not gear:
             return f"No gear data found for activity with ID {activity_id}"
         
-        return gear
+        return respond("get_activity_gear", gear, fields)
     except Exception as e:
         return f"Error retrieving activity gear data: {str(e)}"
 
 @app.tool()
-async def get_activity_exercise_sets(activity_id: int) -> str:
+@with_account
+async def get_activity_exercise_sets(activity_id: int, fields: str = "") -> str:
     """Get exercise sets for strength training activities
     
     Args:
         activity_id: ID of the activity to retrieve exercise sets for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        exercise_sets = garmin_client.get_activity_exercise_sets(activity_id)
+        exercise_sets = await call_garmin("get_activity_exercise_sets", activity_id)
         if not exercise_sets:
             return f"No exercise sets found for activity with ID {activity_id}"
         
-        return exercise_sets
+        return respond("get_activity_exercise_sets", exercise_sets, fields)
     except Exception as e:
         return f"Error retrieving activity exercise sets: {str(e)}"
     
 
 @app.tool()
-async def get_recent_activities() -> str:
-    """Get recent activities"""
+@with_account
+async def get_recent_activities(fields: str = "") -> str:
+    """Get recent activities
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
+    """
     try:
-        activities = garmin_client.get_activities()
+        activities = await call_garmin("get_activities")
         if not activities:
             return "No recent activities found"
-        return activities
+        return respond("get_recent_activities", activities, fields)
     except Exception as e:
         return f"Error retrieving recent activities: {str(e)}"
 
+@app.tool()
+@with_account
+async def list_activities(cursor: str = "", page_size: int = 50, activity_type: str = "") -> str:
+    """List activities one page at a time, newest first
+    
+    Pass the returned next_cursor to get the following page; it is null on the last page.
+    
+    Args:
+        cursor: Cursor returned by the previous call (omit for the first page)
+        page_size: Activities per page, up to 200 (default: 50, ignored when a cursor is given)
+        activity_type: Optional activity type filter (kept from the cursor when one is given, which must match)
+    """
+    try:
+        state = _page_state(cursor, limit=page_size, activity_type=activity_type)
+        return compact_json(await fetch_activity_page(state))
+    except Exception as e:
+        return f"Error listing activities: {str(e)}"
+
+@app.tool()
+@with_account
+async def list_gear_activities(gearUUID: str, cursor: str = "", page_size: int = 50) -> str:
+    """List activities where specific gear was used one page at a time
+    
+    Pass the returned next_cursor to get the following page; it is null on the last page.
+    
+    Args:
+        gearUUID: UUID of the gear to get activities for
+        cursor: Cursor returned by the previous call (omit for the first page)
+        page_size: Activities per page, up to 200 (default: 50, ignored when a cursor is given)
+    """
+    try:
+        state = _page_state(cursor, limit=page_size, gear=gearUUID)
+        return compact_json(await fetch_activity_page(state))
+    except Exception as e:
+        return f"Error listing gear activities: {str(e)}"
+
 # User Profile and Basic Information
 @app.tool()
+@with_account
 async def get_full_name() -> str:
     """Get user's full name"""
     try:
-        name = garmin_client.get_full_name()
+        name = await call_garmin("get_full_name")
         return name
     except Exception as e:
         return f"Error retrieving full name: {str(e)}"
 
 @app.tool()
+@with_account
 async def get_unit_system() -> str:
     """Get user's unit system preference"""
     try:
-        unit_system = garmin_client.get_unit_system()
+        unit_system = await call_garmin("get_unit_system")
         return unit_system
     except Exception as e:
         return f"Error retrieving unit system: {str(e)}"
 
 @app.tool()
-async def get_user_profile() -> str:
-    """Get all user settings"""
+@with_account
+async def get_user_profile(fields: str = "") -> str:
+    """Get all user settings
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
+    """
     try:
-        profile = garmin_client.get_user_profile()
-        return profile
+        profile = await call_garmin("get_user_profile")
+        return respond("get_user_profile", profile, fields)
     except Exception as e:
         return f"Error retrieving user profile: {str(e)}"
 
 @app.tool()
-async def get_userprofile_settings() -> str:
-    """Get user settings"""
+@with_account
+async def get_userprofile_settings(fields: str = "") -> str:
+    """Get user settings
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
+    """
     try:
-        settings = garmin_client.get_userprofile_settings()
-        return settings
+        settings = await call_garmin("get_userprofile_settings")
+        return respond("get_userprofile_settings", settings, fields)
     except Exception as e:
         return f"Error retrieving user profile settings: {str(e)}"
 
 # Device Management
 @app.tool()
-async def get_devices() -> str:
-    """Get all available devices for the current user account"""
+@with_account
+async def get_devices(fields: str = "") -> str:
+    """Get all available devices for the current user account
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
+    """
     try:
-        devices = garmin_client.get_devices()
-        return devices
+        devices = await call_garmin("get_devices")
+        return respond("get_devices", devices, fields)
     except Exception as e:
         return f"Error retrieving devices: {str(e)}"
 
 @app.tool()
-async def get_device_last_used() -> str:
-    """Get device last used information"""
+@with_account
+async def get_device_last_used(fields: str = "") -> str:
+    """Get device last used information
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
+    """
     try:
-        device_info = garmin_client.get_device_last_used()
-        return device_info
+        device_info = await call_garmin("get_device_last_used")
+        return respond("get_device_last_used", device_info, fields)
     except Exception as e:
         return f"Error retrieving device last used: {str(e)}"
 
 @app.tool()
-async def get_device_settings(device_id: str) -> str:
+@with_account
+async def get_device_settings(device_id: str, fields: str = "") -> str:
     """Get device settings for a specific device
     
     Args:
         device_id: ID of the device to get settings for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        settings = garmin_client.get_device_settings(device_id)
-        return settings
+        settings = await call_garmin("get_device_settings", device_id)
+        return respond("get_device_settings", settings, fields)
     except Exception as e:
         return f"Error retrieving device settings: {str(e)}"
 
 @app.tool()
-async def get_device_alarms() -> str:
-    """Get list of active alarms from all devices"""
+@with_account
+async def get_device_alarms(fields: str = "") -> str:
+    """Get list of active alarms from all devices
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
+    """
     try:
-        alarms = garmin_client.get_device_alarms()
-        return alarms
+        alarms = await call_garmin("get_device_alarms")
+        return respond("get_device_alarms", alarms, fields)
     except Exception as e:
         return f"Error retrieving device alarms: {str(e)}"
 
 @app.tool()
-async def get_primary_training_device() -> str:
-    """Get detailed information about primary training devices"""
+@with_account
+async def get_primary_training_device(fields: str = "") -> str:
+    """Get detailed information about primary training devices
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
+    """
     try:
-        device_info = garmin_client.get_primary_training_device()
-        return device_info
+        device_info = await call_garmin("get_primary_training_device")
+        return respond("get_primary_training_device", device_info, fields)
     except Exception as e:
         return f"Error retrieving primary training device: {str(e)}"
 
 # Health and Wellness Data
 @app.tool()
-async def get_stats(cdate: str) -> str:
+@with_account
+async def get_stats(cdate: str, fields: str = "") -> str:
     """Get user activity summary for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        stats = garmin_client.get_stats(cdate)
-        return stats
+        stats = await call_garmin("get_stats", cdate)
+        return respond("get_stats", stats, fields)
     except Exception as e:
         return f"Error retrieving stats: {str(e)}"
 
 @app.tool()
-async def get_user_summary(cdate: str) -> str:
+@with_account
+async def get_user_summary(cdate: str, fields: str = "") -> str:
     """Get user activity summary for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        summary = garmin_client.get_user_summary(cdate)
-        return summary
+        summary = await call_garmin("get_user_summary", cdate)
+        return respond("get_user_summary", summary, fields)
     except Exception as e:
         return f"Error retrieving user summary: {str(e)}"
 
 @app.tool()
-async def get_steps_data(cdate: str) -> str:
+@with_account
+async def get_steps_data(cdate: str, fields: str = "") -> str:
     """Get steps data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        steps = garmin_client.get_steps_data(cdate)
-        return steps
+        steps = await call_garmin("get_steps_data", cdate)
+        return respond("get_steps_data", steps, fields)
     except Exception as e:
         return f"Error retrieving steps data: {str(e)}"
 
 @app.tool()
-async def get_daily_steps(start: str, end: str) -> str:
+@with_account
+async def get_daily_steps(start: str, end: str, fields: str = "") -> str:
     """Get steps data between two dates
     
     Args:
         start: Start date in YYYY-MM-DD format
         end: End date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        steps = garmin_client.get_daily_steps(start, end)
-        return steps
+        steps = await call_garmin("get_daily_steps", start, end)
+        return respond("get_daily_steps", steps, fields)
     except Exception as e:
         return f"Error retrieving daily steps: {str(e)}"
 
 @app.tool()
-async def get_heart_rates(cdate: str) -> str:
+@with_account
+async def get_heart_rates(cdate: str, fields: str = "") -> str:
     """Get heart rate data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        heart_rates = garmin_client.get_heart_rates(cdate)
-        return heart_rates
+        heart_rates = await call_garmin("get_heart_rates", cdate)
+        return respond("get_heart_rates", heart_rates, fields)
     except Exception as e:
         return f"Error retrieving heart rates: {str(e)}"
 
 @app.tool()
-async def get_rhr_day(cdate: str) -> str:
+@with_account
+async def get_rhr_day(cdate: str, fields: str = "") -> str:
     """Get resting heart rate data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        rhr = garmin_client.get_rhr_day(cdate)
-        return rhr
+        rhr = await call_garmin("get_rhr_day", cdate)
+        return respond("get_rhr_day", rhr, fields)
     except Exception as e:
         return f"Error retrieving resting heart rate: {str(e)}"
 
 @app.tool()
-async def get_hrv_data(cdate: str) -> str:
+@with_account
+async def get_hrv_data(cdate: str, fields: str = "") -> str:
     """Get Heart Rate Variability (HRV) data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        hrv = garmin_client.get_hrv_data(cdate)
-        return hrv
+        hrv = await call_garmin("get_hrv_data", cdate)
+        return respond("get_hrv_data", hrv, fields)
     except Exception as e:
         return f"Error retrieving HRV data: {str(e)}"
 
 @app.tool()
-async def get_sleep_data(cdate: str) -> str:
+@with_account
+async def get_sleep_data(cdate: str, fields: str = "") -> str:
     """Get sleep data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        sleep = garmin_client.get_sleep_data(cdate)
-        return sleep
+        sleep = await call_garmin("get_sleep_data", cdate)
+        return respond("get_sleep_data", sleep, fields)
     except Exception as e:
         return f"Error retrieving sleep data: {str(e)}"
 
 @app.tool()
-async def get_stress_data(cdate: str) -> str:
+@with_account
+async def get_stress_data(cdate: str, fields: str = "") -> str:
     """Get stress data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        stress = garmin_client.get_stress_data(cdate)
-        return stress
+        stress = await call_garmin("get_stress_data", cdate)
+        return respond("get_stress_data", stress, fields)
     except Exception as e:
         return f"Error retrieving stress data: {str(e)}"
 
 @app.tool()
-async def get_all_day_stress(cdate: str) -> str:
+@with_account
+async def get_all_day_stress(cdate: str, fields: str = "") -> str:
     """Get all day stress data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        stress = garmin_client.get_all_day_stress(cdate)
-        return stress
+        stress = await call_garmin("get_all_day_stress", cdate)
+        return respond("get_all_day_stress", stress, fields)
     except Exception as e:
         return f"Error retrieving all day stress data: {str(e)}"
 
 @app.tool()
-async def get_body_battery(startdate: str, enddate: str = None) -> str:
+@with_account
+async def get_body_battery(startdate: str, enddate: str = None, fields: str = "") -> str:
     """Get body battery values between dates
     
     Args:
         startdate: Start date in YYYY-MM-DD format
         enddate: End date in YYYY-MM-DD format (optional)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        battery = garmin_client.get_body_battery(startdate, enddate)
-        return battery
+        battery = await call_garmin("get_body_battery", startdate, enddate)
+        return respond("get_body_battery", battery, fields)
     except Exception as e:
         return f"Error retrieving body battery data: {str(e)}"
 
 @app.tool()
-async def get_body_battery_events(cdate: str) -> str:
+@with_account
+async def get_body_battery_events(cdate: str, fields: str = "") -> str:
     """Get body battery events for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        events = garmin_client.get_body_battery_events(cdate)
-        return events
+        events = await call_garmin("get_body_battery_events", cdate)
+        return respond("get_body_battery_events", events, fields)
     except Exception as e:
         return f"Error retrieving body battery events: {str(e)}"
 
 @app.tool()
-async def get_body_composition(startdate: str, enddate: str = None) -> str:
+@with_account
+async def get_body_composition(startdate: str, enddate: str = None, fields: str = "") -> str:
     """Get body composition data between dates
     
     Args:
         startdate: Start date in YYYY-MM-DD format
         enddate: End date in YYYY-MM-DD format (optional)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        composition = garmin_client.get_body_composition(startdate, enddate)
-        return composition
+        composition = await call_garmin("get_body_composition", startdate, enddate)
+        return respond("get_body_composition", composition, fields)
     except Exception as e:
         return f"Error retrieving body composition: {str(e)}"
 
 @app.tool()
-async def get_stats_and_body(cdate: str) -> str:
+@with_account
+async def get_stats_and_body(cdate: str, fields: str = "") -> str:
     """Get activity data and body composition for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        data = garmin_client.get_stats_and_body(cdate)
-        return data
+        data = await call_garmin("get_stats_and_body", cdate)
+        return respond("get_stats_and_body", data, fields)
     except Exception as e:
         return f"Error retrieving stats and body data: {str(e)}"
 
 @app.tool()
-async def get_hydration_data(cdate: str) -> str:
+@with_account
+async def get_hydration_data(cdate: str, fields: str = "") -> str:
     """Get hydration data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        hydration = garmin_client.get_hydration_data(cdate)
-        return hydration
+        hydration = await call_garmin("get_hydration_data", cdate)
+        return respond("get_hydration_data", hydration, fields)
     except Exception as e:
         return f"Error retrieving hydration data: {str(e)}"
 
 @app.tool()
-async def get_respiration_data(cdate: str) -> str:
+@with_account
+async def get_respiration_data(cdate: str, fields: str = "") -> str:
     """Get respiration data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        respiration = garmin_client.get_respiration_data(cdate)
-        return respiration
+        respiration = await call_garmin("get_respiration_data", cdate)
+        return respond("get_respiration_data", respiration, fields)
     except Exception as e:
         return f"Error retrieving respiration data: {str(e)}"
 
 @app.tool()
-async def get_spo2_data(cdate: str) -> str:
+@with_account
+async def get_spo2_data(cdate: str, fields: str = "") -> str:
     """Get SpO2 data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        spo2 = garmin_client.get_spo2_data(cdate)
-        return spo2
+        spo2 = await call_garmin("get_spo2_data", cdate)
+        return respond("get_spo2_data", spo2, fields)
     except Exception as e:
         return f"Error retrieving SpO2 data: {str(e)}"
 
 @app.tool()
-async def get_floors(cdate: str) -> str:
+@with_account
+async def get_floors(cdate: str, fields: str = "") -> str:
     """Get floors data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        floors = garmin_client.get_floors(cdate)
-        return floors
+        floors = await call_garmin("get_floors", cdate)
+        return respond("get_floors", floors, fields)
     except Exception as e:
         return f"Error retrieving floors data: {str(e)}"
 
 @app.tool()
-async def get_intensity_minutes_data(cdate: str) -> str:
+@with_account
+async def get_intensity_minutes_data(cdate: str, fields: str = "") -> str:
     """Get Intensity Minutes data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        intensity = garmin_client.get_intensity_minutes_data(cdate)
-        return intensity
+        intensity = await call_garmin("get_intensity_minutes_data", cdate)
+        return respond("get_intensity_minutes_data", intensity, fields)
     except Exception as e:
         return f"Error retrieving intensity minutes data: {str(e)}"
 
 @app.tool()
-async def get_max_metrics(cdate: str) -> str:
+@with_account
+async def get_max_metrics(cdate: str, fields: str = "") -> str:
     """Get max metric data (like vo2MaxValue and fitnessAge) for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        metrics = garmin_client.get_max_metrics(cdate)
-        return metrics
+        metrics = await call_garmin("get_max_metrics", cdate)
+        return respond("get_max_metrics", metrics, fields)
     except Exception as e:
         return f"Error retrieving max metrics: {str(e)}"
 
 @app.tool()
-async def get_fitnessage_data(cdate: str) -> str:
+@with_account
+async def get_fitnessage_data(cdate: str, fields: str = "") -> str:
     """Get Fitness Age data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        fitness_age = garmin_client.get_fitnessage_data(cdate)
-        return fitness_age
+        fitness_age = await call_garmin("get_fitnessage_data", cdate)
+        return respond("get_fitnessage_data", fitness_age, fields)
     except Exception as e:
         return f"Error retrieving fitness age data: {str(e)}"
 
 @app.tool()
-async def get_training_readiness(cdate: str) -> str:
+@with_account
+async def get_training_readiness(cdate: str, fields: str = "") -> str:
     """Get training readiness data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        readiness = garmin_client.get_training_readiness(cdate)
-        return readiness
+        readiness = await call_garmin("get_training_readiness", cdate)
+        return respond("get_training_readiness", readiness, fields)
     except Exception as e:
         return f"Error retrieving training readiness: {str(e)}"
 
 @app.tool()
-async def get_training_status(cdate: str) -> str:
+@with_account
+async def get_training_status(cdate: str, fields: str = "") -> str:
     """Get training status data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        status = garmin_client.get_training_status(cdate)
-        return status
+        status = await call_garmin("get_training_status", cdate)
+        return respond("get_training_status", status, fields)
     except Exception as e:
         return f"Error retrieving training status: {str(e)}"
 
 @app.tool()
-async def get_hill_score(startdate: str, enddate: str = None) -> str:
+@with_account
+async def get_hill_score(startdate: str, enddate: str = None, fields: str = "") -> str:
     """Get hill score data between dates
     
     Args:
         startdate: Start date in YYYY-MM-DD format
         enddate: End date in YYYY-MM-DD format (optional)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        hill_score = garmin_client.get_hill_score(startdate, enddate)
-        return hill_score
+        hill_score = await call_garmin("get_hill_score", startdate, enddate)
+        return respond("get_hill_score", hill_score, fields)
     except Exception as e:
         return f"Error retrieving hill score: {str(e)}"
 
 @app.tool()
-async def get_endurance_score(startdate: str, enddate: str = None) -> str:
+@with_account
+async def get_endurance_score(startdate: str, enddate: str = None, fields: str = "") -> str:
     """Get endurance score data between dates
     
     Args:
         startdate: Start date in YYYY-MM-DD format
         enddate: End date in YYYY-MM-DD format (optional)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        endurance_score = garmin_client.get_endurance_score(startdate, enddate)
-        return endurance_score
+        endurance_score = await call_garmin("get_endurance_score", startdate, enddate)
+        return respond("get_endurance_score", endurance_score, fields)
     except Exception as e:
         return f"Error retrieving endurance score: {str(e)}"
 
+# Date Range Wellness Data
+@app.tool()
+@with_account
+async def get_stats_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get user activity summaries for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_stats", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving stats range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_sleep_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get sleep data for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_sleep_data", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving sleep data range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_hrv_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get Heart Rate Variability (HRV) data for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_hrv_data", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving HRV data range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_stress_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get stress data for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_stress_data", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving stress data range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_heart_rates_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get heart rate data for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_heart_rates", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving heart rates range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_rhr_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get resting heart rate data for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_rhr_day", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving resting heart rates range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_respiration_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get respiration data for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_respiration_data", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving respiration data range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_spo2_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get SpO2 data for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_spo2_data", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving SpO2 data range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_training_readiness_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get training readiness data for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_training_readiness", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving training readiness range: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_body_battery_events_range(start: str, end: str, max_parallel: int = RANGE_CONCURRENCY, fields: str = "") -> str:
+    """Get body battery events for every date between two dates
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        max_parallel: Maximum number of days fetched at once (default: 4)
+        fields: Comma-separated dotted field paths kept for each day (default: summary fields, "*" for the full response)
+    """
+    try:
+        return compact_json(await fetch_range("get_body_battery_events", start, end, max_parallel, fields))
+    except Exception as e:
+        return f"Error retrieving body battery events range: {str(e)}"
+
 # Weight and Body Composition Management
 @app.tool()
-async def get_weigh_ins(startdate: str, enddate: str) -> str:
+@with_account
+async def get_weigh_ins(startdate: str, enddate: str, fields: str = "") -> str:
     """Get weigh-ins between two dates
     
     Args:
         startdate: Start date in YYYY-MM-DD format
         enddate: End date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        weigh_ins = garmin_client.get_weigh_ins(startdate, enddate)
-        return weigh_ins
+        weigh_ins = await call_garmin("get_weigh_ins", startdate, enddate)
+        return respond("get_weigh_ins", weigh_ins, fields)
     except Exception as e:
         return f"Error retrieving weigh-ins: {str(e)}"
 
 @app.tool()
-async def get_daily_weigh_ins(cdate: str) -> str:
+@with_account
+async def get_daily_weigh_ins(cdate: str, fields: str = "") -> str:
     """Get weigh-ins for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        weigh_ins = garmin_client.get_daily_weigh_ins(cdate)
-        return weigh_ins
+        weigh_ins = await call_garmin("get_daily_weigh_ins", cdate)
+        return respond("get_daily_weigh_ins", weigh_ins, fields)
     except Exception as e:
         return f"Error retrieving daily weigh-ins: {str(e)}"
 
 @app.tool()
+@with_account
 async def add_weigh_in(weight: int, unitKey: str = "kg", timestamp: str = "") -> str:
     """Add a weigh-in
     
@@ -656,12 +1526,13 @@ async def add_weigh_in(weight: int, unitKey: str = "kg", timestamp: str = "") ->
         timestamp: Timestamp (optional)
     """
     try:
-        result = garmin_client.add_weigh_in(weight, unitKey, timestamp)
+        result = await call_garmin("add_weigh_in", weight, unitKey, timestamp)
         return f"Successfully added weigh-in: {result}"
     except Exception as e:
         return f"Error adding weigh-in: {str(e)}"
 
 @app.tool()
+@with_account
 async def add_weigh_in_with_timestamps(weight: int, unitKey: str = "kg", dateTimestamp: str = "", gmtTimestamp: str = "") -> str:
     """Add a weigh-in with explicit timestamps
     
@@ -672,12 +1543,13 @@ async def add_weigh_in_with_timestamps(weight: int, unitKey: str = "kg", dateTim
         gmtTimestamp: GMT timestamp (optional)
     """
     try:
-        result = garmin_client.add_weigh_in_with_timestamps(weight, unitKey, dateTimestamp, gmtTimestamp)
+        result = await call_garmin("add_weigh_in_with_timestamps", weight, unitKey, dateTimestamp, gmtTimestamp)
         return f"Successfully added weigh-in with timestamps: {result}"
     except Exception as e:
         return f"Error adding weigh-in with timestamps: {str(e)}"
 
 @app.tool()
+@with_account
 async def delete_weigh_ins(cdate: str, delete_all: bool = False) -> str:
     """Delete weigh-ins for a specific date
     
@@ -686,12 +1558,13 @@ async def delete_weigh_ins(cdate: str, delete_all: bool = False) -> str:
         delete_all: Whether to delete all weigh-ins for that date (default: False)
     """
     try:
-        result = garmin_client.delete_weigh_ins(cdate, delete_all)
+        result = await call_garmin("delete_weigh_ins", cdate, delete_all)
         return f"Successfully deleted weigh-ins: {result}"
     except Exception as e:
         return f"Error deleting weigh-ins: {str(e)}"
 
 @app.tool()
+@with_account
 async def delete_weigh_in(weight_pk: str, cdate: str) -> str:
     """Delete a specific weigh-in
     
@@ -700,12 +1573,13 @@ async def delete_weigh_in(weight_pk: str, cdate: str) -> str:
         cdate: Date in YYYY-MM-DD format
     """
     try:
-        result = garmin_client.delete_weigh_in(weight_pk, cdate)
+        result = await call_garmin("delete_weigh_in", weight_pk, cdate)
         return f"Successfully deleted weigh-in: {result}"
     except Exception as e:
         return f"Error deleting weigh-in: {str(e)}"
 
 @app.tool()
+@with_account
 async def add_body_composition(timestamp: str, weight: float, percent_fat: float = None, percent_hydration: float = None, 
                               visceral_fat_mass: float = None, bone_mass: float = None, muscle_mass: float = None, 
                               basal_met: float = None, active_met: float = None, physique_rating: float = None, 
@@ -728,7 +1602,7 @@ async def add_body_composition(timestamp: str, weight: float, percent_fat: float
         bmi: BMI (optional)
     """
     try:
-        result = garmin_client.add_body_composition(timestamp, weight, percent_fat, percent_hydration, 
+        result = await call_garmin("add_body_composition", timestamp, weight, percent_fat, percent_hydration, 
                                                    visceral_fat_mass, bone_mass, muscle_mass, basal_met, 
                                                    active_met, physique_rating, metabolic_age, visceral_fat_rating, bmi)
         return f"Successfully added body composition: {result}"
@@ -736,6 +1610,7 @@ async def add_body_composition(timestamp: str, weight: float, percent_fat: float
         return f"Error adding body composition: {str(e)}"
 
 @app.tool()
+@with_account
 async def add_hydration_data(value_in_ml: float, timestamp: str = None, cdate: str = None) -> str:
     """Add hydration data in ml
     
@@ -745,27 +1620,30 @@ async def add_hydration_data(value_in_ml: float, timestamp: str = None, cdate: s
         cdate: The date of the hydration update (optional)
     """
     try:
-        result = garmin_client.add_hydration_data(value_in_ml, timestamp, cdate)
+        result = await call_garmin("add_hydration_data", value_in_ml, timestamp, cdate)
         return f"Successfully added hydration data: {result}"
     except Exception as e:
         return f"Error adding hydration data: {str(e)}"
 
 # Blood Pressure and Medical Data
 @app.tool()
-async def get_blood_pressure(startdate: str, enddate: str = None) -> str:
+@with_account
+async def get_blood_pressure(startdate: str, enddate: str = None, fields: str = "") -> str:
     """Get blood pressure data between dates
     
     Args:
         startdate: Start date in YYYY-MM-DD format
         enddate: End date in YYYY-MM-DD format (optional)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        bp = garmin_client.get_blood_pressure(startdate, enddate)
-        return bp
+        bp = await call_garmin("get_blood_pressure", startdate, enddate)
+        return respond("get_blood_pressure", bp, fields)
     except Exception as e:
         return f"Error retrieving blood pressure data: {str(e)}"
 
 @app.tool()
+@with_account
 async def set_blood_pressure(systolic: int, diastolic: int, pulse: int, timestamp: str = "", notes: str = "") -> str:
     """Add blood pressure measurement
     
@@ -777,12 +1655,13 @@ async def set_blood_pressure(systolic: int, diastolic: int, pulse: int, timestam
         notes: Notes (optional)
     """
     try:
-        result = garmin_client.set_blood_pressure(systolic, diastolic, pulse, timestamp, notes)
+        result = await call_garmin("set_blood_pressure", systolic, diastolic, pulse, timestamp, notes)
         return f"Successfully added blood pressure: {result}"
     except Exception as e:
         return f"Error adding blood pressure: {str(e)}"
 
 @app.tool()
+@with_account
 async def delete_blood_pressure(version: str, cdate: str) -> str:
     """Delete specific blood pressure measurement
     
@@ -791,102 +1670,122 @@ async def delete_blood_pressure(version: str, cdate: str) -> str:
         cdate: Date in YYYY-MM-DD format
     """
     try:
-        result = garmin_client.delete_blood_pressure(version, cdate)
+        result = await call_garmin("delete_blood_pressure", version, cdate)
         return f"Successfully deleted blood pressure: {result}"
     except Exception as e:
         return f"Error deleting blood pressure: {str(e)}"
 
 @app.tool()
-async def get_menstrual_calendar_data(startdate: str, enddate: str) -> str:
+@with_account
+async def get_menstrual_calendar_data(startdate: str, enddate: str, fields: str = "") -> str:
     """Get menstrual calendar data between dates
     
     Args:
         startdate: Start date in YYYY-MM-DD format
         enddate: End date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        menstrual_data = garmin_client.get_menstrual_calendar_data(startdate, enddate)
-        return menstrual_data
+        menstrual_data = await call_garmin("get_menstrual_calendar_data", startdate, enddate)
+        return respond("get_menstrual_calendar_data", menstrual_data, fields)
     except Exception as e:
         return f"Error retrieving menstrual calendar data: {str(e)}"
 
 @app.tool()
-async def get_menstrual_data_for_date(fordate: str) -> str:
+@with_account
+async def get_menstrual_data_for_date(fordate: str, fields: str = "") -> str:
     """Get menstrual data for a specific date
     
     Args:
         fordate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        menstrual_data = garmin_client.get_menstrual_data_for_date(fordate)
-        return menstrual_data
+        menstrual_data = await call_garmin("get_menstrual_data_for_date", fordate)
+        return respond("get_menstrual_data_for_date", menstrual_data, fields)
     except Exception as e:
         return f"Error retrieving menstrual data: {str(e)}"
 
 @app.tool()
-async def get_pregnancy_summary() -> str:
-    """Get pregnancy summary data"""
+@with_account
+async def get_pregnancy_summary(fields: str = "") -> str:
+    """Get pregnancy summary data
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
+    """
     try:
-        pregnancy_data = garmin_client.get_pregnancy_summary()
-        return pregnancy_data
+        pregnancy_data = await call_garmin("get_pregnancy_summary")
+        return respond("get_pregnancy_summary", pregnancy_data, fields)
     except Exception as e:
         return f"Error retrieving pregnancy summary: {str(e)}"
 
 # Gear and Equipment Management
 @app.tool()
-async def get_gear(userProfileNumber: int) -> str:
+@with_account
+async def get_gear(userProfileNumber: int, fields: str = "") -> str:
     """Get all user gear
     
     Args:
         userProfileNumber: User profile number
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        gear = garmin_client.get_gear(userProfileNumber)
-        return gear
+        gear = await call_garmin("get_gear", userProfileNumber)
+        return respond("get_gear", gear, fields)
     except Exception as e:
         return f"Error retrieving gear: {str(e)}"
 
 @app.tool()
-async def get_gear_defaults(userProfileNumber: int) -> str:
+@with_account
+async def get_gear_defaults(userProfileNumber: int, fields: str = "") -> str:
     """Get gear defaults for a user profile
     
     Args:
         userProfileNumber: User profile number
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        defaults = garmin_client.get_gear_defaults(userProfileNumber)
-        return defaults
+        defaults = await call_garmin("get_gear_defaults", userProfileNumber)
+        return respond("get_gear_defaults", defaults, fields)
     except Exception as e:
         return f"Error retrieving gear defaults: {str(e)}"
 
 @app.tool()
-async def get_gear_ativities(gearUUID: str, limit: int = 9999) -> str:
+@with_account
+async def get_gear_ativities(gearUUID: str, limit: int = 9999, fields: str = "") -> str:
     """Get activities where specific gear was used
     
+    Returns every activity in one response; use list_gear_activities to page through large histories.
+    
     Args:
         gearUUID: UUID of the gear to get activities for
         limit: Maximum number of activities to return (default: 9999)
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        activities = garmin_client.get_gear_ativities(gearUUID, limit)
-        return activities
+        activities = await call_garmin("get_gear_ativities", gearUUID, limit)
+        return respond("get_gear_ativities", activities, fields)
     except Exception as e:
         return f"Error retrieving gear activities: {str(e)}"
 
 @app.tool()
-async def get_gear_stats(gearUUID: str) -> str:
+@with_account
+async def get_gear_stats(gearUUID: str, fields: str = "") -> str:
     """Get statistics for specific gear
     
     Args:
         gearUUID: UUID of the gear to get stats for
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        stats = garmin_client.get_gear_stats(gearUUID)
-        return stats
+        stats = await call_garmin("get_gear_stats", gearUUID)
+        return respond("get_gear_stats", stats, fields)
     except Exception as e:
         return f"Error retrieving gear stats: {str(e)}"
 
 @app.tool()
+@with_account
 async def set_gear_default(activityType: str, gearUUID: str, defaultGear: bool = True) -> str:
     """Set gear as default for an activity type
     
@@ -896,174 +1795,208 @@ async def set_gear_default(activityType: str, gearUUID: str, defaultGear: bool =
         defaultGear: Whether to set as default (default: True)
     """
     try:
-        result = garmin_client.set_gear_default(activityType, gearUUID, defaultGear)
+        result = await call_garmin("set_gear_default", activityType, gearUUID, defaultGear)
         return f"Successfully set gear default: {result}"
     except Exception as e:
         return f"Error setting gear default: {str(e)}"
 
 # Goals and Challenges
 @app.tool()
-async def get_goals(status: str = "active", start: int = 1, limit: int = 30) -> str:
+@with_account
+async def get_goals(status: str = "active", start: int = 1, limit: int = 30, fields: str = "") -> str:
     """Get goals based on status
     
     Args:
         status: Status of goals (active, future, or past) (default: active)
         start: Initial goal index (default: 1)
         limit: Pagination limit (default: 30)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        goals = garmin_client.get_goals(status, start, limit)
-        return goals
+        goals = await call_garmin("get_goals", status, start, limit)
+        return respond("get_goals", goals, fields)
     except Exception as e:
         return f"Error retrieving goals: {str(e)}"
 
 @app.tool()
-async def get_adhoc_challenges(start: int, limit: int) -> str:
+@with_account
+async def get_adhoc_challenges(start: int, limit: int, fields: str = "") -> str:
     """Get adhoc challenges for current user
     
     Args:
         start: Starting index
         limit: Number of challenges to return
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        challenges = garmin_client.get_adhoc_challenges(start, limit)
-        return challenges
+        challenges = await call_garmin("get_adhoc_challenges", start, limit)
+        return respond("get_adhoc_challenges", challenges, fields)
     except Exception as e:
         return f"Error retrieving adhoc challenges: {str(e)}"
 
 @app.tool()
-async def get_available_badge_challenges(start: int, limit: int) -> str:
+@with_account
+async def get_available_badge_challenges(start: int, limit: int, fields: str = "") -> str:
     """Get available badge challenges
     
     Args:
         start: Starting index
         limit: Number of challenges to return
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        challenges = garmin_client.get_available_badge_challenges(start, limit)
-        return challenges
+        challenges = await call_garmin("get_available_badge_challenges", start, limit)
+        return respond("get_available_badge_challenges", challenges, fields)
     except Exception as e:
         return f"Error retrieving available badge challenges: {str(e)}"
 
 @app.tool()
-async def get_badge_challenges(start: int, limit: int) -> str:
+@with_account
+async def get_badge_challenges(start: int, limit: int, fields: str = "") -> str:
     """Get badge challenges for current user
     
     Args:
         start: Starting index
         limit: Number of challenges to return
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        challenges = garmin_client.get_badge_challenges(start, limit)
-        return challenges
+        challenges = await call_garmin("get_badge_challenges", start, limit)
+        return respond("get_badge_challenges", challenges, fields)
     except Exception as e:
         return f"Error retrieving badge challenges: {str(e)}"
 
 @app.tool()
-async def get_non_completed_badge_challenges(start: int, limit: int) -> str:
+@with_account
+async def get_non_completed_badge_challenges(start: int, limit: int, fields: str = "") -> str:
     """Get non-completed badge challenges for current user
     
     Args:
         start: Starting index
         limit: Number of challenges to return
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        challenges = garmin_client.get_non_completed_badge_challenges(start, limit)
-        return challenges
+        challenges = await call_garmin("get_non_completed_badge_challenges", start, limit)
+        return respond("get_non_completed_badge_challenges", challenges, fields)
     except Exception as e:
         return f"Error retrieving non-completed badge challenges: {str(e)}"
 
 @app.tool()
-async def get_earned_badges() -> str:
-    """Get earned badges for current user"""
+@with_account
+async def get_earned_badges(fields: str = "") -> str:
+    """Get earned badges for current user
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
+    """
     try:
-        badges = garmin_client.get_earned_badges()
-        return badges
+        badges = await call_garmin("get_earned_badges")
+        return respond("get_earned_badges", badges, fields)
     except Exception as e:
         return f"Error retrieving earned badges: {str(e)}"
 
 @app.tool()
-async def get_personal_record() -> str:
-    """Get personal records for current user"""
+@with_account
+async def get_personal_record(fields: str = "") -> str:
+    """Get personal records for current user
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
+    """
     try:
-        records = garmin_client.get_personal_record()
-        return records
+        records = await call_garmin("get_personal_record")
+        return respond("get_personal_record", records, fields)
     except Exception as e:
         return f"Error retrieving personal records: {str(e)}"
 
 @app.tool()
-async def get_inprogress_virtual_challenges(start: int, limit: int) -> str:
+@with_account
+async def get_inprogress_virtual_challenges(start: int, limit: int, fields: str = "") -> str:
     """Get in-progress virtual challenges for current user
     
     Args:
         start: Starting index
         limit: Number of challenges to return
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        challenges = garmin_client.get_inprogress_virtual_challenges(start, limit)
-        return challenges
+        challenges = await call_garmin("get_inprogress_virtual_challenges", start, limit)
+        return respond("get_inprogress_virtual_challenges", challenges, fields)
     except Exception as e:
         return f"Error retrieving in-progress virtual challenges: {str(e)}"
 
 # Workouts and Training
 @app.tool()
-async def get_workouts(start: int = 0, end: int = 100) -> str:
+@with_account
+async def get_workouts(start: int = 0, end: int = 100, fields: str = "") -> str:
     """Get workouts from start to end
     
     Args:
         start: Starting index (default: 0)
         end: Ending index (default: 100)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        workouts = garmin_client.get_workouts(start, end)
-        return workouts
+        workouts = await call_garmin("get_workouts", start, end)
+        return respond("get_workouts", workouts, fields)
     except Exception as e:
         return f"Error retrieving workouts: {str(e)}"
 
 @app.tool()
-async def get_workout_by_id(workout_id: int) -> str:
+@with_account
+async def get_workout_by_id(workout_id: int, fields: str = "") -> str:
     """Get workout by ID
     
     Args:
         workout_id: ID of the workout to retrieve
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        workout = garmin_client.get_workout_by_id(workout_id)
-        return workout
+        workout = await call_garmin("get_workout_by_id", workout_id)
+        return respond("get_workout_by_id", workout, fields)
     except Exception as e:
         return f"Error retrieving workout: {str(e)}"
 
 @app.tool()
-async def download_workout(workout_id: int) -> str:
-    """Download workout by ID
+@with_account
+async def download_workout(workout_id: int, refresh: bool = False) -> str:
+    """Download workout by ID as a FIT file into the local file store
+    
+    Returns the stored file path, its SHA-256 and size. Workouts already in the
+    store are returned without contacting Garmin Connect.
     
     Args:
         workout_id: ID of the workout to download
+        refresh: Download again even if the workout is already stored
     """
     try:
-        workout_data = garmin_client.download_workout(workout_id)
-        return f"Successfully downloaded workout {workout_id}"
+        result = await run_blocking("download_workout", _download_file, "download_workout", workout_id,
+                                    refresh=refresh)
+        return compact_json(result)
     except Exception as e:
         return f"Error downloading workout: {str(e)}"
 
 @app.tool()
-async def get_scheduled_workouts(start_date: str, end_date: str) -> str:
+@with_account
+async def get_scheduled_workouts(start_date: str, end_date: str, fields: str = "") -> str:
     """Get scheduled workouts from calendar between specified dates
     
     Args:
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        query = {
-            "query": f'query{{workoutScheduleSummariesScalar(startDate:"{start_date}", endDate:"{end_date}")}}'
-        }
-        result = garmin_client.query_garmin_graphql(query)
-        return result
+        result = await call_garmin("query_garmin_graphql",
+                                   query("workoutScheduleSummariesScalar",
+                                         {"startDate": start_date, "endDate": end_date}))
+        return respond("get_scheduled_workouts", result, fields)
     except Exception as e:
         return f"Error retrieving scheduled workouts: {str(e)}"
 
 @app.tool()
+@with_account
 async def create_and_schedule_workout(
     workout_name: str,
     scheduled_date: str,
@@ -1080,10 +2013,14 @@ async def create_and_schedule_workout(
     cooldown_duration_seconds: int = None,
     target_pace_seconds_per_km: float = None,
     target_heart_rate_bpm: int = None,
-    intervals: List[Dict[str, Any]] = None
+    intervals: List[Dict[str, Any]] = None,
+    reuse_existing: bool = True
 ) -> str:
     """Create a workout with custom parameters and schedule it to the calendar
     
+    An existing workout with the same steps (found in the local workout index)
+    is scheduled instead of creating a duplicate.
+    
     Args:
         workout_name: Name of the workout
         scheduled_date: Date to schedule the workout (YYYY-MM-DD format)
@@ -1102,229 +2039,274 @@ async def create_and_schedule_workout(
         target_heart_rate_bpm: Target heart rate in BPM (optional)
         intervals: List of interval dictionaries with keys: distance_meters, duration_seconds, 
                    target_pace, target_hr, rest_distance, rest_duration (optional, for complex workouts)
+        reuse_existing: Schedule an existing workout with the same steps instead of creating one (default: True)
     """
     try:
-        # Build workout JSON structure
-        workout_steps = []
-        
-        # Add warmup if specified
-        if warmup_distance_meters or warmup_duration_seconds:
-            warmup_step = {
-                "type": "WarmUp",
-                "duration": {}
-            }
-            if warmup_distance_meters:
-                warmup_step["duration"]["distance"] = warmup_distance_meters
-            if warmup_duration_seconds:
-                warmup_step["duration"]["duration"] = warmup_duration_seconds
-            if target_pace_seconds_per_km:
-                warmup_step["targetType"] = "pace"
-                warmup_step["targetValue"] = target_pace_seconds_per_km
-            if target_heart_rate_bpm:
-                warmup_step["targetType"] = "heartRate"
-                warmup_step["targetValue"] = target_heart_rate_bpm
-            workout_steps.append(warmup_step)
-        
-        # Add intervals/laps if specified
-        if intervals:
-            # Custom intervals provided
-            for interval in intervals:
-                interval_step = {
-                    "type": "Interval",
-                    "duration": {}
-                }
-                if "distance_meters" in interval:
-                    interval_step["duration"]["distance"] = interval["distance_meters"]
-                if "duration_seconds" in interval:
-                    interval_step["duration"]["duration"] = interval["duration_seconds"]
-                if "target_pace" in interval:
-                    interval_step["targetType"] = "pace"
-                    interval_step["targetValue"] = interval["target_pace"]
-                if "target_hr" in interval:
-                    interval_step["targetType"] = "heartRate"
-                    interval_step["targetValue"] = interval["target_hr"]
-                workout_steps.append(interval_step)
-                
-                # Add rest/recovery if specified
-                if "rest_distance" in interval or "rest_duration" in interval:
-                    rest_step = {
-                        "type": "Rest",
-                        "duration": {}
-                    }
-                    if "rest_distance" in interval:
-                        rest_step["duration"]["distance"] = interval["rest_distance"]
-                    if "rest_duration" in interval:
-                        rest_step["duration"]["duration"] = interval["rest_duration"]
-                    workout_steps.append(rest_step)
-        elif laps and (lap_distance_meters or lap_duration_seconds):
-            # Simple interval workout with laps
-            for i in range(laps):
-                lap_step = {
-                    "type": "Interval",
-                    "duration": {}
-                }
-                if lap_distance_meters:
-                    lap_step["duration"]["distance"] = lap_distance_meters
-                if lap_duration_seconds:
-                    lap_step["duration"]["duration"] = lap_duration_seconds
-                if target_pace_seconds_per_km:
-                    lap_step["targetType"] = "pace"
-                    lap_step["targetValue"] = target_pace_seconds_per_km
-                if target_heart_rate_bpm:
-                    lap_step["targetType"] = "heartRate"
-                    lap_step["targetValue"] = target_heart_rate_bpm
-                workout_steps.append(lap_step)
-                
-                # Add rest between laps (except after last lap)
-                if i < laps - 1:
-                    rest_step = {"type": "Rest", "duration": {"duration": 60}}  # 60 second rest
-                    workout_steps.append(rest_step)
-        
-        # Add main workout step if no intervals specified
-        if not intervals and not (laps and (lap_distance_meters or lap_duration_seconds)):
-            main_step = {
-                "type": "Work",
-                "duration": {}
-            }
-            if distance_meters:
-                main_step["duration"]["distance"] = distance_meters
-            if duration_seconds:
-                main_step["duration"]["duration"] = duration_seconds
-            if target_pace_seconds_per_km:
-                main_step["targetType"] = "pace"
-                main_step["targetValue"] = target_pace_seconds_per_km
-            if target_heart_rate_bpm:
-                main_step["targetType"] = "heartRate"
-                main_step["targetValue"] = target_heart_rate_bpm
-            workout_steps.append(main_step)
-        
-        # Add cooldown if specified
-        if cooldown_distance_meters or cooldown_duration_seconds:
-            cooldown_step = {
-                "type": "CoolDown",
-                "duration": {}
-            }
-            if cooldown_distance_meters:
-                cooldown_step["duration"]["distance"] = cooldown_distance_meters
-            if cooldown_duration_seconds:
-                cooldown_step["duration"]["duration"] = cooldown_duration_seconds
-            workout_steps.append(cooldown_step)
-        
-        # Build the workout JSON payload
-        workout_json = {
-            "workoutName": workout_name,
-            "sportType": {
-                "sportTypeKey": activity_type
-            },
-            "workoutSteps": workout_steps
-        }
-        
-        # Create the workout
-        url = f"{garmin_client.garmin_workouts}/workout"
-        result = garmin_client.garth.post("connectapi", url, json=workout_json, api=True)
-        
-        # Extract workout ID from result
-        if isinstance(result, dict) and "workoutId" in result:
-            workout_id = result["workoutId"]
-        elif isinstance(result, dict) and "id" in result:
-            workout_id = result["id"]
-        else:
-            # Try to get the workout ID from the response
-            workout_id = result if isinstance(result, (int, str)) else None
+        workout_json = build_workout(
+            workout_name, activity_type, distance_meters, duration_seconds, laps, lap_distance_meters,
+            lap_duration_seconds, warmup_distance_meters, warmup_duration_seconds, cooldown_distance_meters,
+            cooldown_duration_seconds, target_pace_seconds_per_km, target_heart_rate_bpm, intervals)
         
-        if not workout_id:
-            return f"Workout created but could not extract workout ID. Response: {result}"
+        # Find or create the workout
+        workout_id, existing = await find_or_create_workout("create_and_schedule_workout", workout_json,
+                                                            reuse_existing)
         
         # Schedule the workout
-        schedule_url = f"/workout-service/schedule/{workout_id}"
         schedule_payload = {"scheduledDate": scheduled_date}
         if scheduled_time:
             schedule_payload["scheduledTime"] = scheduled_time
         
-        schedule_result = garmin_client.garth.request(
-            "POST",
-            "connectapi",
-            schedule_url,
-            json=schedule_payload,
-            api=True
-        )
+        async def schedule(workout_id):
+            return await call_garth(
+                "create_and_schedule_workout",
+                "request",
+                "POST",
+                "connectapi",
+                f"/workout-service/schedule/{workout_id}",
+                json=schedule_payload,
+                api=True
+            )
         
-        return f"Successfully created and scheduled workout '{workout_name}' (ID: {workout_id}) for {scheduled_date}" + (f" at {scheduled_time}" if scheduled_time else "")
+        try:
+            await schedule(workout_id)
+        except Exception as e:
+            if not existing or not workout_missing(e):
+                raise
+            # Deleted since the last sync, forget it and create the workout after all
+            await forget_workout("create_and_schedule_workout", workout_id)
+            workout_id, existing = await find_or_create_workout("create_and_schedule_workout", workout_json, False)
+            await schedule(workout_id)
+        
+        when = f"{scheduled_date}" + (f" at {scheduled_time}" if scheduled_time else "")
+        if existing:
+            return f"Successfully scheduled existing workout '{existing['name']}' (ID: {workout_id}) for {when}"
+        return f"Successfully created and scheduled workout '{workout_name}' (ID: {workout_id}) for {when}"
     except Exception as e:
         return f"Error creating and scheduling workout: {str(e)}"
 
 @app.tool()
-async def schedule_workout(workout_id: int, scheduled_date: str, scheduled_time: str = None) -> str:
-    """Schedule a workout to the calendar
+@with_account
+async def create_training_plan(workouts: List[Dict[str, Any]], max_parallel: int = PLAN_CONCURRENCY,
+                               reuse_existing: bool = True) -> str:
+    """Create and schedule a whole training plan in one call, with a status per entry
+    
+    Every entry is validated locally first and nothing is sent if any entry is
+    invalid. Identical workout definitions are created once and scheduled on
+    each of their dates, and existing workouts with the same steps are reused.
+    Creation and scheduling run concurrently, at most max_parallel requests at
+    a time and within the account's request rate limit.
+    
+    Args:
+        workouts: Plan entries, each taking the parameters of create_and_schedule_workout (workout_name,
+                  scheduled_date, scheduled_time, activity_type, distance_meters, ..., intervals). Use "dates"
+                  to schedule an entry on several dates, and "workout_id" instead of a definition to schedule
+                  an existing workout
+        max_parallel: Maximum number of concurrent Garmin requests
+        reuse_existing: Schedule existing workouts with the same steps instead of creating them (default: True)
+    """
+    try:
+        plan: List[Optional[Dict[str, Any]]] = []
+        invalid = []
+        for i, entry in enumerate(workouts):
+            try:
+                plan.append(plan_entry(entry))
+            except ValueError as e:
+                invalid.append({"index": i, "status": "invalid", "error": str(e)})
+        if invalid:
+            return compact_json({"counts": {"invalid": len(invalid)}, "sent": False, "entries": invalid})
+        schedules = sum(len(entry["dates"]) for entry in plan)
+        if schedules > MAX_PLAN_SCHEDULES:
+            return (f"Error creating training plan: {schedules} scheduled dates exceed the maximum of "
+                    f"{MAX_PLAN_SCHEDULES}")
+
+        # Identical definitions are created once, by their first entry. When reusing workouts, definitions
+        # with the same steps are identical whatever their names, like in the workout index.
+        first: Dict[str, int] = {}
+        for i, entry in enumerate(plan):
+            if entry["workout"] is not None:
+                entry["key"] = steps_key(entry["workout"]) if reuse_existing else definition_key(entry["workout"])
+                first.setdefault(entry["key"], i)
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+        if reuse_existing and first:
+            try:
+                # Synced once up front rather than by each definition
+                await refresh_workout_index()
+            except Exception as e:
+                logger.warning("Could not sync the workout index: %s", e)
+
+        async def create(workout):
+            async with semaphore:
+                return await find_or_create_workout("create_training_plan", workout, reuse_existing)
+
+        created = {key: asyncio.ensure_future(create(plan[i]["workout"])) for key, i in first.items()}
+        # Replacements of reused workouts deleted since the index was synced, created once per definition
+        recreated: Dict[str, asyncio.Future] = {}
+
+        async def recreate(key, workout_id):
+            await forget_workout("create_training_plan", workout_id)
+            async with semaphore:
+                return (await find_or_create_workout("create_training_plan", plan[first[key]]["workout"], False))[0]
+
+        async def post(workout_id, cdate, scheduled_time):
+            async with semaphore:
+                return await schedule_on("create_training_plan", workout_id, cdate, scheduled_time)
+
+        async def schedule(entry, cdate):
+            # Each date is scheduled as soon as its workout exists
+            workout_id, existing = (entry["workout_id"], None) if entry["workout_id"] else await created[entry["key"]]
+            try:
+                return await post(workout_id, cdate, entry["time"])
+            except Exception as e:
+                if not existing or not workout_missing(e):
+                    raise
+                if entry["key"] not in recreated:
+                    recreated[entry["key"]] = asyncio.ensure_future(recreate(entry["key"], workout_id))
+                return await post(await recreated[entry["key"]], cdate, entry["time"])
+
+        jobs = [(i, cdate) for i, entry in enumerate(plan) for cdate in entry["dates"]]
+        outcomes = await asyncio.gather(*(schedule(plan[i], cdate) for i, cdate in jobs), return_exceptions=True)
+
+        results = []
+        for i, entry in enumerate(plan):
+            result: Dict[str, Any] = {"index": i, "workout_id": entry["workout_id"], "scheduled": [], "errors": {}}
+            if entry["workout"] is not None:
+                result["workout_name"] = entry["workout"]["workoutName"]
+                task = created[entry["key"]]
+                replacement = recreated.get(entry["key"])
+                if replacement is not None and not replacement.exception():
+                    result["workout_id"] = replacement.result()
+                elif not task.exception():
+                    result["workout_id"], existing = task.result()
+                    if existing:
+                        result["reused"] = True
+                if first[entry["key"]] != i:
+                    result["duplicate_of"] = first[entry["key"]]
+            results.append(result)
+        for (i, cdate), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                results[i]["errors"][cdate] = str(outcome)
+            else:
+                results[i]["scheduled"].append(cdate)
+                if outcome == "graphql":
+                    # Scheduled without its time, the mutation takes none
+                    results[i].setdefault("via_graphql", []).append(cdate)
+        counts: Dict[str, int] = {}
+        for result in results:
+            result["status"] = ("scheduled" if not result["errors"] else
+                                "partial" if result["scheduled"] else "failed")
+            if not result["errors"]:
+                del result["errors"]
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        # Whether each definition's workout was reused
+        found = []
+        for key, task in created.items():
+            replacement = recreated.get(key)
+            if replacement is not None and not replacement.exception():
+                found.append(False)
+            elif not task.exception():
+                found.append(task.result()[1] is not None)
+        return compact_json({"counts": counts, "workouts_created": sum(1 for reused in found if not reused),
+                             "workouts_reused": sum(1 for reused in found if reused),
+                             "deduplicated": sum(1 for entry in plan if entry["workout"] is not None) - len(first),
+                             "dates_scheduled": sum(len(r["scheduled"]) for r in results), "entries": results})
+    except Exception as e:
+        return f"Error creating training plan: {str(e)}"
+
+@app.tool()
+@with_account
+async def schedule_workout(workout_id: int, scheduled_date: str = None, scheduled_time: str = None,
+                           dates: List[str] = None, max_parallel: int = PLAN_CONCURRENCY) -> str:
+    """Schedule a workout to the calendar on one or several dates
+    
+    The workout is looked up once per account, later calls schedule it
+    directly. Several dates are scheduled concurrently, each falling back to
+    the GraphQL mutation on its own, with one result for all of them.
     
     Args:
         workout_id: ID of the workout to schedule
         scheduled_date: Date to schedule the workout (YYYY-MM-DD format)
         scheduled_time: Optional time to schedule the workout (HH:MM format, e.g., "09:00")
+        dates: Several dates to schedule the workout on (YYYY-MM-DD format), instead of or besides scheduled_date
+        max_parallel: Maximum number of concurrent Garmin requests when scheduling several dates
     """
     try:
-        # First, verify the workout exists
-        workout = garmin_client.get_workout_by_id(workout_id)
-        
-        if not workout:
+        entry = plan_entry({"workout_id": workout_id, "scheduled_date": scheduled_date, "dates": dates,
+                            "scheduled_time": scheduled_time})
+    except ValueError as e:
+        return f"Error scheduling workout: {str(e)}"
+    if dates:
+        return await _schedule_dates(workout_id, entry, max_parallel)
+    scheduled_date = entry["dates"][0]
+    try:
+        if not await verify_workout("schedule_workout", workout_id):
             return f"Workout with ID {workout_id} not found"
-        
-        # Build the datetime string for scheduling
-        if scheduled_time:
-            datetime_str = f"{scheduled_date}T{scheduled_time}:00"
-        else:
-            datetime_str = f"{scheduled_date}T00:00:00"
-        
-        # Use the workout service endpoint to schedule the workout
-        # The endpoint is typically: /workout-service/schedule/{workout_id}
-        url = f"/workout-service/schedule/{workout_id}"
-        
-        # Prepare the payload
-        payload = {
-            "scheduledDate": scheduled_date
-        }
-        if scheduled_time:
-            payload["scheduledTime"] = scheduled_time
-        
-        # Use garth.request to make a POST request
-        result = garmin_client.garth.request(
-            "POST",
-            "connectapi",
-            url,
-            json=payload,
-            api=True
-        )
-        
-        return f"Successfully scheduled workout {workout_id} for {scheduled_date}" + (f" at {scheduled_time}" if scheduled_time else "")
+        method = await schedule_on("schedule_workout", workout_id, scheduled_date, scheduled_time)
+        if method == "graphql" and scheduled_time:
+            return (f"Successfully scheduled workout {workout_id} for {scheduled_date} without the time "
+                    f"{scheduled_time}, which the GraphQL fallback does not support")
+        return f"Successfully scheduled workout {workout_id} for {scheduled_date}" + (
+            f" at {scheduled_time}" if scheduled_time else "")
     except Exception as e:
-        # If the direct API call doesn't work, try using GraphQL mutation
-        try:
-            # Alternative: Use GraphQL mutation if available
-            mutation = {
-                "query": f'mutation{{scheduleWorkout(workoutId:{workout_id}, scheduledDate:"{scheduled_date}"){{id}}}}'
-            }
-            result = garmin_client.query_garmin_graphql(mutation)
-            return f"Successfully scheduled workout {workout_id} for {scheduled_date}"
-        except Exception as e2:
-            return f"Error scheduling workout: {str(e)}. Alternative method also failed: {str(e2)}"
+        # Possibly deleted since it was verified
+        current().verified_workouts.discard(workout_id)
+        return f"Error scheduling workout: {str(e)}"
 
-@app.tool()
-async def get_race_predictions(startdate: str = None, enddate: str = None, _type: str = None) -> str:
+
+async def _schedule_dates(workout_id: int, entry: Dict[str, Any], max_parallel: int) -> str:
+    try:
+        if len(entry["dates"]) > MAX_PLAN_SCHEDULES:
+            return (f"Error scheduling workout: {len(entry['dates'])} dates exceed the maximum of "
+                    f"{MAX_PLAN_SCHEDULES}")
+        if not await verify_workout("schedule_workout", workout_id):
+            return f"Workout with ID {workout_id} not found"
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+        async def schedule(cdate):
+            async with semaphore:
+                return await schedule_on("schedule_workout", workout_id, cdate, entry["time"])
+
+        outcomes = await asyncio.gather(*(schedule(cdate) for cdate in entry["dates"]), return_exceptions=True)
+        result: Dict[str, Any] = {"workout_id": workout_id, "scheduled": [], "errors": {}}
+        for cdate, outcome in zip(entry["dates"], outcomes):
+            if isinstance(outcome, Exception):
+                result["errors"][cdate] = str(outcome)
+            else:
+                result["scheduled"].append(cdate)
+                if outcome == "graphql":
+                    result.setdefault("via_graphql", []).append(cdate)
+        if entry["time"] and "via_graphql" in result:
+            # The mutation takes no time of day, so dates in via_graphql were scheduled without it
+            result["time_dropped"] = entry["time"]
+        if not result["scheduled"]:
+            current().verified_workouts.discard(workout_id)
+        status = "scheduled" if not result["errors"] else "partial" if result["scheduled"] else "failed"
+        if not result["errors"]:
+            del result["errors"]
+        return compact_json({"status": status, "counts": {"scheduled": len(result["scheduled"]),
+                                                          "failed": len(result.get("errors", ()))}, **result})
+    except Exception as e:
+        return f"Error scheduling workout: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_race_predictions(startdate: str = None, enddate: str = None, _type: str = None, fields: str = "") -> str:
     """Get race predictions for 5k, 10k, half marathon and marathon
     
     Args:
         startdate: Start date in YYYY-MM-DD format (optional)
         enddate: End date in YYYY-MM-DD format (optional)
         _type: Type of prediction (daily or monthly) (optional)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        predictions = garmin_client.get_race_predictions(startdate, enddate, _type)
-        return predictions
+        predictions = await call_garmin("get_race_predictions", startdate, enddate, _type)
+        return respond("get_race_predictions", predictions, fields)
     except Exception as e:
         return f"Error retrieving race predictions: {str(e)}"
 
 @app.tool()
-async def get_progress_summary_between_dates(startdate: str, enddate: str, metric: str = "distance", groupbyactivities: bool = True) -> str:
+@with_account
+async def get_progress_summary_between_dates(startdate: str, enddate: str, metric: str = "distance", groupbyactivities: bool = True, fields: str = "") -> str:
     """Get progress summary data between specific dates
     
     Args:
@@ -1332,75 +2314,425 @@ async def get_progress_summary_between_dates(startdate: str, enddate: str, metri
         enddate: End date in YYYY-MM-DD format
         metric: Metric to calculate (elevationGain, duration, distance, movingDuration) (default: distance)
         groupbyactivities: Group summary by activity type (default: True)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        summary = garmin_client.get_progress_summary_between_dates(startdate, enddate, metric, groupbyactivities)
-        return summary
+        summary = await call_garmin("get_progress_summary_between_dates", startdate, enddate, metric, groupbyactivities)
+        return respond("get_progress_summary_between_dates", summary, fields)
     except Exception as e:
         return f"Error retrieving progress summary: {str(e)}"
 
 # Activity Management and Upload/Download
 @app.tool()
-async def get_last_activity() -> str:
-    """Get the last activity"""
+@with_account
+async def get_last_activity(fields: str = "") -> str:
+    """Get the last activity
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
+    """
     try:
-        activity = garmin_client.get_last_activity()
-        return activity
+        activity = await call_garmin("get_last_activity")
+        return respond("get_last_activity", activity, fields)
     except Exception as e:
         return f"Error retrieving last activity: {str(e)}"
 
 @app.tool()
-async def get_activity_details(activity_id: int, maxchart: int = 2000, maxpoly: int = 4000) -> str:
+@with_account
+async def get_activity_details(activity_id: int, maxchart: int = 2000, maxpoly: int = 4000, fields: str = "") -> str:
     """Get detailed activity information
     
     Args:
         activity_id: ID of the activity
         maxchart: Maximum chart data points (default: 2000)
         maxpoly: Maximum polygon data points (default: 4000)
+        fields: Comma-separated dotted field paths to return (default: summary fields, "*" for the full response)
     """
     try:
-        details = garmin_client.get_activity_details(activity_id, maxchart, maxpoly)
-        return details
+        details = await call_garmin("get_activity_details", activity_id, maxchart, maxpoly)
+        return respond("get_activity_details", details, fields)
     except Exception as e:
         return f"Error retrieving activity details: {str(e)}"
 
+def _stream_names(streams: str) -> List[str]:
+    return [s.strip() for s in streams.split(",") if s.strip()]
+
+
+def _summarize_streams(details: Dict[str, Any], streams: str) -> Dict[str, Any]:
+    # numpy is only imported once a stream tool is used
+    from activity_streams import decode_details, summarize
+    columns = decode_details(details)
+    duration = columns["elapsed"][-1] if "elapsed" in columns else None
+    return {
+        "activityId": details.get("activityId"),
+        "samples": len(next(iter(columns.values()))) if columns else 0,
+        "elapsedSeconds": float(duration) if duration is not None else None,
+        "available": sorted(columns),
+        "stats": summarize(columns, _stream_names(streams)),
+    }
+
+
+def _downsample_streams(details: Dict[str, Any], streams: str, method: str, points: int,
+                        interval_seconds: float) -> Dict[str, Any]:
+    from activity_streams import decode_details, downsample, to_lists
+    columns = decode_details(details)
+    if not columns:
+        return {"activityId": details.get("activityId"), "samples": 0, "streams": {}}
+    reduced = downsample(columns, _stream_names(streams), method, points, interval_seconds)
+    return {
+        "activityId": details.get("activityId"),
+        "samples": len(next(iter(columns.values()))),
+        "points": len(reduced["elapsed"]),
+        "streams": to_lists(reduced),
+    }
+
+
+@app.tool()
+@with_account
+async def get_activity_stream_stats(activity_id: int, streams: str = "heart_rate,pace,cadence,elevation,power",
+                                    maxchart: int = 10000) -> str:
+    """Get summary statistics (min, max, mean, std, percentiles) of an activity's metric streams
+    
+    Args:
+        activity_id: ID of the activity
+        streams: Comma-separated streams: heart_rate, pace (s/km), speed, cadence, elevation, power, distance (default: heart_rate,pace,cadence,elevation,power)
+        maxchart: Maximum samples fetched from Garmin (default: 10000)
+    """
+    try:
+        details = await call_garmin("get_activity_details", activity_id, maxchart)
+        result = await run_blocking("get_activity_stream_stats", _summarize_streams, details, streams)
+        return compact_json(result)
+    except Exception as e:
+        return f"Error retrieving activity stream stats: {str(e)}"
+
 @app.tool()
-async def get_activity_types() -> str:
-    """Get available activity types"""
+@with_account
+async def get_activity_streams(activity_id: int, streams: str = "heart_rate,pace,cadence,elevation,power",
+                               method: str = "lttb", points: int = 200, interval_seconds: float = 0,
+                               maxchart: int = 10000) -> str:
+    """Get an activity's metric streams as downsampled columns
+    
+    Args:
+        activity_id: ID of the activity
+        streams: Comma-separated streams: heart_rate, pace (s/km), speed, cadence, elevation, power, distance (default: heart_rate,pace,cadence,elevation,power)
+        method: lttb (shape-preserving, driven by the first stream), interval (fixed-time averages) or none (default: lttb)
+        points: Target number of points for lttb (default: 200)
+        interval_seconds: Bucket width in seconds for interval downsampling
+        maxchart: Maximum samples fetched from Garmin (default: 10000)
+    """
     try:
-        types = garmin_client.get_activity_types()
-        return types
+        details = await call_garmin("get_activity_details", activity_id, maxchart)
+        result = await run_blocking("get_activity_streams", _downsample_streams, details, streams,
+                                    method, points, interval_seconds)
+        return compact_json(result)
+    except Exception as e:
+        return f"Error retrieving activity streams: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_activity_types(fields: str = "") -> str:
+    """Get available activity types
+    
+    Args:
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
+    """
+    try:
+        types = await call_garmin("get_activity_types")
+        return respond("get_activity_types", types, fields)
     except Exception as e:
         return f"Error retrieving activity types: {str(e)}"
 
 @app.tool()
-async def download_activity(activity_id: int, dl_fmt: int = 2) -> str:
-    """Download activity in requested format
+@with_account
+async def download_activity(activity_id: int, dl_fmt: int = 2, refresh: bool = False) -> str:
+    """Download activity in requested format into the local file store
+    
+    Returns the stored file path, its SHA-256 and size. Files already in the
+    store are returned without contacting Garmin Connect.
     
     Args:
         activity_id: ID of the activity to download
-        dl_fmt: Download format (default: 2 for TCX)
+        dl_fmt: Download format: 1 original (zip with the FIT file), 2 TCX (default), 3 GPX, 4 KML, 5 CSV
+        refresh: Download again even if the file is already stored
     """
     try:
-        activity_data = garmin_client.download_activity(activity_id, dl_fmt)
-        return f"Successfully downloaded activity {activity_id}"
+        result = await run_blocking("download_activity", _download_file, "download_activity", activity_id, dl_fmt,
+                                    refresh=refresh)
+        return compact_json(result)
     except Exception as e:
         return f"Error downloading activity: {str(e)}"
 
 @app.tool()
-async def upload_activity(activity_path: str) -> str:
-    """Upload activity in FIT format from file
+@with_account
+async def bulk_export_activities(start: str, end: str, fmt: str = "original", archive: str = "zip",
+                                 max_parallel: int = EXPORT_CONCURRENCY, resume: bool = True) -> str:
+    """Export every activity between two dates into a single zip or tar archive
+    
+    Files are downloaded concurrently into the local file store and added to the
+    archive as they arrive. Progress is kept in a manifest next to the archive,
+    so rerunning an interrupted export only downloads what is still missing.
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format (inclusive)
+        fmt: File format: original (zip with the FIT file), tcx, gpx, kml or csv (default: original)
+        archive: Archive type: zip, tar or tar.gz (default: zip)
+        max_parallel: Maximum number of concurrent downloads
+        resume: Continue from an existing manifest instead of listing the activities again
+    """
+    try:
+        validate_export(fmt, archive)
+        started = time.perf_counter()
+        dl_fmt = FORMAT_CODES[fmt]
+        ext = ACTIVITY_FORMATS[dl_fmt][2]
+        paths = export_paths(start, end, fmt, archive, current().export_dir)
+        manifest = ExportManifest(paths["manifest"])
+        if not (resume and await run_blocking("bulk_export_activities", manifest.load)):
+            listed = await call_garmin("get_activities_by_date", start, end)
+            header = {"start": start, "end": end, "format": fmt, "archive": paths["archive"],
+                      "created_at": time.time(), "activities": [list_entry(a) for a in listed or []]}
+            await run_blocking("bulk_export_activities", manifest.start, header)
+        activities = manifest.header["activities"]
+        reused = sum(1 for a in activities if manifest.done(a["activityId"]))
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+        async def export_one(activity):
+            activity_id = activity["activityId"]
+            entry = manifest.done(activity_id)
+            if entry:
+                return activity, entry, False
+            async with semaphore:
+                try:
+                    stored = await run_blocking("download_activity", _download_file, "download_activity",
+                                                activity_id, dl_fmt)
+                    entry = {"activity_id": activity_id, "status": "ok", "path": stored["path"],
+                             "sha256": stored["sha256"], "size": stored["size"]}
+                except Exception as e:
+                    entry = {"activity_id": activity_id, "status": "error", "error": str(e)}
+            return activity, entry, True
+
+        writer = await run_blocking("bulk_export_activities", ArchiveWriter, paths["archive"], archive)
+        try:
+            # Manifest appends and archive writes happen here one at a time while downloads continue
+            for finished in asyncio.as_completed([export_one(a) for a in activities]):
+                activity, entry, new = await finished
+                if new:
+                    await run_blocking("bulk_export_activities", manifest.record, entry)
+                if entry["status"] == "ok":
+                    await run_blocking("bulk_export_activities", writer.add, entry["path"], member_name(activity, ext))
+        except BaseException:
+            await run_blocking("bulk_export_activities", writer.abort)
+            raise
+        await run_blocking("bulk_export_activities", writer.close)
+        summary = summarize_export(activities, manifest)
+        await run_blocking("bulk_export_activities", manifest.complete, summary)
+        return compact_json({**paths, **summary, "resumed": reused,
+                             "seconds": round(time.perf_counter() - started, 2)})
+    except Exception as e:
+        return f"Error exporting activities: {str(e)}"
+
+def _summarize_fit(path: str, streams: str) -> Dict[str, Any]:
+    # numpy is only imported once a FIT tool is used
+    from activity_streams import summarize
+    from fit_file import FitFile, resolve_fit_path
+    with FitFile(resolve_fit_path(path)) as fit:
+        columns = fit.streams()
+        return {
+            "path": fit.path,
+            "file_id": fit.file_id(),
+            "sessions": fit.sessions(),
+            "samples": len(next(iter(columns.values()))) if columns else 0,
+            "elapsedSeconds": float(columns["elapsed"][-1]) if "elapsed" in columns else None,
+            "available": sorted(columns),
+            "stats": summarize(columns, _stream_names(streams)),
+        }
+
+
+def _slice_fit(path: str, start_seconds: float, end_seconds: float, streams: str, method: str, points: int,
+               interval_seconds: float) -> Dict[str, Any]:
+    from activity_streams import downsample, to_lists
+    from fit_file import FitFile, resolve_fit_path
+    path = resolve_fit_path(path)
+    with FitFile(path) as fit:
+        columns = fit.streams()
+    if not columns:
+        return {"path": path, "samples": 0, "streams": {}}
+    if "elapsed" not in columns:
+        raise ValueError("FIT file has no timestamps to slice by")
+    elapsed = columns["elapsed"]
+    keep = elapsed >= start_seconds
+    if end_seconds > 0:
+        keep &= elapsed <= end_seconds
+    columns = {name: values[keep] for name, values in columns.items()}
+    if not keep.any():
+        return {"path": path, "samples": 0, "streams": {}}
+    reduced = downsample(columns, _stream_names(streams), method, points, interval_seconds)
+    return {
+        "path": path,
+        "samples": int(keep.sum()),
+        "points": len(reduced["elapsed"]),
+        "streams": to_lists(reduced),
+    }
+
+
+@app.tool()
+async def summarize_fit_file(path: str, streams: str = "heart_rate,pace,cadence,elevation,power") -> str:
+    """Summarize a local FIT file: device, sessions and statistics of its record streams
+    
+    Works offline on files from download_activity (dl_fmt 1) or any other FIT file.
+    
+    Args:
+        path: Path of a .fit file or of an original download zip containing one
+        streams: Comma-separated streams: heart_rate, pace (s/km), speed, cadence, elevation, power, distance, temperature (default: heart_rate,pace,cadence,elevation,power)
+    """
+    try:
+        result = await run_blocking("summarize_fit_file", _summarize_fit, path, streams)
+        return compact_json(result)
+    except Exception as e:
+        return f"Error summarizing FIT file: {str(e)}"
+
+@app.tool()
+async def slice_fit_file(path: str, start_seconds: float = 0, end_seconds: float = 0,
+                         streams: str = "heart_rate,pace,cadence,elevation,power", method: str = "lttb",
+                         points: int = 200, interval_seconds: float = 0) -> str:
+    """Get the record streams of a local FIT file for a time window as downsampled columns
+    
+    Args:
+        path: Path of a .fit file or of an original download zip containing one
+        start_seconds: Start of the window in seconds from the first record (default: 0)
+        end_seconds: End of the window in seconds from the first record (default: 0 for the end of the file)
+        streams: Comma-separated streams: heart_rate, pace (s/km), speed, cadence, elevation, power, distance, temperature, latitude, longitude (default: heart_rate,pace,cadence,elevation,power)
+        method: lttb (shape-preserving, driven by the first stream), interval (fixed-time averages) or none (default: lttb)
+        points: Target number of points for lttb (default: 200)
+        interval_seconds: Bucket width in seconds for interval downsampling
+    """
+    try:
+        result = await run_blocking("slice_fit_file", _slice_fit, path, start_seconds, end_seconds, streams,
+                                    method, points, interval_seconds)
+        return compact_json(result)
+    except Exception as e:
+        return f"Error slicing FIT file: {str(e)}"
+
+UPLOAD_CONCURRENCY = int(os.getenv("GARMIN_UPLOAD_CONCURRENCY", "4"))
+
+
+def _find_duplicate(fp: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    account = current()
+    previous = account.upload_index.find(fp)
+    if previous:
+        return {"duplicate_of": previous["path"], "activity_id": previous["activity_id"]}
+    started = start_time_gmt(fp)
+    indexed = account.activity_index.find_by_start_time(started) if started else None
+    if indexed:
+        # Already on Garmin Connect, e.g. synced from the device: remember it for next time
+        account.upload_index.record(fp, "exists", indexed["activity_id"])
+        return {"duplicate_of": "activity index", "activity_id": indexed["activity_id"]}
+    return None
+
+
+def _upload_file(fp: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
+    result = {"path": fp["path"], "sha256": fp["sha256"]}
+    duplicate = None if force else _find_duplicate(fp)
+    if duplicate:
+        return dict(result, status="duplicate", **duplicate)
+    client = get_client()
+    try:
+        with open(fp["path"], "rb") as f:
+            response = client.garth.post("connectapi", client.garmin_connect_upload,
+                                         files={"file": (os.path.basename(fp["path"]), f)}, api=True)
+    except Exception as e:
+        if classify(e)[1] != 409:
+            raise
+        # Garmin answers 409 Conflict for activities it already has
+        current().upload_index.record(fp, "exists")
+        return dict(result, status="duplicate", duplicate_of="Garmin Connect", activity_id=None)
+    detail = (response.json() if response.content else {}).get("detailedImportResult") or {}
+    successes = detail.get("successes") or []
+    failures = detail.get("failures") or []
+    if failures and not successes:
+        # Garmin rejected the file, leave it unrecorded so a corrected upload is not skipped
+        errors = [message.get("content") or str(message)
+                  for failure in failures for message in failure.get("messages") or [failure]]
+        return dict(result, status="failed", error="; ".join(errors), upload_id=detail.get("uploadId"))
+    activity_id = successes[0].get("internalId") if successes else None
+    current().upload_index.record(fp, "uploaded", activity_id, detail.get("uploadId"))
+    return dict(result, status="uploaded", activity_id=activity_id, upload_id=detail.get("uploadId"))
+
+
+@app.tool()
+@with_account
+async def upload_activity(activity_path: str, force: bool = False) -> str:
+    """Upload activity from a FIT, GPX or TCX file, skipping files that were already uploaded
+    
+    Duplicates are detected locally, before any upload, by file hash, by device
+    serial and start time (FIT files), or by an indexed activity with the same start time.
     
     Args:
         activity_path: Path to the activity file
+        force: Upload even if the file looks like a duplicate
     """
     try:
-        result = garmin_client.upload_activity(activity_path)
-        return f"Successfully uploaded activity: {result}"
+        fp = await run_blocking("upload_activity", fingerprint, activity_path)
+        result = await run_blocking("upload_activity", _upload_file, fp, force)
+        if result["status"] == "uploaded":
+            await after_write("upload_activity", fp["start_time"])
+        return compact_json(result)
     except Exception as e:
         return f"Error uploading activity: {str(e)}"
 
 @app.tool()
+@with_account
+async def upload_activities(paths: List[str], max_parallel: int = UPLOAD_CONCURRENCY, force: bool = False) -> str:
+    """Upload several activity files concurrently with a status per file
+    
+    Files are validated and fingerprinted first. Duplicates, within the batch or
+    of earlier uploads, are skipped without uploading.
+    
+    Args:
+        paths: Paths of FIT, GPX or TCX files
+        max_parallel: Maximum number of concurrent uploads
+        force: Upload even files that look like duplicates of earlier uploads
+    """
+    try:
+        fingerprints = await asyncio.gather(*(run_blocking("upload_activities", fingerprint, path)
+                                              for path in paths), return_exceptions=True)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(paths)
+        seen: Dict[Any, str] = {}
+        pending = []
+        for i, fp in enumerate(fingerprints):
+            if isinstance(fp, Exception):
+                results[i] = {"path": paths[i], "status": "invalid", "error": str(fp)}
+                continue
+            keys = [fp["sha256"]]
+            if fp["start_time"] is not None and fp["device_serial"] is not None:
+                keys.append((fp["device_serial"], fp["start_time"]))
+            first = next((seen[k] for k in keys if k in seen), None)
+            if first:
+                results[i] = {"path": fp["path"], "sha256": fp["sha256"], "status": "duplicate", "duplicate_of": first}
+                continue
+            seen.update((k, fp["path"]) for k in keys)
+            pending.append((i, fp))
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+        async def upload_one(i, fp):
+            async with semaphore:
+                try:
+                    results[i] = await run_blocking("upload_activity", _upload_file, fp, force)
+                    if results[i]["status"] == "uploaded":
+                        await after_write("upload_activity", fp["start_time"])
+                except Exception as e:
+                    results[i] = {"path": fp["path"], "sha256": fp["sha256"], "status": "failed", "error": str(e)}
+
+        await asyncio.gather(*(upload_one(i, fp) for i, fp in pending))
+        counts: Dict[str, int] = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return compact_json({"counts": counts, "files": results})
+    except Exception as e:
+        return f"Error uploading activities: {str(e)}"
+
+@app.tool()
+@with_account
 async def delete_activity(activity_id: int) -> str:
     """Delete activity with specified ID
     
@@ -1408,12 +2740,13 @@ async def delete_activity(activity_id: int) -> str:
         activity_id: ID of the activity to delete
     """
     try:
-        result = garmin_client.delete_activity(activity_id)
+        result = await call_garmin("delete_activity", activity_id)
         return f"Successfully deleted activity {activity_id}"
     except Exception as e:
         return f"Error deleting activity: {str(e)}"
 
 @app.tool()
+@with_account
 async def set_activity_name(activity_id: int, title: str) -> str:
     """Set name for activity with ID
     
@@ -1422,12 +2755,13 @@ async def set_activity_name(activity_id: int, title: str) -> str:
         title: New title for the activity
     """
     try:
-        result = garmin_client.set_activity_name(activity_id, title)
+        result = await call_garmin("set_activity_name", activity_id, title)
         return f"Successfully set activity name: {result}"
     except Exception as e:
         return f"Error setting activity name: {str(e)}"
 
 @app.tool()
+@with_account
 async def set_activity_type(activity_id: int, type_id: int, type_key: str, parent_type_id: int) -> str:
     """Set activity type
     
@@ -1438,12 +2772,13 @@ async def set_activity_type(activity_id: int, type_id: int, type_key: str, paren
         parent_type_id: Parent type ID
     """
     try:
-        result = garmin_client.set_activity_type(activity_id, type_id, type_key, parent_type_id)
+        result = await call_garmin("set_activity_type", activity_id, type_id, type_key, parent_type_id)
         return f"Successfully set activity type: {result}"
     except Exception as e:
         return f"Error setting activity type: {str(e)}"
 
 @app.tool()
+@with_account
 async def create_manual_activity(start_datetime: str, timezone: str, type_key: str, distance_km: float, duration_min: int, activity_name: str) -> str:
     """Create a manual activity
     
@@ -1456,12 +2791,13 @@ async def create_manual_activity(start_datetime: str, timezone: str, type_key: s
         activity_name: Activity title
     """
     try:
-        result = garmin_client.create_manual_activity(start_datetime, timezone, type_key, distance_km, duration_min, activity_name)
+        result = await call_garmin("create_manual_activity", start_datetime, timezone, type_key, distance_km, duration_min, activity_name)
         return f"Successfully created manual activity: {result}"
     except Exception as e:
         return f"Error creating manual activity: {str(e)}"
 
 @app.tool()
+@with_account
 async def create_manual_activity_from_json(payload: dict) -> str:
     """Create a manual activity from JSON payload
     
@@ -1469,54 +2805,145 @@ async def create_manual_activity_from_json(payload: dict) -> str:
         payload: JSON payload for the activity
     """
     try:
-        result = garmin_client.create_manual_activity_from_json(payload)
+        result = await call_garmin("create_manual_activity_from_json", payload)
         return f"Successfully created manual activity from JSON: {result}"
     except Exception as e:
         return f"Error creating manual activity from JSON: {str(e)}"
 
+# Local Activity Index
+@app.tool()
+@with_account
+async def sync_activity_index(full: bool = False) -> str:
+    """Sync the local activity index with Garmin Connect
+    
+    Args:
+        full: Re-fetch the whole activity history instead of only activities newer than the last sync (default: False)
+    """
+    try:
+        result = await refresh_activity_index(full=full, max_age=0)
+        return compact_json(result)
+    except Exception as e:
+        return f"Error syncing activity index: {str(e)}"
+
+@app.tool()
+@with_account
+async def sync_workout_index(full: bool = False) -> str:
+    """Sync the local workout index used to reuse existing workouts
+    
+    Args:
+        full: Re-fetch the details of every workout instead of only new and changed ones (default: False)
+    """
+    try:
+        result = await refresh_workout_index(full=full, max_age=0)
+        return compact_json(result)
+    except Exception as e:
+        return f"Error syncing workout index: {str(e)}"
+
+@app.tool()
+@with_account
+async def query_activities(activity_type: str = "", start_date: str = "", end_date: str = "",
+                           min_distance_meters: float = None, max_distance_meters: float = None,
+                           min_duration_seconds: float = None, max_duration_seconds: float = None,
+                           name_contains: str = "", sort_by: str = "start_time", descending: bool = True,
+                           limit: int = 20, offset: int = 0) -> str:
+    """Filter, sort and paginate activities from the local activity index
+    
+    The index is synced incrementally first if it is out of date.
+    
+    Args:
+        activity_type: Activity type key filter (e.g., running, cycling) (optional)
+        start_date: Earliest start date in YYYY-MM-DD format (optional)
+        end_date: Latest start date in YYYY-MM-DD format (optional)
+        min_distance_meters: Minimum distance in meters (optional)
+        max_distance_meters: Maximum distance in meters (optional)
+        min_duration_seconds: Minimum duration in seconds (optional)
+        max_duration_seconds: Maximum duration in seconds (optional)
+        name_contains: Text the activity name must contain (optional)
+        sort_by: start_time, distance, duration, elevation_gain, average_hr or calories (default: start_time)
+        descending: Sort in descending order (default: True)
+        limit: Maximum number of activities to return, up to 1000 (default: 20)
+        offset: Number of matching activities to skip (default: 0)
+    """
+    try:
+        await refresh_activity_index()
+        result = await run_blocking(
+            "query_activities", current().activity_index.query, activity_type, start_date, end_date,
+            min_distance_meters, max_distance_meters, min_duration_seconds, max_duration_seconds,
+            name_contains, sort_by, descending, limit, offset)
+        return compact_json(result)
+    except Exception as e:
+        return f"Error querying activities: {str(e)}"
+
+@app.tool()
+@with_account
+async def summarize_activities(group_by: str = "activity_type", activity_type: str = "",
+                               start_date: str = "", end_date: str = "") -> str:
+    """Get activity counts and distance, duration, elevation and calorie totals from the local activity index
+    
+    Args:
+        group_by: activity_type, month or year (default: activity_type)
+        activity_type: Activity type key filter (optional)
+        start_date: Earliest start date in YYYY-MM-DD format (optional)
+        end_date: Latest start date in YYYY-MM-DD format (optional)
+    """
+    try:
+        await refresh_activity_index()
+        result = await run_blocking("summarize_activities", current().activity_index.summarize,
+                                    group_by, activity_type, start_date, end_date)
+        return compact_json(result)
+    except Exception as e:
+        return f"Error summarizing activities: {str(e)}"
+
 # Utility and System Methods
 @app.tool()
-async def get_device_solar_data(device_id: str, startdate: str, enddate: str = None) -> str:
+@with_account
+async def get_device_solar_data(device_id: str, startdate: str, enddate: str = None, fields: str = "") -> str:
     """Get solar data for compatible device
     
     Args:
         device_id: ID of the device
         startdate: Start date in YYYY-MM-DD format
         enddate: End date in YYYY-MM-DD format (optional)
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        solar_data = garmin_client.get_device_solar_data(device_id, startdate, enddate)
-        return solar_data
+        solar_data = await call_garmin("get_device_solar_data", device_id, startdate, enddate)
+        return respond("get_device_solar_data", solar_data, fields)
     except Exception as e:
         return f"Error retrieving device solar data: {str(e)}"
 
 @app.tool()
-async def get_all_day_events(cdate: str) -> str:
+@with_account
+async def get_all_day_events(cdate: str, fields: str = "") -> str:
     """Get available daily events data for a specific date
     
     Args:
         cdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        events = garmin_client.get_all_day_events(cdate)
-        return events
+        events = await call_garmin("get_all_day_events", cdate)
+        return respond("get_all_day_events", events, fields)
     except Exception as e:
         return f"Error retrieving all day events: {str(e)}"
 
 @app.tool()
-async def get_daily_wellness_events_data(startdate: str) -> str:
+@with_account
+async def get_daily_wellness_events_data(startdate: str, fields: str = "") -> str:
     """Get daily wellness events data for a specific date
     
     Args:
         startdate: Date in YYYY-MM-DD format
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        events = garmin_client.get_daily_wellness_events_data(startdate)
-        return events
+        events = await call_garmin("get_daily_wellness_events_data", startdate)
+        return respond("get_daily_wellness_events_data", events, fields)
     except Exception as e:
         return f"Error retrieving daily wellness events: {str(e)}"
 
 @app.tool()
+@with_account
 async def request_reload(cdate: str) -> str:
     """Request reload of data for a specific date
     
@@ -1524,34 +2951,206 @@ async def request_reload(cdate: str) -> str:
         cdate: Date in YYYY-MM-DD format
     """
     try:
-        result = garmin_client.request_reload(cdate)
+        result = await call_garmin("request_reload", cdate)
         return f"Successfully requested reload for {cdate}"
     except Exception as e:
         return f"Error requesting reload: {str(e)}"
 
 @app.tool()
-async def query_garmin_graphql(query: dict) -> str:
+@with_account
+async def query_garmin_graphql(query: dict, fields: str = "") -> str:
     """Query Garmin GraphQL endpoints
     
     Args:
         query: GraphQL query dictionary
+        fields: Comma-separated dotted field paths to return (optional, "*" for the full response)
     """
     try:
-        result = garmin_client.query_garmin_graphql(query)
-        return result
+        result = await call_garmin("query_garmin_graphql", query)
+        return respond("query_garmin_graphql", result, fields)
     except Exception as e:
         return f"Error querying GraphQL: {str(e)}"
 
 @app.tool()
+@with_account
+async def batch_garmin_graphql(queries: Dict[str, Dict[str, Any]], fields: str = "") -> str:
+    """Run several Garmin GraphQL queries in one request, with the result of each under its alias
+    
+    Queries are merged into one aliased document (split over several requests
+    beyond GARMIN_GRAPHQL_BATCH_SIZE queries). Queries that fail are listed
+    under errors, the others are still returned.
+    
+    Args:
+        queries: Queries by alias, each {"field": root field name (e.g. sleepScalar), "arguments": {...},
+                 "selection": optional selection set such as "{id}"}
+        fields: Comma-separated dotted field paths to return, starting with the alias (optional)
+    """
+    try:
+        batch = GraphQLBatch()
+        for alias, spec in queries.items():
+            if not isinstance(spec, dict) or not spec.get("field"):
+                raise ValueError(f"query {alias} needs a field")
+            batch.add(alias, spec["field"], spec.get("arguments"), spec.get("selection", ""))
+        data, errors = await run_graphql("batch_garmin_graphql", batch)
+        if errors:
+            data["errors"] = errors
+        return respond("batch_garmin_graphql", data, fields)
+    except Exception as e:
+        return f"Error querying GraphQL: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_today_overview(cdate: str = "", days_ahead: int = 6, fields: str = "") -> str:
+    """Get a one-day overview in a single request
+    
+    Covers the daily summary, sleep, training readiness and status, HRV, health
+    snapshot, weight, blood pressure and the workouts scheduled in the coming
+    days. Parts that fail are listed under errors, the others are still returned.
+    
+    Args:
+        cdate: Date in YYYY-MM-DD format (default: today)
+        days_ahead: Number of days after cdate to include scheduled workouts for (default: 6)
+        fields: Comma-separated dotted field paths to return (optional)
+    """
+    try:
+        cdate = cdate or datetime.date.today().isoformat()
+        data, errors = await run_graphql("get_today_overview", today_overview(cdate, days_ahead))
+        overview = {"date": cdate, **data}
+        if errors:
+            overview["errors"] = errors
+        return respond("get_today_overview", overview, fields)
+    except Exception as e:
+        return f"Error retrieving today overview: {str(e)}"
+
+@app.tool()
+async def get_executor_metrics() -> str:
+    """Get worker pool and HTTP connection pool settings and per-tool concurrency and queue depth metrics"""
+    try:
+        return json.dumps(dict(executor_stats(), http=pool_settings()))
+    except Exception as e:
+        return f"Error retrieving executor metrics: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_request_governor_metrics() -> str:
+    """Get rate limiter, concurrency, retry and circuit breaker counters for the account's Garmin API requests"""
+    try:
+        return json.dumps(current().governor.snapshot())
+    except Exception as e:
+        return f"Error retrieving request governor metrics: {str(e)}"
+
+@app.tool()
+async def get_server_metrics(tool: str = "", fmt: str = "json") -> str:
+    """Get per-tool call counts and errors, wall, upstream and serialization time, response size, cache status and retries
+    
+    Latencies are estimated from histogram buckets. Tools are ordered by total
+    wall time, so the ones slowing sessions down come first.
+    
+    Args:
+        tool: Only report this tool (optional)
+        fmt: "json" for a summary or "prometheus" for the histograms in the Prometheus text format
+    """
+    try:
+        if fmt == "prometheus":
+            return tool_metrics.render()
+        if fmt != "json":
+            return f"Error retrieving server metrics: fmt must be json or prometheus, not {fmt!r}"
+        return json.dumps(tool_metrics.snapshot(tool))
+    except Exception as e:
+        return f"Error retrieving server metrics: {str(e)}"
+
+@app.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    """Prometheus scrape endpoint, served when running over an HTTP transport"""
+    return PlainTextResponse(tool_metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.tool()
+async def get_account_pool_stats() -> str:
+    """Get client pool settings, session evictions and the session state and request budget of each account"""
+    try:
+        return json.dumps(account_pool.snapshot())
+    except Exception as e:
+        return f"Error retrieving account pool stats: {str(e)}"
+
+@app.tool()
+async def get_coalescing_stats() -> str:
+    """Get counters of identical concurrent calls that shared one upstream request"""
+    try:
+        return json.dumps(single_flight_stats())
+    except Exception as e:
+        return f"Error retrieving coalescing stats: {str(e)}"
+
+@app.tool()
+@with_account
+async def get_cache_stats() -> str:
+    """Get response cache hit/miss counters and sizes, and what each write invalidated"""
+    try:
+        return json.dumps(dict(response_cache.snapshot(), static=current().static_data.snapshot(),
+                               invalidation=invalidation_stats()))
+    except Exception as e:
+        return f"Error retrieving cache stats: {str(e)}"
+
+@app.tool()
+@with_account
+async def clear_cache() -> str:
+    """Remove all cached Garmin responses from memory and disk, including memoized profile data"""
+    try:
+        await run_blocking("clear_cache", response_cache.clear)
+        current().static_data.invalidate()
+        return "Successfully cleared response cache"
+    except Exception as e:
+        return f"Error clearing cache: {str(e)}"
+
+@app.tool()
+@with_account
 async def logout() -> str:
-    """Log user out of session"""
+    """Log user out of session and close the account's session in the client pool"""
     try:
-        garmin_client.logout()
+        await call_garmin("logout")
+        current().close()
         return "Successfully logged out"
     except Exception as e:
         return f"Error logging out: {str(e)}"
 
+# Static profile and catalog data as MCP resources
+@app.resource("garmin://profile/full-name", mime_type="text/plain")
+async def full_name_resource() -> str:
+    """User's full name"""
+    return await call_garmin("get_full_name")
+
+@app.resource("garmin://profile/unit-system", mime_type="text/plain")
+async def unit_system_resource() -> str:
+    """User's unit system preference"""
+    return await call_garmin("get_unit_system")
+
+@app.resource("garmin://profile", mime_type="application/json")
+async def user_profile_resource() -> str:
+    """All user settings"""
+    return compact_json(await call_garmin("get_user_profile"))
+
+@app.resource("garmin://profile/settings", mime_type="application/json")
+async def userprofile_settings_resource() -> str:
+    """User profile settings"""
+    return compact_json(await call_garmin("get_userprofile_settings"))
+
+@app.resource("garmin://activity-types", mime_type="application/json")
+async def activity_types_resource() -> str:
+    """Available activity types"""
+    return compact_json(await call_garmin("get_activity_types"))
+
+@app.resource("garmin://devices", mime_type="application/json")
+async def devices_resource() -> str:
+    """Devices registered to the account"""
+    return compact_json(await call_garmin("get_devices"))
+
+@app.resource("garmin://devices/primary-training", mime_type="application/json")
+async def primary_training_device_resource() -> str:
+    """Primary training device information"""
+    return compact_json(await call_garmin("get_primary_training_device"))
+
 if __name__ == "__main__":
+    if os.getenv("GARMIN_WARM_UP", "1") != "0":
+        start_warm_up()
     app.run()
 
 
@@ -0,0 +1,292 @@
+"""
+Per-tool instrumentation: wall, upstream and serialization time, response
+size, cache status and retries, exported as Prometheus-style histograms
+"""
+import bisect
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastmcp.exceptions import NotFoundError
+from fastmcp.server.middleware import Middleware
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+CACHE_STATUSES = ("hit", "coalesced", "miss", "none")
+
+
+class CallRecord:
+    """What one tool call spent its time on, filled in by the layers it passes through
+
+    Upstream time is summed over requests, so a tool fetching days in
+    parallel can report more upstream than wall time.
+    """
+
+    def __init__(self):
+        self.upstream_seconds = 0.0
+        self.upstream_requests = 0
+        self.retries = 0
+        self.serialization_seconds = 0.0
+        self.cache = {status: 0 for status in CACHE_STATUSES}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            setattr(self, key, getattr(self, key) + amount)
+
+    @property
+    def cache_status(self) -> str:
+        """miss if anything went upstream, else coalesced or hit, none if no cached read was involved"""
+        for status in ("miss", "coalesced", "hit"):
+            if self.cache[status]:
+                return status
+        return "none"
+
+
+# Record of the tool call in progress; copied into worker threads by run_blocking
+_record: contextvars.ContextVar[Optional[CallRecord]] = contextvars.ContextVar("garmin_call_record", default=None)
+
+# Set inside a serializing() block of the current task or thread, so concurrent blocks are each timed
+_serializing: contextvars.ContextVar[bool] = contextvars.ContextVar("garmin_serializing", default=False)
+
+
+def record_upstream(seconds: float) -> None:
+    """Count one upstream HTTP request of the current tool call"""
+    record = _record.get()
+    if record is not None:
+        with record._lock:
+            record.upstream_seconds += seconds
+            record.upstream_requests += 1
+
+
+def record_retry() -> None:
+    """Count one retried upstream request of the current tool call"""
+    record = _record.get()
+    if record is not None:
+        record.add("retries")
+
+
+def record_cache(status: str) -> None:
+    """Count a cache lookup of the current tool call: hit, coalesced (shared an in-flight fetch) or miss"""
+    record = _record.get()
+    if record is not None:
+        with record._lock:
+            record.cache[status] += 1
+
+
+@contextlib.contextmanager
+def serializing() -> Iterator[None]:
+    """Time the enclosed projection and JSON encoding as serialization of the current tool call"""
+    record = _record.get()
+    if record is None:
+        yield
+        return
+    if _serializing.get():
+        # Nested blocks (respond calling compact_json) are counted once
+        yield
+        return
+    token = _serializing.set(True)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _serializing.reset(token)
+        record.add("serialization_seconds", time.perf_counter() - start)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label value, like a Prometheus histogram"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._series: Dict[str, List[float]] = {}
+
+    def observe(self, label: str, value: float) -> None:
+        # [count per bucket..., +Inf count, sum]
+        series = self._series.get(label)
+        if series is None:
+            series = self._series[label] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, label: str) -> int:
+        series = self._series.get(label)
+        return int(sum(series[:-1])) if series else 0
+
+    def total(self, label: str) -> float:
+        series = self._series.get(label)
+        return series[-1] if series else 0.0
+
+    def quantile(self, label: str, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket, like histogram_quantile()"""
+        series = self._series.get(label)
+        count = self.count(label)
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(series[:-1]):
+            if seen + n >= rank and n:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def render(self, name: str, label: str) -> List[str]:
+        lines = []
+        for value, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{name}_bucket{{{label}="{value}",le="{le}"}} {int(cumulative)}')
+            lines.append(f'{name}_sum{{{label}="{value}"}} {series[-1]:.6f}')
+            lines.append(f'{name}_count{{{label}="{value}"}} {int(cumulative)}')
+        return lines
+
+
+def _stats(histogram: Histogram, tool: str, scale: float = 1000.0, digits: int = 1) -> Dict[str, Any]:
+    count = histogram.count(tool)
+    stats = {"mean": round(histogram.total(tool) / count * scale, digits) if count else None}
+    for q in (0.5, 0.95, 0.99):
+        value = histogram.quantile(tool, q)
+        stats[f"p{int(q * 100)}"] = round(value * scale, digits) if value is not None else None
+    return stats
+
+
+class ToolMetrics:
+    """Per-tool histograms and counters of instrumented tool calls"""
+
+    # name -> (help, histogram attribute)
+    HISTOGRAMS = {
+        "garmin_mcp_tool_duration_seconds": ("Wall time of tool calls", "wall"),
+        "garmin_mcp_upstream_duration_seconds": ("Time tool calls spent in Garmin Connect requests", "upstream"),
+        "garmin_mcp_serialization_duration_seconds": ("Time tool calls spent projecting and encoding responses",
+                                                      "serialization"),
+        "garmin_mcp_response_bytes": ("Size of tool responses in bytes", "size"),
+    }
+
+    def __init__(self):
+        self.started = time.time()
+        self.wall = Histogram(LATENCY_BUCKETS)
+        self.upstream = Histogram(LATENCY_BUCKETS)
+        self.serialization = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        # tool -> counters
+        self._counters: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, tool: str, record: CallRecord, wall: float, size: int, error: bool) -> None:
+        with self._lock:
+            self.wall.observe(tool, wall)
+            self.upstream.observe(tool, record.upstream_seconds)
+            self.serialization.observe(tool, record.serialization_seconds)
+            self.size.observe(tool, size)
+            counters = self._counters.setdefault(tool, {
+                "calls": 0, "errors": 0, "upstream_requests": 0, "retries": 0,
+                "cache": {status: 0 for status in CACHE_STATUSES}})
+            counters["calls"] += 1
+            counters["errors"] += error
+            counters["upstream_requests"] += record.upstream_requests
+            counters["retries"] += record.retries
+            counters["cache"][record.cache_status] += 1
+
+    def snapshot(self, tool: str = "") -> Dict[str, Any]:
+        """Return per-tool call counts, latency estimates in ms, bytes, cache status and retries
+
+        Tools are ordered by total wall time, so the ones slowing sessions down come first.
+        """
+        with self._lock:
+            names = [tool] if tool else list(self._counters)
+            tools = {}
+            for name in names:
+                counters = self._counters.get(name)
+                if counters is None:
+                    continue
+                calls = counters["calls"]
+                tools[name] = {
+                    "calls": calls, "errors": counters["errors"],
+                    "wall_seconds_total": round(self.wall.total(name), 3),
+                    "wall_ms": _stats(self.wall, name), "upstream_ms": _stats(self.upstream, name),
+                    "serialization_ms": _stats(self.serialization, name, digits=2),
+                    "response_bytes": {"mean": round(self.size.total(name) / calls), "total": int(self.size.total(name))},
+                    "upstream_requests": counters["upstream_requests"], "retries": counters["retries"],
+                    "cache": dict(counters["cache"]),
+                }
+        ordered = dict(sorted(tools.items(), key=lambda item: -item[1]["wall_seconds_total"]))
+        return {"uptime_seconds": round(time.time() - self.started), "calls": sum(t["calls"] for t in tools.values()),
+                "errors": sum(t["errors"] for t in tools.values()), "tools": ordered}
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (help_text, attribute) in self.HISTOGRAMS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                lines += getattr(self, attribute).render(name, "tool")
+            counters = sorted(self._counters.items())
+            lines += ["# HELP garmin_mcp_tool_calls_total Tool calls by outcome", "# TYPE garmin_mcp_tool_calls_total counter"]
+            for tool, c in counters:
+                lines.append(f'garmin_mcp_tool_calls_total{{tool="{tool}",status="ok"}} {c["calls"] - c["errors"]}')
+                lines.append(f'garmin_mcp_tool_calls_total{{tool="{tool}",status="error"}} {c["errors"]}')
+            lines += ["# HELP garmin_mcp_tool_cache_total Tool calls by cache status",
+                      "# TYPE garmin_mcp_tool_cache_total counter"]
+            for tool, c in counters:
+                for status, n in c["cache"].items():
+                    lines.append(f'garmin_mcp_tool_cache_total{{tool="{tool}",status="{status}"}} {n}')
+            for name, key, help_text in (
+                    ("garmin_mcp_upstream_requests_total", "upstream_requests", "Garmin Connect requests made by tools"),
+                    ("garmin_mcp_upstream_retries_total", "retries", "Retried Garmin Connect requests of tools")):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                lines += [f'{name}{{tool="{tool}"}} {c[key]}' for tool, c in counters]
+        return "\n".join(lines) + "\n"
+
+
+tool_metrics = ToolMetrics()
+
+
+def _response_size(result: Any) -> Tuple[int, bool]:
+    """Bytes of text content in a ToolResult, and whether it is one of the tools' "Error ..." strings"""
+    texts = [block.text for block in getattr(result, "content", None) or () if hasattr(block, "text")]
+    size = sum(len(text.encode()) for text in texts)
+    return size, bool(texts) and texts[0].startswith("Error")
+
+
+class InstrumentationMiddleware(Middleware):
+    """Measures every tool call and records it in tool_metrics"""
+
+    def __init__(self, metrics: ToolMetrics = tool_metrics):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        record = CallRecord()
+        token = _record.set(record)
+        start = time.perf_counter()
+        size, error = 0, True
+        try:
+            result = await call_next(context)
+            size, error = _response_size(result)
+            return result
+        except NotFoundError:
+            # Not recorded, unknown tool names would each add a series
+            record = None
+            raise
+        finally:
+            _record.reset(token)
+            if record is not None:
+                self._observe(tool, record, time.perf_counter() - start, size, error)
+
+    def _observe(self, tool: str, record: CallRecord, wall: float, size: int, error: bool) -> None:
+        self.metrics.observe(tool, record, wall, size, error)
+        logger.debug("%s took %.1f ms (upstream %.1f ms in %d requests, %d retries, serialization %.1f ms), "
+                     "%d bytes, cache %s%s", tool, wall * 1000, record.upstream_seconds * 1000,
+                     record.upstream_requests, record.retries, record.serialization_seconds * 1000, size,
+                     record.cache_status, ", error" if error else "")
@@ -0,0 +1,120 @@
+"""
+Field projection for trimming Garmin responses down to the keys an agent needs
+"""
+from typing import Any, Dict, List, Optional
+
+# Fields kept for one activity in activity list responses
+ACTIVITY_LIST_FIELDS = [
+    "activityId", "activityName", "activityType.typeKey", "startTimeLocal", "distance",
+    "duration", "movingDuration", "elevationGain", "averageSpeed", "averageHR", "maxHR",
+    "calories", "aerobicTrainingEffect",
+]
+
+# Default "summary" projection per tool, used when no fields are requested
+DEFAULT_PROJECTIONS: Dict[str, List[str]] = {
+    "get_activity": [
+        "activityId", "activityName", "activityTypeDTO.typeKey", "summaryDTO.startTimeLocal",
+        "summaryDTO.distance", "summaryDTO.duration", "summaryDTO.movingDuration",
+        "summaryDTO.elevationGain", "summaryDTO.averageSpeed", "summaryDTO.averageHR",
+        "summaryDTO.maxHR", "summaryDTO.calories", "summaryDTO.trainingEffect",
+        "summaryDTO.anaerobicTrainingEffect",
+    ],
+    "get_activity_details": [
+        "activityId", "measurementCount", "metricsCount", "metricDescriptors.key",
+        "metricDescriptors.metricsIndex", "metricDescriptors.unit.key",
+    ],
+    "get_activities_by_date": ACTIVITY_LIST_FIELDS,
+    "get_recent_activities": ACTIVITY_LIST_FIELDS,
+    "get_last_activity": ACTIVITY_LIST_FIELDS,
+    "get_gear_ativities": ACTIVITY_LIST_FIELDS,
+    "get_stats": [
+        "calendarDate", "totalSteps", "dailyStepGoal", "totalDistanceMeters", "activeKilocalories",
+        "totalKilocalories", "restingHeartRate", "minHeartRate", "maxHeartRate", "averageStressLevel",
+        "bodyBatteryHighestValue", "bodyBatteryLowestValue", "bodyBatteryMostRecentValue",
+        "floorsAscended", "moderateIntensityMinutes", "vigorousIntensityMinutes", "sleepingSeconds",
+    ],
+    "get_sleep_data": [
+        "dailySleepDTO.calendarDate", "dailySleepDTO.sleepTimeSeconds", "dailySleepDTO.deepSleepSeconds",
+        "dailySleepDTO.lightSleepSeconds", "dailySleepDTO.remSleepSeconds", "dailySleepDTO.awakeSleepSeconds",
+        "dailySleepDTO.averageRespirationValue", "dailySleepDTO.avgSleepStress",
+        "dailySleepDTO.sleepScores.overall", "restingHeartRate", "avgOvernightHrv", "hrvStatus",
+    ],
+    "get_hrv_data": ["hrvSummary"],
+    "get_heart_rates": [
+        "calendarDate", "restingHeartRate", "minHeartRate", "maxHeartRate",
+        "lastSevenDaysAvgRestingHeartRate",
+    ],
+    "get_stress_data": ["calendarDate", "maxStressLevel", "avgStressLevel"],
+    "get_all_day_stress": ["calendarDate", "maxStressLevel", "avgStressLevel"],
+    "get_respiration_data": [
+        "calendarDate", "lowestRespirationValue", "highestRespirationValue",
+        "avgWakingRespirationValue", "avgSleepRespirationValue",
+    ],
+    "get_spo2_data": [
+        "calendarDate", "averageSpO2", "lowestSpO2", "latestSpO2", "avgSleepSpO2",
+    ],
+    "get_steps_data": ["startGMT", "steps"],
+    "get_training_readiness": [
+        "calendarDate", "level", "score", "feedbackShort", "sleepScore", "recoveryTime",
+        "acuteLoad", "hrvWeeklyAverage",
+    ],
+    "get_devices": [
+        "deviceId", "displayName", "productDisplayName", "partNumber", "currentFirmwareVersion",
+        "primaryActivityTrackerIndicator",
+    ],
+    "get_user_profile": [
+        "userData.gender", "userData.weight", "userData.height", "userData.birthDate",
+        "userData.measurementSystem", "userData.vo2MaxRunning", "userData.vo2MaxCycling",
+        "userData.lactateThresholdHeartRate", "userData.lactateThresholdSpeed",
+    ],
+}
+DEFAULT_PROJECTIONS["get_user_summary"] = DEFAULT_PROJECTIONS["get_stats"]
+
+
+def _tree(paths: List[str]) -> Dict[str, Any]:
+    """Turn ["a.b", "a.c", "d"] into {"a": {"b": {}, "c": {}}, "d": {}}"""
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _apply(value: Any, tree: Dict[str, Any]) -> Any:
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_apply(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: _apply(value[key], sub) for key, sub in tree.items() if key in value}
+
+
+def project(value: Any, fields: List[str]) -> Any:
+    """Keep only the given dotted field paths of a response
+
+    Lists are projected element by element and missing paths are skipped.
+
+    Args:
+        value: Decoded JSON response
+        fields: Dotted paths such as "summaryDTO.distance"
+    """
+    if not fields:
+        return value
+    return _apply(value, _tree(fields))
+
+
+def resolve_fields(tool: str, fields: str) -> Optional[List[str]]:
+    """Return the field list for a tool call, or None for the full response
+
+    Args:
+        tool: Tool name, used to look up its default projection
+        fields: Comma-separated field paths, "" for the default projection or "*" for everything
+    """
+    fields = (fields or "").strip()
+    if fields == "*":
+        return None
+    if fields:
+        return [f.strip() for f in fields.split(",") if f.strip()]
+    return DEFAULT_PROJECTIONS.get(tool)
@@ -0,0 +1,56 @@
+"""
+Single-flight coalescing: concurrent identical calls share one upstream fetch
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from garmin_metrics import record_cache
+
+_inflight: Dict[str, "asyncio.Task"] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _finished(key: str, task: "asyncio.Task") -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark a failure as retrieved even if every caller was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+async def single_flight(tool: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Return fetch()'s result, sharing it with identical calls already in flight
+
+    The fetch runs as its own task, so a caller that is cancelled does not
+    cancel the fetch for the callers still waiting on it. Callers share the
+    same result object and must not modify it.
+
+    Args:
+        tool: Name used for the coalescing counters
+        key: Normalized call key, e.g. from garmin_cache.make_key
+        fetch: Coroutine function performing the call
+    """
+    stats = _stats.setdefault(tool, {"calls": 0, "coalesced": 0})
+    stats["calls"] += 1
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _finished(key, t))
+    else:
+        stats["coalesced"] += 1
+        record_cache("coalesced")
+    return await asyncio.shield(task)
+
+
+def single_flight_stats() -> Dict[str, Any]:
+    """Return per-tool call and coalesced-call counters"""
+    calls = sum(s["calls"] for s in _stats.values())
+    coalesced = sum(s["coalesced"] for s in _stats.values())
+    return {
+        "calls": calls,
+        "coalesced": coalesced,
+        "coalesced_ratio": round(coalesced / calls, 3) if calls else 0.0,
+        "in_flight": len(_inflight),
+        "tools": {name: dict(s) for name, s in _stats.items()},
+    }
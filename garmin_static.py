@@ -0,0 +1,73 @@
+"""
+Process-lifetime memoization of profile and catalog data that rarely changes
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+from garmin_cache import MISSING
+
+logger = logging.getLogger(__name__)
+
+STATIC_METHODS = (
+    "get_full_name", "get_unit_system", "get_user_profile", "get_userprofile_settings",
+    "get_activity_types", "get_devices", "get_primary_training_device",
+)
+
+
+class StaticData:
+    """Memoized results of the argument-less STATIC_METHODS
+
+    Values are kept until invalidated. A fetch that was running while its
+    method was invalidated is returned to its caller but not stored.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._generations = {method: 0 for method in STATIC_METHODS}
+        self._locks = {method: threading.Lock() for method in STATIC_METHODS}
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "warmed": 0}
+
+    def peek(self, method: str) -> Any:
+        """Return the memoized value, or MISSING. Never blocks."""
+        value = self._values.get(method, MISSING)
+        if value is not MISSING:
+            self.stats["hits"] += 1
+        return value
+
+    def get(self, method: str, fetch: Callable[[str], Any]) -> Any:
+        """Return the memoized value, calling fetch(method) once if there is none. Blocks."""
+        with self._locks[method]:
+            value = self._values.get(method, MISSING)
+            if value is not MISSING:
+                self.stats["hits"] += 1
+                return value
+            self.stats["misses"] += 1
+            generation = self._generations[method]
+            value = fetch(method)
+            if self._generations[method] == generation:
+                self._values[method] = value
+            return value
+
+    def invalidate(self, *methods: str) -> None:
+        """Drop memoized values (all of them if no method is given)"""
+        for method in methods or STATIC_METHODS:
+            self._generations[method] += 1
+            if self._values.pop(method, MISSING) is not MISSING:
+                self.stats["invalidations"] += 1
+
+    def warm(self, fetch: Callable[[str], Any]) -> None:
+        """Fetch every static method that is not memoized yet, skipping failures"""
+        for method in STATIC_METHODS:
+            try:
+                self.get(method, fetch)
+                self.stats["warmed"] += 1
+            except Exception as e:
+                logger.warning("Could not warm %s: %s", method, e)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the memoized methods"""
+        return dict(self.stats, memoized=sorted(self._values))
+
+
+static_data = StaticData()
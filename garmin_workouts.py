@@ -0,0 +1,259 @@
+"""
+Workout definitions: building the workout payload from simple parameters,
+local validation of training plan entries, identical-definition keys and
+normalized step hashes for matching existing workouts
+"""
+import datetime
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+PLAN_CONCURRENCY = int(os.getenv("GARMIN_PLAN_CONCURRENCY", "4"))
+# Seconds after which reusing a workout first syncs the workout index
+WORKOUT_INDEX_MAX_AGE = int(os.getenv("GARMIN_WORKOUT_INDEX_MAX_AGE", "900"))
+MAX_PLAN_SCHEDULES = int(os.getenv("GARMIN_MAX_PLAN_SCHEDULES", "500"))
+
+# Parameters of create_and_schedule_workout that define the workout itself
+DEFINITION_FIELDS = (
+    "activity_type", "distance_meters", "duration_seconds", "laps", "lap_distance_meters", "lap_duration_seconds",
+    "warmup_distance_meters", "warmup_duration_seconds", "cooldown_distance_meters", "cooldown_duration_seconds",
+    "target_pace_seconds_per_km", "target_heart_rate_bpm", "intervals",
+)
+ENTRY_FIELDS = ("workout_name", "workout_id", "scheduled_date", "dates", "scheduled_time") + DEFINITION_FIELDS
+INTERVAL_FIELDS = ("distance_meters", "duration_seconds", "target_pace", "target_hr", "rest_distance",
+                   "rest_duration")
+# Plausible bounds, to catch unit mix-ups (min/km for s/km, km for m) before anything is sent
+PACE_RANGE = (60, 1800)
+HEART_RATE_RANGE = (30, 240)
+TIME_PATTERN = re.compile(r"([01]\d|2[0-3]):[0-5]\d")
+SPORT_PATTERN = re.compile(r"[a-z][a-z_]*")
+
+
+def _duration(distance: Optional[float], duration: Optional[float]) -> Dict[str, Any]:
+    value = {}
+    if distance:
+        value["distance"] = distance
+    if duration:
+        value["duration"] = duration
+    return value
+
+
+def _target(step: Dict[str, Any], pace: Optional[float], heart_rate: Optional[int]) -> Dict[str, Any]:
+    # A heart rate target takes precedence over a pace target
+    if pace:
+        step["targetType"] = "pace"
+        step["targetValue"] = pace
+    if heart_rate:
+        step["targetType"] = "heartRate"
+        step["targetValue"] = heart_rate
+    return step
+
+
+def build_workout(workout_name: str, activity_type: str = "running", distance_meters: float = None,
+                  duration_seconds: int = None, laps: int = None, lap_distance_meters: float = None,
+                  lap_duration_seconds: int = None, warmup_distance_meters: float = None,
+                  warmup_duration_seconds: int = None, cooldown_distance_meters: float = None,
+                  cooldown_duration_seconds: int = None, target_pace_seconds_per_km: float = None,
+                  target_heart_rate_bpm: int = None, intervals: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Return the workout-service payload for a warmup, main part (single step, laps or intervals) and cooldown
+
+    Laps are separated by 60 second rests. Interval entries take the keys of
+    INTERVAL_FIELDS.
+    """
+    steps = []
+    if warmup_distance_meters or warmup_duration_seconds:
+        steps.append(_target({"type": "WarmUp", "duration": _duration(warmup_distance_meters, warmup_duration_seconds)},
+                             target_pace_seconds_per_km, target_heart_rate_bpm))
+    if intervals:
+        for interval in intervals:
+            steps.append(_target({"type": "Interval", "duration": _duration(
+                interval.get("distance_meters"), interval.get("duration_seconds"))},
+                interval.get("target_pace"), interval.get("target_hr")))
+            if "rest_distance" in interval or "rest_duration" in interval:
+                steps.append({"type": "Rest", "duration": _duration(
+                    interval.get("rest_distance"), interval.get("rest_duration"))})
+    elif laps and (lap_distance_meters or lap_duration_seconds):
+        for i in range(laps):
+            steps.append(_target({"type": "Interval", "duration": _duration(lap_distance_meters, lap_duration_seconds)},
+                                 target_pace_seconds_per_km, target_heart_rate_bpm))
+            if i < laps - 1:
+                steps.append({"type": "Rest", "duration": {"duration": 60}})
+    else:
+        steps.append(_target({"type": "Work", "duration": _duration(distance_meters, duration_seconds)},
+                             target_pace_seconds_per_km, target_heart_rate_bpm))
+    if cooldown_distance_meters or cooldown_duration_seconds:
+        steps.append({"type": "CoolDown", "duration": _duration(cooldown_distance_meters, cooldown_duration_seconds)})
+    return {"workoutName": workout_name, "sportType": {"sportTypeKey": activity_type}, "workoutSteps": steps}
+
+
+def workout_id_of(result: Any) -> Optional[int]:
+    """Workout ID from a workout-service create response"""
+    if isinstance(result, dict):
+        value = result.get("workoutId", result.get("id"))
+    else:
+        value = result if isinstance(result, (int, str)) else None
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def definition_key(workout: Dict[str, Any]) -> str:
+    """Hash identifying identical workout payloads"""
+    canonical = json.dumps(workout, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+# Step types of the payloads built here and of Garmin's stepType keys, mapped to one vocabulary
+STEP_KINDS = {"warmup": "warmup", "cooldown": "cooldown", "interval": "interval", "work": "interval",
+              "rest": "rest", "recovery": "recovery", "other": "other"}
+
+
+def _end(kind: str, value: Any) -> tuple:
+    if kind == "distance" and value:
+        return "distance", round(float(value), 1)
+    if kind == "time" and value:
+        return "time", round(float(value), 1)
+    return "open", None
+
+
+def _goal(kind: Optional[str], low: Any = None, high: Any = None) -> tuple:
+    # Pace as speed in m/s, as Garmin stores it; a range by its midpoint
+    values = [float(v) for v in (low, high) if v]
+    if not values or not kind:
+        return ("none",)
+    value = sum(values) / len(values)
+    if kind.startswith("pace"):
+        return "pace", round(value, 2)
+    if kind.startswith("heart"):
+        return "heart.rate", round(value)
+    return kind, round(value, 2)
+
+
+def _normalized_steps(steps: List[Dict[str, Any]]) -> List[tuple]:
+    normalized = []
+    for step in steps:
+        if step.get("type") == "RepeatGroupDTO":
+            normalized += _normalized_steps(step.get("workoutSteps") or []) * int(step.get("numberOfIterations") or 1)
+        elif "stepType" in step:
+            # Garmin's ExecutableStepDTO
+            kind = (step.get("stepType") or {}).get("stepTypeKey", "other")
+            end = _end((step.get("endCondition") or {}).get("conditionTypeKey"), step.get("endConditionValue"))
+            target = (step.get("targetType") or {}).get("workoutTargetTypeKey")
+            goal = _goal(None if target == "no.target" else target, step.get("targetValueOne"),
+                         step.get("targetValueTwo"))
+            normalized.append((STEP_KINDS.get(kind, kind), end, goal))
+        else:
+            # A payload built by build_workout; pace targets are in seconds per km
+            kind = str(step.get("type", "other")).lower()
+            duration = step.get("duration") or {}
+            end = _end("distance", duration["distance"]) if duration.get("distance") else _end(
+                "time", duration.get("duration"))
+            target, value = step.get("targetType"), step.get("targetValue")
+            if target == "pace" and value:
+                value = 1000.0 / float(value)
+            normalized.append((STEP_KINDS.get(kind, kind), end, _goal(target, value)))
+    return normalized
+
+
+def steps_key(workout: Dict[str, Any]) -> str:
+    """Hash of a workout's sport and normalized steps, equal for a built payload and the workout Garmin returns
+
+    Names are left out, so the same session under another name has the same key.
+    """
+    steps: List[Dict[str, Any]] = list(workout.get("workoutSteps") or [])
+    for segment in workout.get("workoutSegments") or []:
+        steps += segment.get("workoutSteps") or []
+    sport = (workout.get("sportType") or {}).get("sportTypeKey")
+    canonical = json.dumps([sport, _normalized_steps(steps)], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _positive(name: str, value: Any, bounds: Optional[tuple] = None) -> None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"{name} must be a positive number, got {value!r}")
+    if bounds and not bounds[0] <= value <= bounds[1]:
+        raise ValueError(f"{name} must be between {bounds[0]} and {bounds[1]}, got {value!r}")
+
+
+def _date(name: str, value: Any) -> str:
+    try:
+        return datetime.date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format, got {value!r}")
+
+
+def _validate_interval(i: int, interval: Any) -> None:
+    if not isinstance(interval, dict):
+        raise ValueError(f"intervals[{i}] must be an object")
+    unknown = set(interval) - set(INTERVAL_FIELDS)
+    if unknown:
+        raise ValueError(f"intervals[{i}] has unknown keys {', '.join(sorted(unknown))}")
+    if not (interval.get("distance_meters") or interval.get("duration_seconds")):
+        raise ValueError(f"intervals[{i}] needs distance_meters or duration_seconds")
+    bounds = {"target_pace": PACE_RANGE, "target_hr": HEART_RATE_RANGE}
+    for key, value in interval.items():
+        _positive(f"intervals[{i}].{key}", value, bounds.get(key))
+
+
+def plan_entry(entry: Any) -> Dict[str, Any]:
+    """Validate a training plan entry and return its workout payload (None for an existing workout_id), dates and time
+
+    Raises ValueError describing the first problem found, before anything is sent.
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("entry must be an object")
+    unknown = set(entry) - set(ENTRY_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown keys {', '.join(sorted(unknown))}")
+
+    dates = list(entry.get("dates") or [])
+    if entry.get("scheduled_date"):
+        dates.insert(0, entry["scheduled_date"])
+    if not dates:
+        raise ValueError("scheduled_date or dates is required")
+    dates = list(dict.fromkeys(_date("dates", d) for d in dates))
+    scheduled_time = entry.get("scheduled_time")
+    if scheduled_time is not None and not TIME_PATTERN.fullmatch(str(scheduled_time)):
+        raise ValueError(f"scheduled_time must be HH:MM, got {scheduled_time!r}")
+
+    if entry.get("workout_id") is not None:
+        defined = [name for name in DEFINITION_FIELDS if entry.get(name) is not None]
+        if defined:
+            raise ValueError(f"workout_id schedules an existing workout, {', '.join(defined)} cannot be set")
+        _positive("workout_id", entry["workout_id"])
+        return {"workout": None, "workout_id": int(entry["workout_id"]), "dates": dates, "time": scheduled_time}
+
+    name = entry.get("workout_name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("workout_name is required")
+    sport = entry.get("activity_type", "running")
+    if not isinstance(sport, str) or not SPORT_PATTERN.fullmatch(sport):
+        raise ValueError(f"activity_type must be a sport type key such as running or cycling, got {sport!r}")
+    bounds = {"target_pace_seconds_per_km": PACE_RANGE, "target_heart_rate_bpm": HEART_RATE_RANGE}
+    for key in DEFINITION_FIELDS:
+        if key not in ("activity_type", "intervals") and entry.get(key) is not None:
+            _positive(key, entry[key], bounds.get(key))
+    intervals = entry.get("intervals")
+    if intervals is not None:
+        if not isinstance(intervals, list) or not intervals:
+            raise ValueError("intervals must be a non-empty list")
+        for i, interval in enumerate(intervals):
+            _validate_interval(i, interval)
+    laps = entry.get("laps")
+    has_lap = entry.get("lap_distance_meters") or entry.get("lap_duration_seconds")
+    if laps is not None and (not isinstance(laps, int) or not has_lap):
+        raise ValueError("laps must be a whole number and needs lap_distance_meters or lap_duration_seconds")
+    if has_lap and not laps:
+        raise ValueError("lap_distance_meters and lap_duration_seconds need laps")
+    if not intervals and not laps and not (entry.get("distance_meters") or entry.get("duration_seconds")):
+        raise ValueError("the workout needs distance_meters, duration_seconds, laps or intervals")
+
+    workout = build_workout(name.strip(), **{key: entry[key] for key in DEFINITION_FIELDS
+                                             if entry.get(key) is not None})
+    for i, step in enumerate(workout["workoutSteps"]):
+        if not step["duration"]:
+            raise ValueError(f"step {i + 1} ({step['type']}) has no distance or duration")
+    return {"workout": workout, "workout_id": None, "dates": dates, "time": scheduled_time}
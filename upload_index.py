@@ -0,0 +1,121 @@
+"""
+Local fingerprint index of uploaded activity files, used to skip duplicate uploads
+"""
+import contextlib
+import datetime
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, Optional
+
+DB_PATH = os.path.expanduser(os.getenv("GARMIN_UPLOAD_DB", "~/.cache/garmin-mcp/uploads.db"))
+UPLOAD_FORMATS = ("fit", "gpx", "tcx")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    sha256 TEXT PRIMARY KEY,
+    start_time INTEGER,
+    device_serial INTEGER,
+    path TEXT,
+    size INTEGER,
+    status TEXT NOT NULL,
+    activity_id INTEGER,
+    upload_id INTEGER,
+    uploaded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS uploads_device_start ON uploads (device_serial, start_time);
+"""
+
+
+def fingerprint(path: str) -> Dict[str, Any]:
+    """Validate an activity file and return its SHA-256, size and, for FIT files, start time and device serial
+
+    Args:
+        path: Path of a .fit, .gpx or .tcx file
+    """
+    path = os.path.expanduser(path)
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext not in UPLOAD_FORMATS:
+        raise ValueError(f"Unsupported file type .{ext}, expected one of {', '.join(UPLOAD_FORMATS)}")
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    if not size:
+        raise ValueError(f"{path} is empty")
+    result = {"path": path, "format": ext, "sha256": digest.hexdigest(), "size": size,
+              "start_time": None, "device_serial": None}
+    if ext == "fit":
+        # Only parsed for FIT uploads, which also rejects corrupt files before any upload
+        from fit_file import FitFile
+        with FitFile(path) as fit:
+            result["start_time"] = fit.start_time()
+            result["device_serial"] = fit.device_serial()
+    return result
+
+
+def start_time_gmt(fp: Dict[str, Any]) -> Optional[str]:
+    """Start time of a fingerprint as Garmin's "YYYY-MM-DD HH:MM:SS" GMT string"""
+    if fp.get("start_time") is None:
+        return None
+    started = datetime.datetime.fromtimestamp(fp["start_time"], datetime.timezone.utc)
+    return started.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class UploadIndex:
+    """SQLite store of fingerprints of files that were uploaded (or found to exist remotely)
+
+    A file counts as already uploaded when its hash matches, or when another
+    file from the same device with the same start time was uploaded.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._initialized = False
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection for one operation, committed if it succeeds and closed afterwards"""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.row_factory = sqlite3.Row
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def find(self, fp: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the earlier upload matching a fingerprint, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM uploads WHERE sha256 = ?", (fp["sha256"],)).fetchone()
+            if row is None and fp.get("start_time") is not None and fp.get("device_serial") is not None:
+                row = conn.execute("SELECT * FROM uploads WHERE device_serial = ? AND start_time = ?",
+                                   (fp["device_serial"], fp["start_time"])).fetchone()
+        return dict(row) if row else None
+
+    def record(self, fp: Dict[str, Any], status: str, activity_id: Optional[int] = None,
+               upload_id: Optional[int] = None) -> None:
+        """Remember an uploaded file"""
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (fp["sha256"], fp.get("start_time"), fp.get("device_serial"), fp["path"], fp["size"],
+                          status, activity_id, upload_id, time.time()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of fingerprints per status"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, count(*) AS n FROM uploads GROUP BY status").fetchall()
+        return {"uploads": {r["status"]: r["n"] for r in rows}, "path": self.path}
+
+
+upload_index = UploadIndex()
@@ -0,0 +1,144 @@
+"""
+Local SQLite index of the workout library keyed by a normalized hash of the
+workout steps, used to reuse existing workouts instead of creating duplicates
+"""
+import contextlib
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from garmin_workouts import steps_key
+
+DB_PATH = os.path.expanduser(os.getenv("GARMIN_WORKOUT_DB", "~/.cache/garmin-mcp/workouts.db"))
+SYNC_PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    workout_id INTEGER PRIMARY KEY,
+    name TEXT,
+    sport TEXT,
+    update_date TEXT,
+    steps_key TEXT
+);
+CREATE INDEX IF NOT EXISTS workouts_steps ON workouts (steps_key);
+CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _has_steps(workout: Dict[str, Any]) -> bool:
+    return bool(workout.get("workoutSegments") or workout.get("workoutSteps"))
+
+
+class WorkoutIndex:
+    """SQLite store of workout IDs, names and step hashes
+
+    The workout list only carries summaries, so a sync fetches the details
+    of new and changed workouts only (by updateDate). Workouts created
+    through the server are added as soon as they exist.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._initialized = False
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection for one operation, committed if it succeeds and closed afterwards"""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.row_factory = sqlite3.Row
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the oldest indexed workout with a steps_key, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM workouts WHERE steps_key = ? ORDER BY workout_id LIMIT 1",
+                               (key,)).fetchone()
+        return dict(row) if row else None
+
+    def has(self, workout_id: int) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM workouts WHERE workout_id = ?", (workout_id,)).fetchone() is not None
+
+    def add(self, workout_id: int, workout: Dict[str, Any], update_date: Optional[str] = None) -> str:
+        """Index a workout from its details or the payload it was created from, returning its steps_key
+
+        A workout added without an update date (one just created) is not
+        fetched again by the next sync.
+        """
+        with self._connect() as conn:
+            return self._add(conn, workout_id, workout, update_date)
+
+    @staticmethod
+    def _add(conn: sqlite3.Connection, workout_id: int, workout: Dict[str, Any],
+             update_date: Optional[str] = None) -> str:
+        key = steps_key(workout)
+        conn.execute("INSERT OR REPLACE INTO workouts VALUES (?, ?, ?, ?, ?)",
+                     (workout_id, workout.get("workoutName"), (workout.get("sportType") or {}).get("sportTypeKey"),
+                      update_date or workout.get("updateDate"), key))
+        return key
+
+    def delete(self, workout_id: int) -> None:
+        """Forget a workout, e.g. one that no longer exists remotely"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM workouts WHERE workout_id = ?", (workout_id,))
+
+    def reconcile(self, summaries: List[Dict[str, Any]], full: bool = False) -> List[Dict[str, Any]]:
+        """Apply a complete workout list and return the workouts whose details must be fetched
+
+        Workouts no longer listed are removed. Listed workouts that carry their
+        steps are indexed directly; the others are returned when new, changed
+        since they were indexed, or when full is set.
+        """
+        listed = {int(w["workoutId"]): w for w in summaries if w.get("workoutId") is not None}
+        with self._connect() as conn:
+            known = {row["workout_id"]: row["update_date"]
+                     for row in conn.execute("SELECT workout_id, update_date FROM workouts")}
+            conn.executemany("DELETE FROM workouts WHERE workout_id = ?",
+                             [(workout_id,) for workout_id in known if workout_id not in listed])
+            pending = []
+            for workout_id, summary in listed.items():
+                if workout_id in known and known[workout_id] is None and not full:
+                    # Created here and indexed from its payload, so its steps are known
+                    conn.execute("UPDATE workouts SET update_date = ? WHERE workout_id = ?",
+                                 (summary.get("updateDate"), workout_id))
+                    continue
+                unchanged = workout_id in known and known[workout_id] == summary.get("updateDate")
+                if unchanged and not full:
+                    continue
+                if _has_steps(summary):
+                    self._add(conn, workout_id, summary)
+                else:
+                    pending.append(summary)
+        return pending
+
+    def mark_synced(self) -> None:
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_sync', ?)", (str(time.time()),))
+
+    def last_synced(self) -> float:
+        """Return the time of the last completed sync, or 0 if never synced"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM sync_state WHERE key = 'last_sync'").fetchone()
+        return float(row["value"]) if row else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of indexed workouts and distinct step definitions"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT count(*) AS n, count(DISTINCT steps_key) AS k FROM workouts").fetchone()
+        last_sync = self.last_synced()
+        return {"indexed": row["n"], "distinct_definitions": row["k"], "last_sync": last_sync or None,
+                "path": self.path}
+
+
+workout_index = WorkoutIndex()